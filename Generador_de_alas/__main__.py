@@ -0,0 +1,6 @@
+import sys
+
+from Generador_de_alas.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Importaciones perezosas
+
+matplotlib.pyplot, SciPy y gmsh tardan cientos de milisegundos en importarse (y
+pyplot o gmsh pueden ni siquiera cargar en un nodo sin pantalla), pero la mayoría
+de procesos que usan el paquete solo leen perfiles y mueven coordenadas. Con
+
+	plt = perezoso("matplotlib.pyplot")
+
+el módulo real se importa la primera vez que se usa uno de sus atributos
+(plt.figure(), ...) y desde ahí cada acceso va directo al módulo.
+"""
+
+import importlib
+import sys
+import threading
+
+
+class ModuloPerezoso:
+	"""
+		Sustituto de un módulo que lo importa al usar el primer atributo
+
+		- Atributos:
+			- nombre: nombre completo del módulo ("scipy.interpolate", ...)
+	"""
+
+	def __init__(self, nombre):
+		self.__dict__["nombre"] = nombre
+		self.__dict__["_modulo"] = None
+		self.__dict__["_cerrojo"] = threading.Lock()
+
+	def cargar(self):
+		"""
+			Importa el módulo (solo la primera vez) y lo devuelve
+		"""
+		if self._modulo is None:
+			with self._cerrojo:
+				if self._modulo is None:
+					self.__dict__["_modulo"] = importlib.import_module(self.nombre)
+		return self._modulo
+
+	@property
+	def cargado(self):
+		return self._modulo is not None
+
+	def __getattr__(self, atributo):
+		return getattr(self.cargar(), atributo)
+
+	def __setattr__(self, atributo, valor):
+		setattr(self.cargar(), atributo, valor)
+
+	def __dir__(self):
+		return dir(self.cargar())
+
+	def __repr__(self):
+		estado = "cargado" if self.cargado else "sin cargar"
+		return f"<módulo perezoso {self.nombre!r} ({estado})>"
+
+
+def perezoso(nombre):
+	"""
+		ModuloPerezoso para 'nombre', o el propio módulo si ya estaba importado
+	"""
+	if nombre in sys.modules:
+		return sys.modules[nombre]
+	return ModuloPerezoso(nombre)
@@ -23,18 +23,32 @@ Provides tools to create and modify airfoil objects
 Developed for Airinnova AB, Stockholm, Sweden.
 """
 
-from datetime import datetime
+from collections import OrderedDict, namedtuple
+import hashlib
 import os
 import re
 
 import numpy as np
-from scipy.interpolate import interp1d, PchipInterpolator
-from scipy.misc import derivative
-import matplotlib.pyplot as plt
 
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.alas.cst import BaseCST, orden_de
+from Generador_de_alas.alas.fileio import format_airfoil_record
+from Generador_de_alas.alas.graficos import figura_agg, nombre_unico
+from Generador_de_alas.alas.naca import desde_designacion, naca4
+
+
+# SciPy y matplotlib se cargan al usarlos por primera vez (ver _perezoso.py)
+interpolate = perezoso("scipy.interpolate")
+misc = perezoso("scipy.misc")
+plt = perezoso("matplotlib.pyplot")
 
 POINTS_AIRFOIL = 120//2 # (Que sea divisible por dos para no complicar)
 CLUSTERING = 1.2
+# Refinado adaptativo (tolerance): puntos iniciales por lado, niveles de bisección
+# y puntos interiores de cada intervalo en la pasada final de comprobación
+ADAPTIVE_SEED = 5
+ADAPTIVE_MAX_DEPTH = 20
+ADAPTIVE_VERIFY = 31
 
 
 class NACADefintionError(Exception):
@@ -43,24 +57,141 @@ class NACADefintionError(Exception):
 	pass
 
 
+# Geometría base de un Airfoil: lo que sale de normalizar y refinar los puntos
+# de entrada, antes de escalar, mover o girar (arrays de solo lectura)
+GeometriaBase = namedtuple("GeometriaBase", [
+	"x_upper", "y_upper", "x_lower", "y_lower",
+	"y_upper_interp", "y_lower_interp", "max_extrados", "norm_factor",
+])
+
+
+def huella_perfil(upper, lower, *parametros):
+	"""
+		Hash (hex) de los puntos de entrada de un Airfoil y de los parámetros del
+		refinado
+	"""
+	h = hashlib.sha1()
+	for lado in (upper, lower):
+		lado = np.ascontiguousarray(lado, dtype=np.float64)
+		h.update(np.asarray(lado.shape, dtype=np.int64).tobytes())
+		h.update(lado.tobytes())
+	h.update(repr(parametros).encode())
+	return h.hexdigest()
+
+
+class CacheGeometria:
+	"""
+		Caché LRU de la geometría base de los Airfoil: crear muchas veces el mismo
+		perfil (el mismo s1223 para dos flaps, una biblioteca de perfiles en un
+		barrido) solo normaliza, refina e interpola la primera vez. Todas las
+		instancias comparten los mismos arrays de solo lectura y cada una guarda
+		solo su colocación (escalar, translate, rotar, flip crean arrays nuevos)
+
+		- Atributos:
+			- max_tamano: número de geometrías que se guardan (0 para no guardar)
+			- aciertos, fallos: contadores de uso
+	"""
+
+	def __init__(self, max_tamano=256):
+		self.max_tamano = max_tamano
+		self.aciertos = 0
+		self.fallos = 0
+		self._memoria = OrderedDict()
+
+	def obtener(self, huella, construir):
+		"""
+			GeometriaBase guardada con esa huella, o la que devuelve construir()
+			(que se guarda)
+		"""
+		if huella in self._memoria:
+			self._memoria.move_to_end(huella)
+			self.aciertos += 1
+			return self._memoria[huella]
+
+		self.fallos += 1
+		base = construir()
+		if self.max_tamano > 0:
+			self._memoria[huella] = base
+			while len(self._memoria) > self.max_tamano:
+				self._memoria.popitem(last=False)
+		return base
+
+	def vaciar(self):
+		self._memoria.clear()
+		self.aciertos = 0
+		self.fallos = 0
+
+	def estadisticas(self):
+		"""
+			- Devuelve un dict con aciertos, fallos, tasa de aciertos y tamaño
+		"""
+		total = self.aciertos + self.fallos
+		return {
+			"aciertos": self.aciertos,
+			"fallos": self.fallos,
+			"tasa_aciertos": self.aciertos/total if total else 0.0,
+			"tamano": len(self._memoria),
+			"max_tamano": self.max_tamano,
+		}
+
+	def __len__(self):
+		return len(self._memoria)
+
+
+# La que usan todos los Airfoil (CACHE_GEOMETRIA.max_tamano = 0 la desactiva)
+CACHE_GEOMETRIA = CacheGeometria()
+
+
 class Airfoil:
-	def __init__(self, upper, lower, meta):
+	def __init__(self, upper, lower, meta=None, tolerance=None):
 		"""
 		Main constructor method
 
 		Args:
 			:upper: 2 x N array with x- and y-coordinates of the upper side
 			:lower: 2 x N array with x- and y-coordinates of the lower side
+			:meta: (dict) Extra information, e.g. {"name": ...}
+			:tolerance: Maximum chordal deviation (fraction of the chord). If
+			given, each side gets only the points it needs to meet it
+			instead of POINTS_AIRFOIL (see _refine_curve)
 
 		Note:
 			* During initialisation data points are automatically ordered
 			and normalised if necessary.
 		"""
 		self.meta = meta
-		####
-		self._max_extrados = 0
-		####
+
 		# Always use Numpy arrays
+		upper = np.asarray(upper, dtype=float)
+		lower = np.asarray(lower, dtype=float)
+
+		# The normalised and refined geometry is shared between airfoils made
+		# from the same points (see CacheGeometria)
+		huella = huella_perfil(upper, lower, POINTS_AIRFOIL, CLUSTERING, tolerance)
+		base = CACHE_GEOMETRIA.obtener(huella, lambda: self._build_base(upper, lower, tolerance))
+
+		self._x_upper, self._y_upper = base.x_upper, base.y_upper
+		self._x_lower, self._y_lower = base.x_lower, base.y_lower
+		self._y_upper_interp = base.y_upper_interp
+		self._y_lower_interp = base.y_lower_interp
+		self._max_extrados = base.max_extrados
+		self.norm_factor = base.norm_factor
+
+		self.cuerda = 1
+		self.aoa = 0
+		# Placement (escalar, translate, rotar, flip) accumulated since the
+		# airfoil was normalised, as a 3 x 3 affine matrix
+		self.transformacion = np.eye(3)
+
+	def _build_base(self, upper, lower, tolerance=None):
+		"""
+		Order, normalise and refine the input points (copies of them) and
+		make the interpolation functions
+
+		Returns:
+			:base: GeometriaBase with read-only arrays
+		"""
+
 		upper = np.array(upper, dtype=float)
 		lower = np.array(lower, dtype=float)
 
@@ -83,36 +214,111 @@ class Airfoil:
 		self._y_lower = self._y_lower[idx_keep]
 
 		# Make interpolation functions for 'y_upper' and 'y_lower'
-		self._y_upper_interp = interp1d(
-			self._x_upper,
-			self._y_upper,
-			kind='cubic',
-			bounds_error=False,
-			fill_value="extrapolate"
-		)
-
-		self._y_lower_interp = interp1d(
-			self._x_lower,
-			self._y_lower,
-			kind='cubic',
-			bounds_error=False,
-			fill_value="extrapolate"
-		)
+		self._make_interpolators()
 
 		self._x_upper, self._y_upper = self._refine_curve(
 				self._x_upper, self._y_upper,
 				n_points=POINTS_AIRFOIL,
-				clustering=CLUSTERING
+				clustering=CLUSTERING,
+				tolerance=tolerance
 			)
 
 		self._x_lower, self._y_lower = self._refine_curve(
 			self._x_lower, self._y_lower,
 			n_points=POINTS_AIRFOIL,
-			clustering=CLUSTERING
+			clustering=CLUSTERING,
+			tolerance=tolerance
 		)
 
-		self.cuerda = 1
-		self.aoa = 0
+		for array in (self._x_upper, self._y_upper, self._x_lower, self._y_lower):
+			array.setflags(write=False)
+
+		return GeometriaBase(
+			self._x_upper, self._y_upper, self._x_lower, self._y_lower,
+			self._y_upper_interp, self._y_lower_interp, self._max_extrados, self.norm_factor,
+		)
+
+	@classmethod
+	def from_processed(cls, upper, lower, cuerda=1, aoa=0, transformacion=None, norm_factor=1, meta=None):
+		"""
+		Rebuild an airfoil from coordinates that were already ordered, refined
+		and placed, e.g. read back from a binary file (see alas/binario.py)
+
+		Args:
+			:upper: 2 x N array with the placed upper side
+			:lower: 2 x N array with the placed lower side
+			:cuerda, aoa: chord and angle of attack of the placed airfoil
+			:transformacion: 3 x 3 affine placement (identity by default)
+			:norm_factor: normalisation factor of the original data
+			:meta: (dict) Extra information
+
+		Note:
+			* Nothing is normalised or refined again. The interpolation
+			functions are rebuilt on the coordinates taken back to the
+			normalised frame with the inverse placement.
+		"""
+
+		self = cls.__new__(cls)
+		self.meta = meta
+		self.norm_factor = norm_factor
+		self.cuerda = cuerda
+		self.aoa = aoa
+		self.transformacion = np.eye(3) if transformacion is None else np.array(transformacion, dtype=float)
+
+		inversa = np.linalg.inv(self.transformacion)
+		upper = np.array(upper, dtype=float)
+		lower = np.array(lower, dtype=float)
+		self._x_upper, self._y_upper = upper
+		self._x_lower, self._y_lower = lower
+
+		x_upper, y_upper = inversa[:2, :2] @ upper + inversa[:2, 2:]
+		x_lower, y_lower = inversa[:2, :2] @ lower + inversa[:2, 2:]
+		# flip() swaps the sides: with an odd number of flips the upper side
+		# comes from the lower side of the normalised airfoil
+		if np.linalg.det(self.transformacion) < 0:
+			x_upper, y_upper, x_lower, y_lower = x_lower, y_lower, x_upper, y_upper
+		self._max_extrados = np.max(y_upper)
+		self._make_interpolators(x_upper, y_upper, x_lower, y_lower)
+		return self
+
+	def _make_interpolators(self, x_upper=None, y_upper=None, x_lower=None, y_lower=None):
+		"""
+		Make the interpolation functions for 'y_upper' and 'y_lower' (by
+		default on the current coordinates)
+		"""
+
+		if x_upper is None:
+			x_upper, y_upper = self._x_upper, self._y_upper
+			x_lower, y_lower = self._x_lower, self._y_lower
+
+		# Values passed to iterp1d() must be unique
+		x_upper, idx_keep = np.unique(x_upper, return_index=True)
+		y_upper = y_upper[idx_keep]
+		x_lower, idx_keep = np.unique(x_lower, return_index=True)
+		y_lower = y_lower[idx_keep]
+
+		self._y_upper_interp = interpolate.interp1d(
+			x_upper,
+			y_upper,
+			kind='cubic',
+			bounds_error=False,
+			fill_value="extrapolate"
+		)
+
+		self._y_lower_interp = interpolate.interp1d(
+			x_lower,
+			y_lower,
+			kind='cubic',
+			bounds_error=False,
+			fill_value="extrapolate"
+		)
+
+	def _place(self, matriz):
+		"""
+		Accumulate a 3 x 3 affine matrix applied after the current placement
+		"""
+
+		self.transformacion = matriz @ self.transformacion
 
 	def __str__(self):
 		return self.__class__.__name__ + "(upper, lower)"
@@ -129,10 +335,14 @@ class Airfoil:
 	def max_extrados(self):
 		return self._max_extrados * self.cuerda
 
-	def _refine_curve(self, x, y, n_points=300, clustering=1.5):
+	def _refine_curve(self, x, y, n_points=300, clustering=1.5, tolerance=None):
 		"""
 		Refine a curve using arc-length parametrization and PCHIP interpolation.
 		Zero-oscillation and shape preserving.
+
+		With 'tolerance' the points are not 'n_points' with a fixed
+		distribution but the ones found by _adaptive_parameters, so that no
+		chord deviates more than 'tolerance' from the interpolated curve.
 		"""
 
 		# Orden físico aproximado (para airfoils suele bastar)
@@ -147,8 +357,12 @@ class Airfoil:
 		s_norm = s / s[-1]
 
 		# Interpoladores sin oscilación
-		fx = PchipInterpolator(s_norm, x)
-		fy = PchipInterpolator(s_norm, y)
+		fx = interpolate.PchipInterpolator(s_norm, x)
+		fy = interpolate.PchipInterpolator(s_norm, y)
+
+		if tolerance is not None:
+			s_new = self._adaptive_parameters(fx, fy, tolerance)
+			return fx(s_new), fy(s_new)
 
 		# Refinado cosenoidal
 		theta = np.linspace(0, np.pi, n_points)
@@ -162,8 +376,64 @@ class Airfoil:
 		y_new = fy(s_new)
 
 		return x_new, y_new
+
+	@staticmethod
+	def _bisect(fx, fy, left, right, tolerance, fractions, max_depth):
+		"""
+		Split the intervals [left, right] of a curve (fx(s), fy(s)) in two while
+		the curve at 'fractions' of them is farther than 'tolerance' from their
+		chord. All intervals of a level are checked at once.
+
+		Returns:
+			:s_new: List of arrays with the parameters added at each level
+		"""
+
+		s_new = []
+		for _ in range(max_depth):
+			x0, y0 = fx(left), fy(left)
+			dx, dy = fx(right) - x0, fy(right) - y0
+			length = np.maximum(np.hypot(dx, dy), np.finfo(float).tiny)
+
+			t = left[:, None] + (right - left)[:, None]*fractions
+			deviation = np.abs(
+				dx[:, None]*(fy(t) - y0[:, None]) - dy[:, None]*(fx(t) - x0[:, None])
+			) / length[:, None]
+
+			split = deviation.max(axis=1) > tolerance
+			if not split.any():
+				break
+			middle = 0.5*(left[split] + right[split])
+			s_new.append(middle)
+			left = np.concatenate((left[split], middle))
+			right = np.concatenate((middle, right[split]))
+
+		return s_new
+
 	@classmethod
-	def NACA4(cls, naca_digits, n_points=POINTS_AIRFOIL):
+	def _adaptive_parameters(cls, fx, fy, tolerance, max_depth=ADAPTIVE_MAX_DEPTH):
+		"""
+		Arc-length parameters of the points of a curve (fx(s), fy(s)) found by
+		bisection: an interval is split in two while the curve at 1/4, 1/2 or
+		3/4 of it is farther than 'tolerance' from its chord. Three probes can
+		miss the worst point of an interval, so a final pass checks every
+		interval at ADAPTIVE_VERIFY points and bisects again the ones still
+		too far.
+		"""
+
+		# Una semilla cosenoidal para que ningún detalle quede entre dos puntos
+		seed = 0.5*(1 - np.cos(np.linspace(0, np.pi, ADAPTIVE_SEED)))
+		s_new = [seed] + cls._bisect(fx, fy, seed[:-1], seed[1:], tolerance, np.array([0.25, 0.5, 0.75]), max_depth)
+		s_new = np.unique(np.concatenate(s_new))
+
+		# Entre dos muestras la desviación (casi una parábola) puede pasar de la
+		# mayor medida en 1/(ADAPTIVE_VERIFY + 1)^2 como mucho: se deja ese margen
+		verify = np.linspace(0, 1, ADAPTIVE_VERIFY + 2)[1:-1]
+		margin = 1 - 1/(ADAPTIVE_VERIFY + 1)**2
+		extra = cls._bisect(fx, fy, s_new[:-1], s_new[1:], margin*tolerance, verify, max_depth)
+		return np.unique(np.concatenate([s_new] + extra))
+
+	@classmethod
+	def NACA4(cls, naca_digits, n_points=POINTS_AIRFOIL, tolerance=None):
 		"""
 		Create an airfoil object from a NACA 4-digit series definition
 
@@ -173,6 +443,7 @@ class Airfoil:
 		Args:
 			:naca_digits: String like '4412'
 			:points: Total number of points used to create the airfoil
+			:tolerance: Maximum chordal deviation (see __init__)
 
 		Returns:
 			:airfoil: New airfoil instance
@@ -181,14 +452,62 @@ class Airfoil:
 		re_4digits = re.compile(r"^\d{4}$")
 
 		if re_4digits.match(naca_digits):
-			p = float(naca_digits[0])/10
-			m = float(naca_digits[1])/100
+			m = float(naca_digits[0])/100
+			p = float(naca_digits[1])/10
 			xx = float(naca_digits[2:4])/100
 		else:
 			raise NACADefintionError("Identifier not recognised as valid NACA 4 definition")
 
 		upper, lower = gen_NACA4_airfoil(p, m, xx, n_points)
-		return cls(upper, lower)
+		return cls(upper, lower, {"name": f"NACA {naca_digits}"}, tolerance=tolerance)
+
+	@classmethod
+	def NACA(cls, designacion, n_points=POINTS_AIRFOIL, meta=None, tolerance=None):
+		"""
+		Create an airfoil object from any NACA designation supported by naca.py
+		(4-digit, modified 4-digit, 5-digit and 6-series)
+
+		Note:
+			* This is an alternative constructor method
+
+		Args:
+			:designacion: String like '2412', '2412-63', '23012' or '64-2320 a=0'
+			:n_points: Number of points per side
+			:meta: (dict) Extra information, by default {"name": "NACA <designacion>"}
+			:tolerance: Maximum chordal deviation (see __init__)
+
+		Returns:
+			:airfoil: New airfoil instance
+		"""
+
+		upper, lower = desde_designacion(designacion, n_points)
+		return cls(upper, lower, {"name": f"NACA {designacion}"} if meta is None else meta, tolerance=tolerance)
+
+	@classmethod
+	def CST(cls, parametros, n_points=POINTS_AIRFOIL, meta=None, tolerance=None):
+		"""
+		Create an airfoil object from a CST parameter vector (see cst.py)
+
+		Note:
+			* This is an alternative constructor method
+
+		Args:
+			:parametros: [A_upper, A_lower, dz_upper, dz_lower] as given by cst.ajustar
+			:n_points: Number of points per side
+			:meta: (dict) Extra information, e.g. {"name": ...}
+			:tolerance: Maximum chordal deviation (see __init__)
+
+		Returns:
+			:airfoil: New airfoil instance
+		"""
+
+		base = BaseCST(n_puntos=n_points, orden=orden_de(parametros))
+		y_upper, y_lower = base.evaluar(parametros)
+
+		upper = np.array([base.x, y_upper])
+		lower = np.array([base.x, y_lower])
+
+		return cls(upper, lower, meta, tolerance=tolerance)
 
 	@classmethod
 	def morph_new_from_two_foils(cls, airfoil1, airfoil2, eta, n_points):
@@ -274,6 +593,8 @@ class Airfoil:
 
 		Note:
 			* 'show' and/or 'save' must be True
+			* Without 'show' the figure is drawn with Agg, without pyplot
+			* The figure is always closed before returning
 
 		Args:
 			:show: (bool) Create an interactive plot
@@ -294,7 +615,7 @@ class Airfoil:
 			None or 'file_name' (full path) if 'save' is True
 		"""
 
-		fig = plt.figure()
+		fig = plt.figure() if show else figura_agg()
 		ax = fig.add_subplot(1, 1, 1)
 		ax.set_xlim([0, 1])
 		ax.set_xlabel('x')
@@ -315,22 +636,24 @@ class Airfoil:
 		if settings.get('chord', False):
 			pass
 
-		plt.subplots_adjust(left=0.10, bottom=0.10, right=0.98, top=0.98, wspace=None, hspace=None)
+		fig.subplots_adjust(left=0.10, bottom=0.10, right=0.98, top=0.98, wspace=None, hspace=None)
 
 		if show:
 			plt.show()
 
+		file_name = None
 		if save:
 			path = settings.get('path', '.')
 			file_name = settings.get('file_name', False)
 
 			if not file_name:
-					now = datetime.strftime(datetime.now(), format='%F_%H%M%S')
-					file_type = 'png'
-					file_name = f'airfoils_{now}.{file_type}'
+					file_name = nombre_unico('airfoils')
 
 			fig.savefig(os.path.join(path, file_name))
-			return file_name
+
+		if show:
+			plt.close(fig)
+		return file_name
 
 	def camber_line(self, x):
 		"""
@@ -367,7 +690,7 @@ class Airfoil:
 			scalar_input = True
 	########################
 
-		dydx = derivative(self.camber_line, x, dx=1e-12)
+		dydx = misc.derivative(self.camber_line, x, dx=1e-12)
 		theta = np.rad2deg(np.arctan(dydx))
 		theta = np.array([0 if abs(x) > 50 else x for x in theta])
 
@@ -393,19 +716,23 @@ class Airfoil:
 		self._y_upper = new_y_upper
 		self._x_lower = new_x_lower
 		self._y_lower = new_y_lower
+		self._place(np.diag([1.0, -1.0, 1.0]))
 
 	def escalar(self, factor):
+		# Arrays nuevos: los de la geometría base son compartidos (CacheGeometria)
 		self.cuerda *= factor
-		self._x_upper *= factor
-		self._y_upper *= factor
-		self._x_lower *= factor
-		self._y_lower *= factor
+		self._x_upper = self._x_upper * factor
+		self._y_upper = self._y_upper * factor
+		self._x_lower = self._x_lower * factor
+		self._y_lower = self._y_lower * factor
+		self._place(np.diag([factor, factor, 1.0]))
 
 	def translate(self, x, y):
-		self._x_upper += x
-		self._y_upper += y
-		self._x_lower += x
-		self._y_lower += y
+		self._x_upper = self._x_upper + x
+		self._y_upper = self._y_upper + y
+		self._x_lower = self._x_lower + x
+		self._y_lower = self._y_lower + y
+		self._place(np.array([(1.0, 0.0, x), (0.0, 1.0, y), (0.0, 0.0, 1.0)]))
 
 	def rotar(self, alfa):
 		a = np.deg2rad(alfa)
@@ -427,6 +754,7 @@ class Airfoil:
 		new_lower = np.matmul(MatRot, lower)
 		self._x_upper, self._y_upper = new_upper
 		self._x_lower, self._y_lower = new_lower
+		self._place(np.block([[MatRot, np.zeros((2, 1))], [np.zeros((1, 2)), np.ones((1, 1))]]))
 
 	def setAOA(self, alfa):
 		dela_alfa = alfa - self.aoa
@@ -434,24 +762,12 @@ class Airfoil:
 		self.rotar(dela_alfa)
 
 	def exportar(self, separador=", ", comaDec=False, coordz=True, toFile=True, filename=""):
-		result = ""
-		#print(len(self._y_lower))
-		#print(len(self._y_upper))
 		### Back to front arriba y luego
 		### front to back abajo
-		for i in reversed(range(0, len(self._x_upper))):
-			result += str(self._x_upper[i]) + separador + str(self._y_upper[i])
-			if coordz:
-				result += separador + "0.0000"
-			result += "\n"
-		for i in range(0, len(self._x_lower)):
-			result += str(self._x_lower[i]) + separador + str(self._y_lower[i])
-			if coordz:
-				result += separador + "0.0000"
-			result += "\n"
-
-		if comaDec:
-			result = result.replace(".", ",")
+		result = format_airfoil_record(
+			(self._x_upper, self._y_upper), (self._x_lower, self._y_lower),
+			separator=separador, decimal_comma=comaDec, z_coordinate=coordz
+		)
 
 		if toFile:
 			if filename == "":
@@ -471,9 +787,9 @@ def gen_NACA4_airfoil(p, m, xx, n_points):
 	Generate upper and lower points for a NACA 4 airfoil
 
 	Args:
-		:p:
-		:m:
-		:xx:
+		:p: Position of the maximum camber (fraction of the chord)
+		:m: Maximum camber (fraction of the chord)
+		:xx: Maximum thickness (fraction of the chord)
 		:n_points:
 
 	Returns:
@@ -481,49 +797,5 @@ def gen_NACA4_airfoil(p, m, xx, n_points):
 		:lower: 2 x N array with x- and y-coordinates of the lower side
 	"""
 
-	def yt(xx, xsi):
-		# Thickness distribution
-
-		a0 = 1.4845
-		a1 = 0.6300
-		a2 = 1.7580
-		a3 = 1.4215
-		a4 = 0.5075
-
-		return xx*(a0*np.sqrt(xsi) - a1*xsi - a2*xsi**2 + a3*xsi**3 - a4*xsi**4)
-
-	def yc(p, m, xsi):
-		# Camber line
-
-		def yc_xsi_lt_p(xsi):
-			return (m/p**2)*(2*p*xsi - xsi**2)
-
-		def dyc_xsi_lt_p(xsi):
-			return (2*m/p**2)*(p - xsi)
-
-		def yc_xsi_ge_p(xsi):
-			return (m/(1 - p)**2)*(1 - 2*p + 2*p*xsi - xsi**2)
-
-		def dyc_xsi_ge_p(xsi):
-			return (2*m/(1 - p)**2)*(p - xsi)
-
-		yc = np.array([yc_xsi_lt_p(x) if x < p else yc_xsi_ge_p(x) for x in xsi])
-		dyc = np.array([dyc_xsi_lt_p(x) if x < p else dyc_xsi_ge_p(x) for x in xsi])
-
-		return yc, dyc
-
-	xsi = np.linspace(0, 1, n_points)
-
-	yt = yt(xx, xsi)
-	yc, dyc = yc(p, m, xsi)
-	theta = np.arctan(dyc)
-
-	x_upper = xsi - yt*np.sin(theta)
-	y_upper = yc + yt*np.cos(theta)
-	x_lower = xsi + yt*np.sin(theta)
-	y_lower = yc - yt*np.cos(theta)
-
-	upper = np.array([x_upper, y_upper])
-	lower = np.array([x_lower, y_lower])
-
-	return upper, lower
\ No newline at end of file
+	upper, lower = naca4(m, p, xx, n_points)
+	return upper[0], lower[0]
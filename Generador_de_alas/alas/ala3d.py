@@ -0,0 +1,369 @@
+"""
+Ala 3D a partir de secciones a lo largo de la envergadura
+
+Cada estación es un Airfoil o un Alerón (o directamente los contornos de sus
+elementos) con su cuerda, torsión, flecha y diedro. Las secciones se normalizan
+(borde de ataque en el origen y cuerda total 1, sin quitarles el ángulo), se
+remuestrean todas con los mismos puntos y entre estaciones se mezclan igual que en
+Airfoil.morph_new_from_two_foils: (1 - eta) A + eta B, con la cuerda, la torsión y
+la posición del borde de ataque también interpoladas.
+
+El resultado es una malla estructurada de superficie por elemento, un array
+(n_elementos, n_estaciones, n_contorno, 3) con ejes x hacia atrás, y a lo largo de
+la envergadura y z hacia arriba (la y de los perfiles). STL y OBJ se escriben por
+bloques de estaciones directamente desde ese array, sin un objeto de Python por
+faceta, y son estancos: los vértices son los de la malla, el borde de salida
+grueso se cierra con una tira de caras y los extremos con una tapa.
+"""
+
+import numpy as np
+
+from Generador_de_alas.alas.paneles import contorno
+from Generador_de_alas.alas.polares import cuerda_y_angulo
+
+
+# Registro de una faceta de STL binario (50 bytes)
+DTYPE_STL = np.dtype([
+	("normal", "<f4", (3,)),
+	("vertices", "<f4", (3, 3)),
+	("atributo", "<u2"),
+])
+
+
+def _rotacion(a):
+	return np.array([(np.cos(a), -np.sin(a)), (np.sin(a), np.cos(a))])
+
+
+def secciones_normalizadas(seccion):
+	"""
+		Contornos (N_i x 2, en el orden de Airfoil.exportar) de cada elemento de una
+		sección, con el borde de ataque del primero en el origen y cuerda total 1
+		- Argumentos:
+			- seccion: Airfoil, Alerón o lista de contornos N_i x 2
+	"""
+	if hasattr(seccion, "foils"):
+		foils = seccion.foils
+	elif hasattr(seccion, "_x_upper"):
+		foils = [seccion]
+	else:
+		contornos = [np.asarray(puntos, dtype=float)[:, :2] for puntos in seccion]
+		borde_ataque = contornos[0][np.argmax(np.linalg.norm(contornos[0] - _borde_salida(contornos[0]), axis=1))]
+		borde_salida = _borde_salida(contornos[-1])
+		cuerda = np.linalg.norm(borde_salida - borde_ataque)
+		return [(puntos - borde_ataque) / cuerda for puntos in contornos]
+
+	cuerda, _, borde_ataque = cuerda_y_angulo(foils)
+	return [(contorno(foil) - borde_ataque) / cuerda for foil in foils]
+
+
+def _borde_salida(puntos):
+	return 0.5*(puntos[0] + puntos[-1])
+
+
+def remuestrear(puntos, n_puntos):
+	"""
+		Remuestrea un contorno (borde de salida -> un lado -> borde de ataque -> el
+		otro lado) con n_puntos en cada lado, distribuidos en coseno sobre la
+		longitud de arco de cada lado. El borde de ataque es el punto más alejado del
+		borde de salida, así que vale para elementos muy girados
+		- Devuelve un array (2 n_puntos - 1) x 2 en el mismo orden
+	"""
+	puntos = np.asarray(puntos, dtype=float)
+	k = np.argmax(np.linalg.norm(puntos - _borde_salida(puntos), axis=1))
+	fraccion = 0.5*(1 - np.cos(np.linspace(0, np.pi, n_puntos)))
+
+	lados = []
+	for lado in (puntos[k::-1], puntos[k:]):
+		s = np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(lado, axis=0), axis=1))))
+		objetivo = fraccion*s[-1]
+		lados.append(np.column_stack((np.interp(objetivo, s, lado[:, 0]), np.interp(objetivo, s, lado[:, 1]))))
+
+	return np.vstack((lados[0][::-1], lados[1][1:]))
+
+
+class Estacion:
+	"""
+		Sección del ala en una posición de la envergadura
+
+		- Atributos:
+			- seccion: Airfoil, Alerón o lista de contornos (se normaliza a cuerda 1)
+			- y: posición en la envergadura
+			- cuerda: cuerda total de la sección
+			- torsion: giro de la sección en grados (mismo sentido que Airfoil.rotar)
+				alrededor del punto a x_torsion de la cuerda
+			- flecha, diedro: ángulos en grados del borde de ataque en el tramo que
+				llega a esta estación desde la anterior (en la primera no se usan)
+			- x_torsion: fracción de la cuerda alrededor de la que se aplica la torsión
+	"""
+
+	def __init__(self, seccion, y, cuerda=1.0, torsion=0.0, flecha=0.0, diedro=0.0, x_torsion=0.25):
+		self.seccion = seccion
+		self.y = float(y)
+		self.cuerda = float(cuerda)
+		self.torsion = float(torsion)
+		self.flecha = float(flecha)
+		self.diedro = float(diedro)
+		self.x_torsion = float(x_torsion)
+
+
+class Ala:
+	"""
+		Ala 3D (de uno o varios elementos) por secciones
+
+		- Atributos:
+			- estaciones: lista de Estacion, en orden a lo largo de la envergadura
+			- n_puntos: puntos por lado de cada elemento en la malla
+			- n_intermedias: secciones mezcladas que se añaden entre cada par de estaciones
+			- perfiles: contornos normalizados y remuestreados, (n_elementos,
+				n_estaciones, 2 n_puntos - 1, 2)
+			- bordes_ataque: posición (x, y, z) del borde de ataque de cada estación
+	"""
+
+	def __init__(self, estaciones, n_puntos=101, n_intermedias=0):
+		if len(estaciones) < 2:
+			raise ValueError("Hacen falta al menos dos estaciones")
+		self.estaciones = list(estaciones)
+		self.n_puntos = n_puntos
+		self.n_intermedias = n_intermedias
+
+		secciones = [secciones_normalizadas(estacion.seccion) for estacion in self.estaciones]
+		n_elementos = {len(s) for s in secciones}
+		if len(n_elementos) != 1:
+			raise ValueError(f"Todas las estaciones deben tener los mismos elementos, hay {sorted(n_elementos)}")
+
+		self.perfiles = np.array([
+			[remuestrear(seccion[i], n_puntos) for seccion in secciones]
+			for i in range(len(secciones[0]))
+		])
+
+		# Borde de ataque de cada estación acumulando flecha y diedro por tramos
+		y = np.array([estacion.y for estacion in self.estaciones])
+		dy = np.diff(y)
+		flecha = np.deg2rad([estacion.flecha for estacion in self.estaciones[1:]])
+		diedro = np.deg2rad([estacion.diedro for estacion in self.estaciones[1:]])
+		self.bordes_ataque = np.column_stack((
+			np.concatenate(([0], np.cumsum(np.abs(dy)*np.tan(flecha)))),
+			y,
+			np.concatenate(([0], np.cumsum(np.abs(dy)*np.tan(diedro)))),
+		))
+		self._malla = None
+
+	@property
+	def n_elementos(self):
+		return self.perfiles.shape[0]
+
+	def malla(self):
+		"""
+			Malla estructurada de superficie (n_elementos, n_estaciones, n_contorno, 3),
+			con n_intermedias secciones mezcladas entre cada par de estaciones
+		"""
+		if self._malla is not None:
+			return self._malla
+
+		n_est = len(self.estaciones)
+		# Posición de cada sección de la malla: tramo y eta dentro del tramo
+		eta = np.linspace(0, 1, self.n_intermedias + 2)[:-1]
+		tramo = np.repeat(np.arange(n_est - 1), len(eta))
+		eta = np.tile(eta, n_est - 1)
+		tramo = np.append(tramo, n_est - 2)
+		eta = np.append(eta, 1.0)
+
+		def mezclar(valores):
+			valores = np.asarray(valores, dtype=float)
+			forma = (-1,) + (1,)*(valores.ndim - 1)
+			e = eta.reshape(forma)
+			return (1 - e)*valores[tramo] + e*valores[tramo + 1]
+
+		cuerda = mezclar([estacion.cuerda for estacion in self.estaciones])
+		torsion = np.deg2rad(mezclar([estacion.torsion for estacion in self.estaciones]))
+		x_torsion = mezclar([estacion.x_torsion for estacion in self.estaciones])
+		bordes_ataque = mezclar(self.bordes_ataque)
+
+		# (n_elementos, n_secciones, n_contorno, 2), mezcla como en morph_new_from_two_foils
+		e = eta[None, :, None, None]
+		perfiles = (1 - e)*self.perfiles[:, tramo] + e*self.perfiles[:, tramo + 1]
+
+		# Torsión alrededor de x_torsion sobre la cuerda de la sección (que puede
+		# venir inclinada, como un Alerón sin normalizar)
+		borde_salida = 0.5*(perfiles[-1, :, 0] + perfiles[-1, :, -1])
+		centro = x_torsion[:, None]*borde_salida / np.linalg.norm(borde_salida, axis=1, keepdims=True)
+		rotaciones = np.moveaxis(_rotacion(torsion), -1, 0)		# (n_secciones, 2, 2)
+		perfiles = np.einsum("sij,esnj->esni", rotaciones, perfiles - centro[None, :, None]) + centro[None, :, None]
+		perfiles = perfiles*cuerda[None, :, None, None]
+
+		malla = np.empty(perfiles.shape[:3] + (3,))
+		malla[..., 0] = perfiles[..., 0] + bordes_ataque[None, :, None, 0]
+		malla[..., 1] = bordes_ataque[None, :, None, 1]
+		malla[..., 2] = perfiles[..., 1] + bordes_ataque[None, :, None, 2]
+		self._malla = malla
+		return malla
+
+	def _topologia(self, elemento, tolerancia=1e-9):
+		"""
+			Nodos de un elemento (n_secciones x m x 3) y el sentido en que hay que
+			recorrer las caras para que las normales salgan hacia fuera. Si el borde
+			de salida está cerrado en todas las secciones se quita el último punto
+			del contorno (es el primero)
+		"""
+		nodos = self.malla()[elemento]
+		if np.all(np.linalg.norm(nodos[:, 0] - nodos[:, -1], axis=1) <= tolerancia*self.estaciones[0].cuerda):
+			nodos = nodos[:, :-1]
+
+		# Contorno horario en (x, z) y envergadura creciente dan caras hacia fuera
+		x, z = nodos[0, :, 0], nodos[0, :, 2]
+		area = 0.5*np.sum(x*np.roll(z, -1) - np.roll(x, -1)*z)
+		sentido = np.sign(area)*np.sign(nodos[-1, 0, 1] - nodos[0, 0, 1]) < 0
+		return nodos, sentido
+
+	def _caras_laterales(self, m, i0, i1):
+		"""Triángulos (índices locales del elemento) de las tiras entre las secciones i0..i1"""
+		i = np.arange(i0, i1)[:, None]
+		j = np.arange(m)[None, :]
+		siguiente = (j + 1) % m
+		a, b = i*m + j, (i + 1)*m + j
+		c, d = (i + 1)*m + siguiente, i*m + siguiente
+		return np.concatenate((
+			np.stack((a, b, c), axis=-1).reshape(-1, 3),
+			np.stack((a, c, d), axis=-1).reshape(-1, 3),
+		))
+
+	def _tapa(self, m, seccion):
+		"""
+			Triángulos de la tapa de una sección en escalera entre los dos lados (los
+			puntos k de cada lado desde el borde de ataque), sin los degenerados
+		"""
+		k = np.arange(self.n_puntos - 1)
+		lado_a = self.n_puntos - 1 - k
+		lado_b = (self.n_puntos - 1 + k) % m
+		caras = np.concatenate((
+			np.column_stack((lado_a, lado_a - 1, (lado_b + 1) % m)),
+			np.column_stack((lado_a, (lado_b + 1) % m, lado_b)),
+		))
+		caras = caras[(caras[:, 0] != caras[:, 1]) & (caras[:, 1] != caras[:, 2]) & (caras[:, 0] != caras[:, 2])]
+		return caras + seccion*m
+
+	def caras(self, elemento, bloque=64):
+		"""
+			Genera los triángulos de un elemento por bloques de secciones, como
+			índices en nodos.reshape(-1, 3), ya orientados hacia fuera
+			- Devuelve (nodos, generador de arrays k x 3)
+		"""
+		nodos, sentido = self._topologia(elemento)
+		n_secciones, m = nodos.shape[:2]
+
+		def generador():
+			tapas = (self._tapa(m, 0)[:, ::-1], self._tapa(m, n_secciones - 1))
+			for inicio in range(0, n_secciones - 1, bloque):
+				yield self._caras_laterales(m, inicio, min(inicio + bloque, n_secciones - 1))
+			yield from tapas
+
+		if sentido:
+			return nodos, (caras[:, ::-1] for caras in generador())
+		return nodos, generador()
+
+	def volumen(self):
+		"""
+			Volumen encerrado por la superficie triangulada (todos los elementos), sirve
+			para comprobar que es cerrada y está bien orientada
+		"""
+		total = 0.0
+		for elemento in range(self.n_elementos):
+			nodos, bloques = self.caras(elemento)
+			nodos = nodos.reshape(-1, 3)
+			for caras in bloques:
+				a, b, c = nodos[caras[:, 0]], nodos[caras[:, 1]], nodos[caras[:, 2]]
+				total += np.einsum("ij,ij->", a, np.cross(b, c)) / 6
+		return total
+
+	def exportar_stl(self, ruta, bloque=64, nombre="ala"):
+		"""
+			Escribe la superficie en STL binario, bloque a bloque
+			- Devuelve el número de triángulos
+		"""
+		n_triangulos = 0
+		with open(ruta, "wb") as archivo:
+			archivo.write(nombre.encode()[:80].ljust(80, b"\0"))
+			archivo.write(np.uint32(0).tobytes())
+
+			for elemento in range(self.n_elementos):
+				nodos, bloques = self.caras(elemento, bloque)
+				nodos = nodos.reshape(-1, 3).astype("<f4")
+				for caras in bloques:
+					registros = np.zeros(len(caras), dtype=DTYPE_STL)
+					vertices = nodos[caras]
+					normal = np.cross(vertices[:, 1] - vertices[:, 0], vertices[:, 2] - vertices[:, 0])
+					norma = np.linalg.norm(normal, axis=1, keepdims=True)
+					registros["normal"] = normal / np.where(norma > 0, norma, 1)
+					registros["vertices"] = vertices
+					registros.tofile(archivo)
+					n_triangulos += len(caras)
+
+			archivo.seek(80)
+			archivo.write(np.uint32(n_triangulos).tobytes())
+		return n_triangulos
+
+	def exportar_obj(self, ruta, bloque=64, formato="%.9g"):
+		"""
+			Escribe la superficie en OBJ (vértices compartidos, un grupo por elemento),
+			formateando cada bloque con una sola operación de texto
+			- Devuelve el número de triángulos
+		"""
+		n_triangulos = 0
+		desplazamiento = 1
+		with open(ruta, "w") as archivo:
+			for elemento in range(self.n_elementos):
+				nodos, bloques = self.caras(elemento, bloque)
+				nodos = nodos.reshape(-1, 3)
+				archivo.write(f"o elemento_{elemento}\n")
+				linea = f"v {formato} {formato} {formato}\n"
+				for inicio in range(0, len(nodos), 65536):
+					parte = nodos[inicio:inicio + 65536]
+					archivo.write((linea*len(parte)) % tuple(parte.ravel()))
+
+				for caras in bloques:
+					archivo.write(("f %d %d %d\n"*len(caras)) % tuple((caras + desplazamiento).ravel()))
+					n_triangulos += len(caras)
+				desplazamiento += len(nodos)
+		return n_triangulos
+
+	def exportar_step(self, ruta, reglada=False, sesion=None):
+		"""
+			Escribe el ala como sólidos en STEP con el kernel OCC de gmsh: cada
+			elemento es un addThruSections por las secciones de las estaciones (dos
+			splines por sección, como AirfoilSpline, y una línea en el borde de salida
+			si es grueso)
+			- Argumentos:
+				- reglada: superficies regladas entre estaciones (como la malla) en vez
+				  de un loft suave
+				- sesion: MeshSession abierta, si no se abre una solo para esto
+		"""
+		from Generador_de_alas.mallador.sesion import MeshSession
+
+		if sesion is None:
+			with MeshSession() as sesion:
+				return self.exportar_step(ruta, reglada, sesion)
+
+		import gmsh
+
+		# Solo las secciones de las estaciones (sin las intermedias)
+		malla = self.malla()[:, ::self.n_intermedias + 1]
+		with sesion.modelo("ala3d"):
+			occ = gmsh.model.occ
+			for elemento in malla:
+				alambres = []
+				for seccion in elemento:
+					cerrado = np.linalg.norm(seccion[0] - seccion[-1]) <= 1e-9*self.estaciones[0].cuerda
+					puntos = [occ.addPoint(*p) for p in (seccion[:-1] if cerrado else seccion)]
+					if cerrado:
+						puntos.append(puntos[0])
+					curvas = [
+						occ.addSpline(puntos[:self.n_puntos]),
+						occ.addSpline(puntos[self.n_puntos - 1:]),
+					]
+					if not cerrado:
+						curvas.append(occ.addLine(puntos[-1], puntos[0]))
+					alambres.append(occ.addWire(curvas))
+				occ.addThruSections(alambres, makeSolid=True, makeRuled=reglada)
+			occ.synchronize()
+			gmsh.write(ruta)
+		return ruta
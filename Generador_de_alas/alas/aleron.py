@@ -1,15 +1,19 @@
-from datetime import datetime
 import os
 import re
 
 import numpy as np
 from math import sqrt
-from scipy.interpolate import interp1d
 #from scipy.misc import derivative
-import matplotlib.pyplot as plt
 
 import Generador_de_alas.alas.airfoils
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.alas.graficos import figura_agg, nombre_unico
 from Generador_de_alas.alas.airfoils import *
+from Generador_de_alas.alas.fileio import SEPARATOR_JAVAFOIL, write_airfoil_records
+from Generador_de_alas.alas.polares import polar
+
+
+plt = perezoso("matplotlib.pyplot")
 
 
 def gaps_normalizados(cuerda, aoa, gaps):
@@ -33,14 +37,19 @@ def gaps_normalizados(cuerda, aoa, gaps):
 
 
 class Alerón:
-	def __init__(self, foils, gaps=None, meta=None):
+	def __init__(self, foils, gaps=None, meta=None, colocar=True):
+		"""
+			- colocar: False si los foils ya están en su sitio (p.ej. al leerlos de
+			  un archivo binario, ver binario.py), no se llama a ajustarCoords
+		"""
 		self.foils = foils # Una lista con todos los airfoils del alerón
 		self.meta = meta
-		self.gaps = [[0, 0] for i in range(0, len(foils)-1)] if gaps == None else gaps
+		self.gaps = [[0, 0] for i in range(0, len(foils)-1)] if gaps is None else gaps
 		self.cuerdaTotal = 0
 		self.AOATotal = 0
 
-		self.ajustarCoords()
+		if colocar:
+			self.ajustarCoords()
 
 	def ajustarCoords(self):
 		currentx, currenty = 0, 0
@@ -66,12 +75,21 @@ class Alerón:
 		for foil in self.foils:
 			foil.rotar(alfa)
 
+	def polar(self, alfas, referencia="cuerda", cache=None, **kwargs):
+		"""
+			Polar no viscosa (método de paneles) para todos los ángulos 'alfas' a la vez,
+			sin tocar la geometría. Ver polares.polar
+		"""
+		return polar(self, alfas, referencia=referencia, cache=cache, **kwargs)
+
 	def plot(self, *, show=True, save=False, settings={}):
 		"""
 		Plot the airfoil and camber line
 
 		Note:
 			* 'show' and/or 'save' must be True
+			* Without 'show' the figure is drawn with Agg, without pyplot
+			* The figure is always closed before returning
 
 		Args:
 			:show: (bool) Create an interactive plot
@@ -92,7 +110,7 @@ class Alerón:
 			None or 'file_name' (full path) if 'save' is True
 		"""
 
-		fig = plt.figure()
+		fig = plt.figure() if show else figura_agg()
 		ax = fig.add_subplot(1, 1, 1)
 		ax.set_xlim([0, 1])
 		ax.set_xlabel('x')
@@ -114,22 +132,24 @@ class Alerón:
 		if settings.get('chord', False):
 			pass
 
-		plt.subplots_adjust(left=0.10, bottom=0.10, right=0.98, top=0.98, wspace=None, hspace=None)
+		fig.subplots_adjust(left=0.10, bottom=0.10, right=0.98, top=0.98, wspace=None, hspace=None)
 
 		if show:
 			plt.show()
 
+		file_name = None
 		if save:
 			path = settings.get('path', '.')
 			file_name = settings.get('file_name', False)
 
 			if not file_name:
-				now = datetime.strftime(datetime.now(), format='%F_%H%M%S')
-				file_type = 'png'
-				file_name = f'airfoils_{now}.{file_type}'
+				file_name = nombre_unico('airfoils')
 
 			fig.savefig(os.path.join(path, file_name))
-			return file_name
+
+		if show:
+			plt.close(fig)
+		return file_name
 
 	def exportar(self, separadores=", ", comaDec=False, coordz=True, carpeta=".", sameFile=False, inFileSeparador="\n\n"):
 		"""
@@ -140,20 +160,29 @@ class Alerón:
 			- sameFile: exportar el alerón en 1 solo archivo o en varios (para javafoil principalmente)
 			- inFileSeparador: como separar cada elemento del alerón si se exporta en el mismo archivo
 		"""
-		result = ""
 		if not os.path.exists(carpeta):
 			os.makedirs(carpeta)
 
-		for foil in self.foils:
-			result += foil.exportar(separador=separadores, comaDec=comaDec, coordz=coordz, toFile= not sameFile, filename= carpeta + "/" + str(foil.meta["name"]) + ".txt")
-			if sameFile:
-				result += inFileSeparador
+		if not sameFile:
+			for foil in self.foils:
+				foil.exportar(separador=separadores, comaDec=comaDec, coordz=coordz, toFile=True, filename=carpeta + "/" + str(foil.meta["name"]) + ".txt")
+			return
 
-		result = result[0: -len(inFileSeparador)] # Quitar el ultimo separador (javafoil)
+		# Cada elemento se escribe según se formatea, sin juntar todo el texto
+		write_airfoil_records(
+			self.registros(), carpeta + "/" + str(self.meta["name"]) + ".txt",
+			record_separator=inFileSeparador,
+			separator=separadores, decimal_comma=comaDec, z_coordinate=coordz
+		)
 
-		if sameFile:
-			with open(carpeta + "/" + str(self.meta["name"]) + ".txt", "w") as file:
-				file.write(result)
+	def registros(self):
+		"""
+			Generador con (nombre, extradós, intradós) de cada elemento, como los
+			de fileio.iter_airfoil_records
+		"""
+		for foil in self.foils:
+			nombre = foil.meta.get("name") if foil.meta else None
+			yield nombre, (foil._x_upper, foil._y_upper), (foil._x_lower, foil._y_lower)
 
 	def exportarJavaFoil(self, carpeta="."):
-		return self.exportar(separadores="\t", comaDec=True, coordz=False, carpeta=carpeta, sameFile=True, inFileSeparador="9999,9\t9999,9\n")
\ No newline at end of file
+		return self.exportar(separadores="\t", comaDec=True, coordz=False, carpeta=carpeta, sameFile=True, inFileSeparador=SEPARATOR_JAVAFOIL)
\ No newline at end of file
@@ -0,0 +1,366 @@
+"""
+Formato binario para guardar muchos alerones en un solo archivo
+
+El texto de Airfoil.exportar/Alerón.exportar pierde las cuerdas, los ángulos,
+los huecos y el meta, y no sirve para barridos de millones de configuraciones.
+Aquí cada alerón es un registro de tamaño fijo (un dtype estructurado de NumPy),
+así que se puede leer cualquiera sin recorrer el archivo y abrir el archivo con
+np.memmap sin copiar nada a memoria.
+
+Estructura del archivo (enteros little-endian):
+
+	cabecera fija	MAGICO, versión, bytes del JSON, n_registros, inicio del meta
+	JSON			forma de los registros y meta del archivo (rellenado hasta
+					múltiplo de ALINEACION)
+	registros		n_registros x dtype_registro(...)
+	meta			el meta de cada registro en JSON, uno detrás de otro
+	índice			n_registros + 1 desplazamientos (uint64) dentro del meta
+
+n_registros y el inicio del meta se escriben al cerrar el archivo, como los
+contadores de escritura_su2: los registros se escriben según llegan, sin
+tenerlos todos en memoria.
+
+Cada lado de cada perfil tiene su propio número de puntos (con Airfoil(...,
+tolerance=...) cambia de un elemento a otro y de una configuración a otra): el
+registro guarda esos números en n_puntos y los lados se rellenan hasta los puntos
+máximos del archivo repitiendo el último punto (el borde de salida). Los archivos
+de la versión 1 (el mismo número de puntos para todos) se siguen leyendo.
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+
+import numpy as np
+
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.aleron import Alerón
+
+
+MAGICO = b"\x89ALERON\n"
+VERSION = 2
+CABECERA = struct.Struct("<8sIIQQ")
+ALINEACION = 64
+
+
+class FormatoBinarioError(Exception):
+	"""Archivo que no es del formato o de una versión que no se sabe leer"""
+
+	pass
+
+
+def dtype_registro(n_elementos, n_extrados, n_intrados, precision="f8", version=VERSION):
+	"""
+		dtype estructurado de un alerón
+		- Argumentos:
+			- n_elementos: número de perfiles
+			- n_extrados, n_intrados: puntos máximos de cada lado de los perfiles
+			- precision: "f8" o "f4" para las coordenadas (el resto siempre f8)
+			- version: la del formato del archivo (la 1 no tiene n_puntos)
+	"""
+	coordenadas = np.dtype(precision).newbyteorder("<")
+	puntos = [("n_puntos", "<i4", (n_elementos, 2))] if version >= 2 else []
+	return np.dtype(puntos + [
+		("cuerda_total", "<f8"),
+		("aoa_total", "<f8"),
+		("cuerdas", "<f8", (n_elementos,)),
+		("aoas", "<f8", (n_elementos,)),
+		("factores", "<f8", (n_elementos,)),
+		("gaps", "<f8", (max(n_elementos - 1, 0), 2)),
+		("transformaciones", "<f8", (n_elementos, 3, 3)),
+		("extrados", coordenadas, (n_elementos, 2, n_extrados)),
+		("intrados", coordenadas, (n_elementos, 2, n_intrados)),
+	])
+
+
+def _forma(aleron):
+	"""(n_elementos, n_extrados, n_intrados) de un alerón, con los puntos del perfil que más tenga"""
+	return (
+		len(aleron.foils),
+		max(len(foil._x_upper) for foil in aleron.foils),
+		max(len(foil._x_lower) for foil in aleron.foils),
+	)
+
+
+def _rellenar(x, y, n):
+	"""Lado (2 x n) con el último punto repetido hasta tener n puntos"""
+	lado = np.empty((2, n))
+	lado[:, :len(x)] = x, y
+	lado[:, len(x):] = lado[:, len(x) - 1:len(x)]
+	return lado
+
+
+def _a_json(objeto):
+	"""Para json.dumps: arrays y escalares de NumPy como listas y números"""
+	if hasattr(objeto, "tolist"):
+		return objeto.tolist()
+	return str(objeto)
+
+
+def registro(aleron, dtype):
+	"""
+		Registro (array de un elemento con 'dtype') con la geometría de un alerón
+	"""
+	n_elementos = dtype["cuerdas"].shape[0]
+	n_extrados = dtype["extrados"].shape[-1]
+	n_intrados = dtype["intrados"].shape[-1]
+	forma = _forma(aleron)
+	if forma[0] != n_elementos or forma[1] > n_extrados or forma[2] > n_intrados:
+		raise ValueError(
+			f"El alerón no cabe en el archivo: {n_elementos} elementos con hasta "
+			f"{n_extrados} + {n_intrados} puntos, y tiene {forma[0]} con hasta {forma[1]} + {forma[2]}"
+		)
+
+	salida = np.zeros(1, dtype=dtype)
+	r = salida[0]
+	r["cuerda_total"] = aleron.cuerdaTotal
+	r["aoa_total"] = aleron.AOATotal
+	if n_elementos > 1:
+		r["gaps"] = aleron.gaps
+	for i, foil in enumerate(aleron.foils):
+		r["cuerdas"][i] = foil.cuerda
+		r["aoas"][i] = foil.aoa
+		r["factores"][i] = foil.norm_factor
+		r["transformaciones"][i] = foil.transformacion
+		r["n_puntos"][i] = len(foil._x_upper), len(foil._x_lower)
+		r["extrados"][i] = _rellenar(foil._x_upper, foil._y_upper, n_extrados)
+		r["intrados"][i] = _rellenar(foil._x_lower, foil._y_lower, n_intrados)
+	return salida
+
+
+def meta_de(aleron):
+	"""Meta de un alerón y de sus perfiles, lo que se guarda como JSON"""
+	return {"meta": aleron.meta, "foils": [foil.meta for foil in aleron.foils]}
+
+
+class EscritorAlerones:
+	"""
+		Escribe alerones en un archivo binario según llegan
+
+		with EscritorAlerones("barrido.alr", 3, 60, 60) as escritor:
+			for aleron in barrido:
+				escritor.escribir(aleron)
+
+		n_extrados y n_intrados son los puntos máximos de cada lado: caben alerones
+		con menos (ver la cabecera del módulo)
+
+		- Atributos:
+			- ruta: archivo de salida
+			- dtype: dtype de cada registro (ver dtype_registro)
+			- n_registros: registros escritos hasta ahora
+	"""
+
+	def __init__(self, ruta, n_elementos, n_extrados, n_intrados, precision="f8", meta=None):
+		self.ruta = ruta
+		self.dtype = dtype_registro(n_elementos, n_extrados, n_intrados, precision)
+		self.n_registros = 0
+
+		cabecera = {
+			"n_elementos": n_elementos,
+			"n_extrados": n_extrados,
+			"n_intrados": n_intrados,
+			"precision": np.dtype(precision).str[1:],
+			"bytes_registro": self.dtype.itemsize,
+			"meta": meta,
+		}
+		texto = json.dumps(cabecera, default=_a_json, ensure_ascii=False).encode()
+		texto += b" "*(-(CABECERA.size + len(texto)) % ALINEACION)
+
+		self._archivo = open(ruta, "wb")
+		self._archivo.write(CABECERA.pack(MAGICO, VERSION, len(texto), 0, 0))
+		self._archivo.write(texto)
+		# El meta de cada registro va aparte hasta cerrar
+		self._meta = tempfile.TemporaryFile()
+		self._indice = array("Q", [0])
+
+	def escribir(self, aleron, meta=None):
+		"""
+			Añade un alerón; 'meta' sustituye a meta_de(aleron) si se da
+		"""
+		self.escribir_registros(registro(aleron, self.dtype), [meta_de(aleron) if meta is None else meta])
+
+	def escribir_registros(self, registros, metas=None):
+		"""
+			Añade registros ya hechos (array con self.dtype), p.ej. un lote de un
+			barrido calculado directamente sobre los arrays
+			- metas: lista con el meta de cada registro (None por defecto)
+		"""
+		registros = np.asarray(registros)
+		if registros.dtype != self.dtype:
+			raise ValueError("Los registros no tienen el dtype del archivo")
+		metas = [None]*len(registros) if metas is None else metas
+		if len(metas) != len(registros):
+			raise ValueError(f"Hay {len(registros)} registros y {len(metas)} metas")
+
+		self._archivo.write(registros.tobytes())
+		for meta in metas:
+			self._meta.write(json.dumps(meta, default=_a_json, ensure_ascii=False).encode())
+			self._indice.append(self._meta.tell())
+		self.n_registros += len(registros)
+
+	def cerrar(self):
+		"""
+			Añade el meta y el índice y completa la cabecera
+		"""
+		if self._archivo.closed:
+			return
+		inicio_meta = self._archivo.tell()
+		self._meta.seek(0)
+		shutil.copyfileobj(self._meta, self._archivo)
+		self._meta.close()
+		self._archivo.write(self._indice.tobytes())
+
+		self._archivo.seek(CABECERA.size - 16)
+		self._archivo.write(struct.pack("<QQ", self.n_registros, inicio_meta))
+		self._archivo.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *excepcion):
+		self.cerrar()
+
+
+class ArchivoAlerones:
+	"""
+		Lectura de un archivo binario de alerones con np.memmap: abrirlo no lee
+		los registros, y cada acceso lee solo lo que toca
+
+		- Atributos:
+			- ruta
+			- version: versión del formato del archivo
+			- cabecera: el JSON de la cabecera (forma de los registros y meta)
+			- registros: np.memmap de solo lectura con todos los registros
+	"""
+
+	def __init__(self, ruta):
+		self.ruta = ruta
+		with open(ruta, "rb") as archivo:
+			fijo = archivo.read(CABECERA.size)
+			if len(fijo) < CABECERA.size or fijo[:len(MAGICO)] != MAGICO:
+				raise FormatoBinarioError(f"'{ruta}' no es un archivo binario de alerones")
+			_, self.version, longitud, n_registros, inicio_meta = CABECERA.unpack(fijo)
+			if self.version > VERSION:
+				raise FormatoBinarioError(f"'{ruta}' es de la versión {self.version}, solo se lee hasta la {VERSION}")
+			self.cabecera = json.loads(archivo.read(longitud))
+
+		c = self.cabecera
+		dtype = dtype_registro(c["n_elementos"], c["n_extrados"], c["n_intrados"], c["precision"], self.version)
+		if dtype.itemsize != c["bytes_registro"]:
+			raise FormatoBinarioError(f"'{ruta}': el tamaño de registro no cuadra con la cabecera")
+
+		inicio = CABECERA.size + longitud
+		self._inicio_meta = inicio_meta
+		if n_registros == 0:
+			# np.memmap no acepta tamaño 0 (archivo vacío o sin cerrar)
+			self.registros = np.zeros(0, dtype=dtype)
+			self._indice = np.zeros(1, dtype="<u8")
+			return
+
+		self.registros = np.memmap(ruta, dtype=dtype, mode="r", offset=inicio, shape=(n_registros,))
+		# El índice son los últimos bytes del archivo
+		tamano = os.path.getsize(ruta)
+		self._indice = np.memmap(
+			ruta, dtype="<u8", mode="r", offset=tamano - 8*(n_registros + 1), shape=(n_registros + 1,)
+		)
+
+	@property
+	def dtype(self):
+		return self.registros.dtype
+
+	@property
+	def meta_archivo(self):
+		return self.cabecera.get("meta")
+
+	def __len__(self):
+		return len(self.registros)
+
+	def meta(self, i):
+		"""Meta del registro i (vale i negativo, como en una lista)"""
+		i = range(len(self))[i]
+		inicio, final = (int(d) for d in self._indice[i:i + 2])
+		if inicio == final:
+			return None
+		with open(self.ruta, "rb") as archivo:
+			archivo.seek(self._inicio_meta + inicio)
+			return json.loads(archivo.read(final - inicio))
+
+	def __getitem__(self, i):
+		"""
+			Alerón del registro i, con sus Airfoil rehechos (Airfoil.from_processed);
+			para trabajar solo con los números es mejor self.registros[i]
+		"""
+		i = range(len(self))[i]
+		r = self.registros[i]
+		meta = self.meta(i) or {}
+		metas_foils = meta.get("foils") or [None]*len(r["cuerdas"])
+		if "n_puntos" in r.dtype.names:
+			n_puntos = r["n_puntos"]
+		else:
+			n_puntos = [(r["extrados"].shape[-1], r["intrados"].shape[-1])]*len(r["cuerdas"])
+
+		foils = [
+			Airfoil.from_processed(
+				r["extrados"][j, :, :n_puntos[j][0]].astype(float),
+				r["intrados"][j, :, :n_puntos[j][1]].astype(float),
+				cuerda=float(r["cuerdas"][j]),
+				aoa=float(r["aoas"][j]),
+				transformacion=r["transformaciones"][j],
+				norm_factor=float(r["factores"][j]),
+				meta=metas_foils[j],
+			)
+			for j in range(len(r["cuerdas"]))
+		]
+		aleron = Alerón(foils, gaps=r["gaps"].tolist(), meta=meta.get("meta"), colocar=False)
+		aleron.cuerdaTotal = float(r["cuerda_total"])
+		aleron.AOATotal = float(r["aoa_total"])
+		return aleron
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *excepcion):
+		self.cerrar()
+
+	def cerrar(self):
+		"""Suelta los memmap (en Windows el archivo no se puede borrar mientras tanto)"""
+		self.registros = self.registros[:0]
+		self._indice = self._indice[:1]
+
+
+def guardar(alerones, ruta, precision="f8", meta=None, n_extrados=None, n_intrados=None):
+	"""
+		Guarda una lista (o generador) de alerones con el mismo número de elementos
+		- Argumentos:
+			- precision: "f8" o "f4" para las coordenadas
+			- meta: meta del archivo
+			- n_extrados, n_intrados: puntos máximos de cada lado, por defecto los
+			  del primer alerón (con tolerance los siguientes pueden tener más: si
+			  no caben da ValueError)
+		- Devuelve el número de alerones guardados
+	"""
+	alerones = iter(alerones)
+	primero = next(alerones, None)
+	if primero is None:
+		raise ValueError("No hay alerones que guardar")
+
+	n_elementos, extrados, intrados = _forma(primero)
+	n_extrados = extrados if n_extrados is None else n_extrados
+	n_intrados = intrados if n_intrados is None else n_intrados
+	with EscritorAlerones(ruta, n_elementos, n_extrados, n_intrados, precision=precision, meta=meta) as escritor:
+		escritor.escribir(primero)
+		for aleron in alerones:
+			escritor.escribir(aleron)
+	return escritor.n_registros
+
+
+def abrir(ruta):
+	"""ArchivoAlerones de 'ruta'"""
+	return ArchivoAlerones(ruta)
@@ -0,0 +1,150 @@
+"""
+Borde de ataque y borde de salida de un contorno de perfil por su geometría
+
+Sirve para contornos ordenados de cualquier origen (archivos de otros programas,
+perfiles densificados, elementos muy girados), sin suponer un número de puntos
+ni que x valga exactamente 0 o 1 en los bordes:
+	- borde de salida: el pico de curvatura del contorno (el mayor ángulo de giro
+	  entre segmentos), o un borde romo si hay dos esquinas unidas por un tramo
+	  corto (la base) que entre las dos giran más que el pico. El hueco entre el
+	  último y el primer punto cuenta como un segmento más
+	- borde de ataque: el punto más alejado del punto medio del borde de salida
+
+Todo es vectorial y O(n) (salvo las parejas de esquinas, que son muy pocas).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# Ángulo de giro (grados) a partir del cual un vértice es una esquina del borde
+# de salida romo
+ANGULO_ESQUINA = 60.0
+# Longitud máxima de la base de un borde de salida romo, en fracción del tamaño
+# del perfil
+BASE_MAXIMA = 0.1
+
+
+Bordes = namedtuple("Bordes", ["salida", "ataque", "romo"])
+Bordes.__doc__ = """
+	Índices de los bordes en el contorno (sin el punto de cierre repetido)
+	- salida: (i, j), primer y último punto del contorno recorrido desde el borde
+	  de salida (i == j si es afilado)
+	- ataque: índice del borde de ataque
+	- romo: si el borde de salida tiene base (i != j)
+"""
+
+
+def _sin_repetidos(puntos, tolerancia):
+	"""Índices de los puntos que no repiten al anterior (ni el último al primero)"""
+	distinto = np.ones(len(puntos), dtype=bool)
+	distinto[1:] = np.linalg.norm(np.diff(puntos, axis=0), axis=1) > tolerancia
+	if len(puntos) > 1 and np.linalg.norm(puntos[-1] - puntos[0]) <= tolerancia:
+		distinto[-1] = False
+	return np.flatnonzero(distinto)
+
+
+def angulos_giro(puntos):
+	"""
+		Ángulo de giro (grados, 0 = sigue recto) en cada vértice del contorno,
+		cerrándolo del último punto al primero
+	"""
+	puntos = np.asarray(puntos, dtype=float)[:, :2]
+	entrada = puntos - np.roll(puntos, 1, axis=0)
+	salida = np.roll(puntos, -1, axis=0) - puntos
+	cruz = entrada[:, 0]*salida[:, 1] - entrada[:, 1]*salida[:, 0]
+	punto = np.einsum("ij,ij->i", entrada, salida)
+	return np.degrees(np.abs(np.arctan2(cruz, punto)))
+
+
+def _bordes(puntos, angulo_esquina, base_maxima, tolerancia):
+	"""
+		Bordes en el contorno sin repetidos: (índices de los puntos que quedan,
+		inicio, final, ataque, romo), los tres índices sobre esos puntos
+	"""
+	tamano = np.ptp(puntos, axis=0).max()
+	indices = _sin_repetidos(puntos, tolerancia*max(tamano, 1.0))
+	if len(indices) < 3:
+		raise ValueError(f"Un contorno necesita al menos 3 puntos distintos, hay {len(indices)}")
+
+	p = puntos[indices]
+	giro = angulos_giro(p)
+
+	# Longitud de arco hasta cada punto, con el segmento de cierre al final
+	segmentos = np.linalg.norm(np.roll(p, -1, axis=0) - p, axis=1)
+	s = np.concatenate(([0], np.cumsum(segmentos)))
+	perimetro = s[-1]
+
+	# Borde romo: dos esquinas unidas por un tramo corto (la base). Las esquinas
+	# son pocas, así que se prueban todas las parejas
+	esquinas = np.flatnonzero(giro >= angulo_esquina)
+	mejor, romo = float(giro.max()), False
+	for k, i in enumerate(esquinas):
+		for j in esquinas[k + 1:]:
+			tramo = s[j] - s[i]
+			if min(tramo, perimetro - tramo) <= base_maxima*tamano and giro[i] + giro[j] > mejor:
+				mejor, romo = giro[i] + giro[j], True
+				# La base va de 'desde' a 'hasta' por el lado corto
+				desde, hasta = (i, j) if tramo <= perimetro - tramo else (j, i)
+
+	if romo:
+		# El contorno empieza al final de la base y acaba al principio
+		inicio, final = hasta, desde
+	else:
+		# Borde afilado: el pico de curvatura
+		inicio = final = int(np.argmax(giro))
+
+	# Borde de ataque: el más alejado del punto medio del borde de salida
+	borde_salida = 0.5*(p[inicio] + p[final])
+	ataque = int(np.argmax(np.einsum("ij,ij->i", p - borde_salida, p - borde_salida)))
+	return indices, inicio, final, ataque, bool(romo)
+
+
+def bordes(puntos, angulo_esquina=ANGULO_ESQUINA, base_maxima=BASE_MAXIMA, tolerancia=1e-12):
+	"""
+		Bordes de un contorno ordenado (en cualquier sentido y empezando en
+		cualquier punto)
+		- Argumentos:
+			- puntos: array N x 2 (o N x 3, z se ignora)
+			- angulo_esquina, base_maxima: ver ANGULO_ESQUINA y BASE_MAXIMA
+			- tolerancia: distancia (relativa al tamaño del perfil) por debajo de
+			  la cual dos puntos seguidos son el mismo
+		- Devuelve un Bordes con índices de 'puntos'
+	"""
+	puntos = np.asarray(puntos, dtype=float)[:, :2]
+	indices, inicio, final, ataque, romo = _bordes(puntos, angulo_esquina, base_maxima, tolerancia)
+	return Bordes((int(indices[inicio]), int(indices[final])), int(indices[ataque]), romo)
+
+
+def ordenar_contorno(puntos, angulo_esquina=ANGULO_ESQUINA, base_maxima=BASE_MAXIMA, tolerancia=1e-12):
+	"""
+		Contorno recorrido desde el borde de salida, en el mismo sentido que
+		'puntos': borde de salida -> un lado -> borde de ataque -> el otro lado ->
+		borde de salida (el orden de Airfoil.exportar), sin puntos repetidos
+		- Argumentos:
+			- puntos: array N x 2 o N x 3
+			- el resto como bordes
+		- Devuelve (puntos ordenados, índice del borde de ataque en ellos, romo).
+		  Con el borde afilado el primer y el último punto son el mismo
+	"""
+	puntos = np.asarray(puntos, dtype=float)
+	indices, inicio, final, ataque, romo = _bordes(puntos[:, :2], angulo_esquina, base_maxima, tolerancia)
+	# Del borde de salida al borde de salida, sin los puntos intermedios de la base
+	orden = np.roll(indices, -inicio)
+	if romo:
+		orden = orden[:(final - inicio) % len(indices) + 1]
+	else:
+		orden = np.append(orden, orden[0])
+	return puntos[orden], (ataque - inicio) % len(indices), romo
+
+
+def separar_lados(puntos, **opciones):
+	"""
+		Los dos lados de un contorno, cada uno del borde de ataque al borde de
+		salida (el primero es el que sale del borde de salida en el sentido de
+		'puntos'; los dos comparten el punto del borde de ataque)
+		- opciones: las de bordes
+	"""
+	ordenados, ataque, _ = ordenar_contorno(puntos, **opciones)
+	return ordenados[ataque::-1], ordenados[ataque:]
@@ -0,0 +1,239 @@
+"""
+Capa límite integral sobre la solución del método de paneles
+
+Estimación rápida de la resistencia viscosa y de la separación sin CFD:
+	- laminar: Thwaites (con las correlaciones de H y l de Cebeci-Bradshaw)
+	- transición: método e^N de envolvente (Drela-Giles), o separación laminar
+	- turbulenta: método de Head (entrainment) con la fricción de Ludwieg-Tillmann
+	- resistencia: Squire-Young en el borde de salida de cada lado de cada elemento
+
+Cada lado de cada elemento (del punto de remanso al borde de salida) es una
+"corriente". Todas las corrientes de todos los ángulos se remuestrean a la misma
+malla en fracción de longitud de arco, de forma que la parte laminar (integrales
+acumuladas) es vectorial a lo largo de la superficie, y la turbulenta (una EDO)
+avanza paso a paso pero con todas las corrientes a la vez.
+
+No hay interacción entre capas límite y estelas de distintos elementos (capas
+confluyentes) ni corrección de la solución no viscosa: el Cd es orientativo y en
+cuanto hay separación (separado=True) deja de ser fiable.
+"""
+
+import numpy as np
+
+
+NCRIT = 9
+H_SEPARACION_TURBULENTA = 2.4
+LAMBDA_SEPARACION_LAMINAR = -0.09
+# La deceleración no viscosa en el mismo borde de salida es mucho más brusca que la
+# real (sin el espesor de desplazamiento): ahí no se marca separación
+FRACCION_SIN_SEPARACION = 0.02
+
+
+def _trapecio_acumulado(y, s):
+	"""Integral acumulada por trapecios a lo largo del eje 1 (empieza en 0)"""
+	tramos = 0.5*(y[:, 1:] + y[:, :-1])*np.diff(s, axis=1)
+	return np.concatenate((np.zeros((len(y), 1)), np.cumsum(tramos, axis=1)), axis=1)
+
+
+def _interp_filas(x, xp, fp):
+	"""
+		np.interp fila a fila de una vez: x (F x M), xp (N,) creciente, fp (F x N)
+	"""
+	n_filas = len(fp)
+	salto = (xp[-1] - xp[0]) + 1.0
+	desplazamiento = salto*np.arange(n_filas)[:, None]
+	return np.interp(
+		(x + desplazamiento).ravel(),
+		(xp[None, :] + desplazamiento).ravel(),
+		fp.ravel()
+	).reshape(x.shape)
+
+
+def thwaites_h_l(lam):
+	"""
+		Factor de forma H y l = Cf Re_theta / 2 en función del parámetro de Thwaites
+	"""
+	lam = np.clip(lam, -0.1, 0.1)
+	favorable = lam >= 0
+	h = np.where(favorable, 2.61 - 3.75*lam + 5.24*lam**2, 2.088 + 0.0731/(lam + 0.14))
+	l = np.where(favorable, 0.22 + 1.57*lam - 1.8*lam**2, 0.22 + 1.402*lam + 0.018*lam/(lam + 0.107))
+	return h, l
+
+
+def tasa_amplificacion(h, l, theta):
+	"""
+		dN/ds de la envolvente e^N (Drela-Giles) para un perfil de Falkner-Skan de
+		factor de forma h, y Re_theta crítico a partir del que empieza a crecer
+		- Devuelve (dN/ds, Re_theta crítico)
+	"""
+	h = np.maximum(h, 1.05)
+	dn_dre = 0.01*np.sqrt((2.4*h - 3.7 + 2.5*np.tanh(1.5*h - 4.65))**2 + 0.25)
+	log_re0 = (1.415/(h - 1) - 0.489)*np.tanh(20/(h - 1) - 12.9) + 3.295/(h - 1) + 0.44
+	l_fs = (6.54*h - 14.07)/h**2
+	m_fs = (0.058*(h - 4)**2/(h - 1) - 0.068)/l_fs
+	return dn_dre*0.5*(m_fs + 1)*l_fs/theta, 10**log_re0
+
+
+def h1_desde_h(h):
+	"""Factor de forma de entrainment H1(H) de Head"""
+	h = np.maximum(h, 1.11)
+	return np.where(h <= 1.6, 3.3 + 0.8234*(h - 1.1)**-1.287, 3.3 + 1.5501*(h - 0.6778)**-3.064)
+
+
+def h_desde_h1(h1):
+	"""Inversa de h1_desde_h"""
+	h1 = np.maximum(h1, 3.31)
+	return np.where(h1 >= 5.3, 1.1 + 0.86*(h1 - 3.3)**-0.777, 0.6778 + 1.1536*(h1 - 3.3)**-0.326)
+
+
+def corrientes(puntos, v, cuerpo_panel, n_puntos=120):
+	"""
+		Separa la velocidad en la superficie de cada elemento en las dos corrientes
+		que salen del punto de remanso, remuestreadas a 'n_puntos'. El panel del
+		propio borde de salida se descarta: con el borde de salida cerrado su
+		velocidad no es fiable
+		- Argumentos:
+			- puntos, v, cuerpo_panel: como en polares.polar (v n_alfas x n_paneles)
+		- Devuelve un diccionario con arrays (n_alfas, n_cuerpos, 2, n_puntos), el
+		  lado 0 es el que va hacia el principio del contorno (extradós en el orden
+		  de Airfoil.exportar) y el 1 hacia el final:
+			- s: distancia al punto de remanso a lo largo de la superficie
+			- ue: velocidad en el borde de la capa límite (/ V_inf)
+			- x, y: posición
+	"""
+	v = np.atleast_2d(v)
+	n_alfas = len(v)
+	n_cuerpos = int(cuerpo_panel.max()) + 1
+	xi = 0.5*(1 - np.cos(np.linspace(0, np.pi, n_puntos)))
+
+	salida = {clave: np.zeros((n_alfas, n_cuerpos, 2, n_puntos)) for clave in ("s", "ue", "x", "y")}
+	filas = np.arange(n_alfas)
+
+	for i in range(n_cuerpos):
+		indices = np.flatnonzero(cuerpo_panel == i)[1:-1]
+		p = puntos[indices]
+		g = v[:, indices]
+		longitudes = np.linalg.norm(np.diff(p, axis=0), axis=1)
+		s_puntos = np.concatenate(([0], np.cumsum(longitudes)))
+		total = s_puntos[-1]
+
+		# Remanso: el cambio de signo de la velocidad más cercano al borde de ataque
+		cambio = np.signbit(g[:, :-1]) != np.signbit(g[:, 1:])
+		borde_ataque = np.argmin(p[:, 0])
+		distancia = np.where(cambio, np.abs(np.arange(len(longitudes)) - borde_ataque), np.inf)
+		k = np.argmin(distancia, axis=1)
+		ga, gb = g[filas, k], g[filas, k + 1]
+		t = np.where(ga != gb, ga/(ga - gb), 0.5)
+		s_remanso = s_puntos[k] + t*longitudes[k]
+
+		for lado in range(2):
+			if lado == 0:
+				largo = s_remanso
+				s_consulta = s_remanso[:, None] - xi[None, :]*largo[:, None]
+			else:
+				largo = total - s_remanso
+				s_consulta = s_remanso[:, None] + xi[None, :]*largo[:, None]
+
+			salida["s"][:, i, lado] = xi[None, :]*largo[:, None]
+			salida["ue"][:, i, lado] = np.abs(_interp_filas(s_consulta, s_puntos, g))
+			for eje, clave in enumerate(("x", "y")):
+				coordenada = np.broadcast_to(p[:, eje], g.shape)
+				salida[clave][:, i, lado] = _interp_filas(s_consulta, s_puntos, coordenada)
+
+	return salida
+
+
+def capa_limite(puntos, v, cuerpo_panel, reynolds, cuerda_ref=1.0, ncrit=NCRIT, n_puntos=120):
+	"""
+		Capa límite de todas las corrientes de todos los ángulos a la vez
+		- Argumentos:
+			- puntos, v, cuerpo_panel: solución no viscosa (ver polares.polar)
+			- reynolds: número de Reynolds con la cuerda de referencia
+			- cuerda_ref: la misma que en la polar
+			- ncrit: N de transición (9 es un túnel normal, más bajo = más turbulencia)
+		- Devuelve un diccionario con arrays (n_alfas, n_cuerpos, 2) salvo que se diga:
+			- Cd: resistencia total (n_alfas,)
+			- Cd_elementos: resistencia de cada elemento (n_alfas, n_cuerpos)
+			- x_transicion: x donde transiciona cada lado (nan si llega laminar al final)
+			- separacion_laminar: la transición la fuerza una separación laminar (burbuja)
+			- x_separacion: x donde se separa la capa turbulenta (nan si no se separa)
+			- separado: si hay separación turbulenta antes del borde de salida
+			- theta, H: espesor de cantidad de movimiento y factor de forma en el borde
+			  de salida
+	"""
+	c = corrientes(puntos, v, cuerpo_panel, n_puntos)
+	forma = c["s"].shape
+	n_corrientes = int(np.prod(forma[:-1]))
+	s = c["s"].reshape(n_corrientes, n_puntos)
+	ue = np.maximum(c["ue"].reshape(n_corrientes, n_puntos), 1e-6)
+	x = c["x"].reshape(n_corrientes, n_puntos)
+	cuenta_separacion = s < (1 - FRACCION_SIN_SEPARACION)*s[:, -1:]
+	nu = cuerda_ref/reynolds
+	filas = np.arange(n_corrientes)
+
+	# Velocidades adimensionales con V_inf = 1
+	ds = np.maximum(np.diff(s, axis=1), 1e-300)
+	due = np.gradient(ue, axis=1)/np.gradient(s, axis=1).clip(1e-300)
+
+	# Laminar: Thwaites, con el límite del punto de remanso en el primer punto
+	integral = _trapecio_acumulado(ue**5, s)
+	theta2 = 0.45*nu*integral/ue**6
+	theta2[:, 0] = 0.075*nu/np.maximum(due[:, 0], 1e-6)
+	theta = np.sqrt(np.maximum(theta2, 1e-300))
+	lam = theta2*due/nu
+	h, l = thwaites_h_l(lam)
+
+	# Transición: e^N integrado a lo largo de la superficie, o separación laminar
+	re_theta = ue*theta/nu
+	dn, re0 = tasa_amplificacion(h, l, theta)
+	n_amplificacion = _trapecio_acumulado(np.where(re_theta > re0, dn, 0), s)
+	separa_laminar = (lam < LAMBDA_SEPARACION_LAMINAR) & cuenta_separacion
+	separa_laminar[:, :2] = False
+	transiciona = (n_amplificacion >= ncrit) | separa_laminar
+	hay_transicion = transiciona.any(axis=1)
+	i_transicion = np.where(hay_transicion, np.argmax(transiciona, axis=1), n_puntos - 1)
+	burbuja = hay_transicion & separa_laminar[filas, i_transicion] & (n_amplificacion[filas, i_transicion] < ncrit)
+
+	# Turbulenta: Head, todas las corrientes a la vez desde su punto de transición
+	theta_t = theta[filas, i_transicion].copy()
+	h_t = np.full(n_corrientes, 1.4)
+	q = ue[filas, i_transicion]*theta_t*h1_desde_h(h_t)
+	i_separacion = np.full(n_corrientes, n_puntos - 1)
+	separado = np.zeros(n_corrientes, dtype=bool)
+
+	for k in range(int(i_transicion.min()), n_puntos - 1):
+		activa = hay_transicion & (k >= i_transicion)
+		if not activa.any():
+			continue
+		ue_k = ue[:, k]
+		re_t = np.maximum(ue_k*theta_t/nu, 1.0)
+		cf = 0.246*10**(-0.678*h_t)*re_t**-0.268
+		h1 = q/(ue_k*theta_t)
+		dtheta = 0.5*cf - (h_t + 2)*theta_t/ue_k*due[:, k]
+		dq = ue_k*0.0306*np.maximum(h1 - 3, 1e-3)**-0.6169
+
+		theta_t = np.where(activa, np.maximum(theta_t + dtheta*ds[:, k], 1e-12), theta_t)
+		q = np.where(activa, q + dq*ds[:, k], q)
+		h_t = np.where(activa, np.clip(h_desde_h1(q/(ue[:, k + 1]*theta_t)), 1.1, 3.0), h_t)
+
+		nueva = activa & ~separado & (h_t >= H_SEPARACION_TURBULENTA) & cuenta_separacion[:, k + 1]
+		i_separacion[nueva] = k + 1
+		separado |= nueva
+
+	# Borde de salida: turbulento si ha habido transición, si no el laminar
+	theta_bs = np.where(hay_transicion, theta_t, theta[:, -1])
+	h_bs = np.where(hay_transicion, h_t, h[:, -1])
+	cd_lado = 2*theta_bs/cuerda_ref*ue[:, -1]**(0.5*(h_bs + 5))
+
+	dar_forma = lambda a: a.reshape(forma[:-1])
+	cd_elementos = dar_forma(cd_lado).sum(axis=2)
+	return {
+		"Cd": cd_elementos.sum(axis=1),
+		"Cd_elementos": cd_elementos,
+		"x_transicion": dar_forma(np.where(hay_transicion, x[filas, i_transicion], np.nan)),
+		"separacion_laminar": dar_forma(burbuja),
+		"x_separacion": dar_forma(np.where(separado, x[filas, i_separacion], np.nan)),
+		"separado": dar_forma(separado),
+		"theta": dar_forma(theta_bs),
+		"H": dar_forma(h_bs),
+	}
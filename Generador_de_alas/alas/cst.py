@@ -0,0 +1,186 @@
+"""
+Parametrización CST (Kulfan, class/shape transformation) de perfiles
+
+Cada lado del perfil es
+
+	y(x) = x^N1 (1 - x)^N2 * sum_i A_i K_i x^i (1 - x)^(n - i) + x dz
+
+con N1 = 0.5, N2 = 1 (borde de ataque redondo y de salida afilado), n el orden de
+los polinomios de Bernstein y dz el espesor del borde de salida de ese lado. Un
+perfil queda en un vector de 2(n + 1) + 2 números:
+
+	[A_extrados (n + 1), A_intrados (n + 1), dz_extrados, dz_intrados]
+
+Para una malla de x fija la relación es lineal, así que el ajuste es un mínimos
+cuadrados y evaluar muchos perfiles a la vez es un producto de matrices con la
+base ya calculada (BaseCST).
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.alas.fileio import import_airfoil_data
+
+
+special = perezoso("scipy.special")
+
+
+ORDEN_CST = 8
+N1 = 0.5
+N2 = 1.0
+# Tramo final de un lado más inclinado que esto (|dy/dx|): es el segmento que
+# cierra un borde de salida grueso (JavaFoil termina los dos lados en (1, 0)),
+# no parte de la superficie
+PENDIENTE_CIERRE = 10.0
+
+
+def matriz_bernstein(x, orden=ORDEN_CST, n1=N1, n2=N2):
+	"""
+		Base CST en los puntos x (en [0, 1]): función de clase por cada polinomio de
+		Bernstein, array (len(x), orden + 1)
+	"""
+	x = np.asarray(x, dtype=float)[:, None]
+	i = np.arange(orden + 1)[None, :]
+	clase = x**n1*(1 - x)**n2
+	return clase*special.comb(orden, i)*x**i*(1 - x)**(orden - i)
+
+
+def n_parametros(orden=ORDEN_CST):
+	return 2*(orden + 1) + 2
+
+
+def orden_de(parametros):
+	"""Orden de Bernstein de un vector (o lote) de parámetros CST"""
+	return (np.shape(parametros)[-1] - 2)//2 - 1
+
+
+def _quitar_cierre(x, y):
+	"""Quita del final del lado los puntos del segmento de cierre del borde de salida"""
+	n = len(x)
+	while n > 2 and abs(y[n - 1] - y[n - 2]) > PENDIENTE_CIERRE*abs(x[n - 1] - x[n - 2]):
+		n -= 1
+	return x[:n], y[:n]
+
+
+def _ajustar_lado(x, y, orden, n1, n2):
+	x, y = _quitar_cierre(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+	dz = y[np.argmax(x)]
+	a, *_ = np.linalg.lstsq(matriz_bernstein(x, orden, n1, n2), y - x*dz, rcond=None)
+	return a, dz
+
+
+def _separar_lados(upper, lower):
+	"""
+		Vuelve a separar extradós e intradós por el punto de menor x, con el borde de
+		ataque en el origen: la separación de import_airfoil_data puede dejar
+		los puntos de al lado del borde de ataque en el lado que no es
+	"""
+	upper = np.asarray(upper, dtype=float)
+	lower = np.asarray(lower, dtype=float)
+	# Contorno seguido: borde de salida -> borde de ataque -> borde de salida
+	if upper[0, 0] < upper[0, -1]:
+		upper = upper[:, ::-1]
+	if lower[0, 0] > lower[0, -1]:
+		lower = lower[:, ::-1]
+	contorno = np.hstack((upper, lower))
+	k = np.argmin(contorno[0])
+	contorno = contorno - contorno[:, k:k + 1]
+
+	lado_a, lado_b = contorno[:, k::-1], contorno[:, k:]
+	if np.mean(lado_a[1]) < np.mean(lado_b[1]):
+		lado_a, lado_b = lado_b, lado_a
+	return lado_a, lado_b
+
+
+def ajustar(upper, lower, orden=ORDEN_CST, n1=N1, n2=N2):
+	"""
+		Ajuste por mínimos cuadrados de los dos lados de un perfil. Con el orden por
+		defecto (ORDEN_CST = 8) el error en y sobre los perfiles de datos_perfiles
+		llega a 3.5e-3 de cuerda junto al borde de ataque (2e-3 medido en normal a la
+		superficie) y a 3.3e-3 en el borde de salida redondeado del 64A-2520, que la
+		clase con N2 = 1 no puede seguir; con orden 10 baja a 3e-3 (1.7e-3 en normal)
+		y 3e-3 (ver benchmarks/bench_ajuste_cst.py)
+		- Argumentos:
+			- upper, lower: arrays 2 x N (x, y) como los de import_airfoil_data, con
+			  cuerda 1 (el borde de ataque se lleva al origen)
+			- orden: orden de los polinomios de Bernstein
+		- Devuelve el vector de parámetros
+	"""
+	upper, lower = _separar_lados(upper, lower)
+	a_upper, dz_upper = _ajustar_lado(upper[0], upper[1], orden, n1, n2)
+	a_lower, dz_lower = _ajustar_lado(lower[0], lower[1], orden, n1, n2)
+	return np.concatenate((a_upper, a_lower, [dz_upper, dz_lower]))
+
+
+def ajustar_archivo(ruta, orden=ORDEN_CST, n1=N1, n2=N2):
+	"""
+		Ajuste directo de un archivo de coordenadas (p.ej. de datos_perfiles);
+		import_airfoil_data ya lo deja con cuerda 1
+	"""
+	upper, lower = import_airfoil_data(ruta)
+	return ajustar(upper, lower, orden, n1, n2)
+
+
+def ajustar_airfoil(foil, orden=ORDEN_CST, n1=N1, n2=N2):
+	"""
+		Ajuste de un Airfoil recién creado (cuerda 1, sin escalar ni girar)
+	"""
+	return ajustar(
+		(foil._x_upper, foil._y_upper),
+		(foil._x_lower, foil._y_lower),
+		orden, n1, n2
+	)
+
+
+class BaseCST:
+	"""
+		Base CST precalculada sobre una malla de x compartida, para evaluar lotes
+		de perfiles con un producto de matrices
+
+		- Atributos:
+			- x: malla de x (por defecto cosenoidal, más puntos en los bordes)
+			- orden, n1, n2: como en matriz_bernstein
+			- base: matriz_bernstein(x) (len(x), orden + 1)
+	"""
+
+	def __init__(self, x=None, n_puntos=121, orden=ORDEN_CST, n1=N1, n2=N2):
+		if x is None:
+			x = 0.5*(1 - np.cos(np.linspace(0, np.pi, n_puntos)))
+		self.x = np.asarray(x, dtype=float)
+		self.orden = orden
+		self.base = matriz_bernstein(self.x, orden, n1, n2)
+
+	def evaluar(self, parametros):
+		"""
+			y de extradós e intradós para un lote de parámetros
+			- Argumentos:
+				- parametros: (n_parametros,) o (n_perfiles, n_parametros)
+			- Devuelve (y_upper, y_lower), de forma (n_perfiles, len(x)) (o (len(x),)
+			  para un solo vector)
+		"""
+		parametros = np.asarray(parametros, dtype=float)
+		if orden_de(parametros) != self.orden:
+			raise ValueError(f"Parámetros de orden {orden_de(parametros)} para una base de orden {self.orden}")
+
+		lote = np.atleast_2d(parametros)
+		n = self.orden + 1
+		y_upper = lote[:, :n] @ self.base.T + lote[:, -2:-1]*self.x
+		y_lower = lote[:, n:2*n] @ self.base.T + lote[:, -1:]*self.x
+
+		if parametros.ndim == 1:
+			return y_upper[0], y_lower[0]
+		return y_upper, y_lower
+
+	def ajustar(self, y_upper, y_lower):
+		"""
+			Ajuste de un lote de perfiles ya muestreados en esta misma malla de x
+			(n_perfiles x len(x) cada lado), todos con una sola factorización
+		"""
+		y_upper = np.atleast_2d(y_upper)
+		y_lower = np.atleast_2d(y_lower)
+		pseudoinversa = np.linalg.pinv(self.base)
+		dz_upper = y_upper[:, -1:]
+		dz_lower = y_lower[:, -1:]
+		a_upper = (y_upper - dz_upper*self.x) @ pseudoinversa.T
+		a_lower = (y_lower - dz_lower*self.x) @ pseudoinversa.T
+		return np.hstack((a_upper, a_lower, dz_upper, dz_lower))
@@ -8,8 +8,13 @@ Developed for Airinnova AB, Stockholm, Sweden.
 """
 
 import re
+import sys
+from contextlib import contextmanager
+
 import numpy as np
 
+from Generador_de_alas.alas.bordes import ordenar_contorno, separar_lados
+
 # Format identifiers
 FORMAT_1 = 'format_1'
 FORMAT_2 = 'format_2'
@@ -17,6 +22,13 @@ FORMAT_2 = 'format_2'
 # If x-value deviates from 0 or 1 in this range, it is set to 0 or 1
 DATA_TOLERANCE = 1e-3
 
+# JavaFoil writes '9999,9  9999,9' between the elements of a multi-element file
+ELEMENT_SEPARATOR_VALUE = 9999
+
+# Record separators for write_airfoil_records()
+SEPARATOR_BLANK = "\n\n"
+SEPARATOR_JAVAFOIL = "9999,9\t9999,9\n"
+
 
 class FileInputFormatError(Exception):
 	"""Raised if file input data is not formatted correctly"""
@@ -85,6 +97,8 @@ def _import_format_1(file_name):
 	Note:
 		* Empty lines are ignored
 		* Lines not starting with a number are ignored
+		* '.' or JavaFoil's ',' as decimal separator
+		* The leading and trailing edges are found from the geometry
 
 	Args:
 		:file_name: File name (string)
@@ -97,8 +111,7 @@ def _import_format_1(file_name):
 	line_with_text = re.compile(r"^[a-z]", flags=re.IGNORECASE)
 	line_with_not_number = re.compile(r"[^\+\-\d\.]")  # +,-,.,0,1,2,...,8,9
 
-	x = []
-	y = []
+	points = []
 	with open(file_name, 'r') as infile:
 		for line_nr, line in enumerate(infile):
 			line = line.strip()
@@ -106,66 +119,36 @@ def _import_format_1(file_name):
 			if not line or line_with_text.match(line) or line_with_not_number.match(line):
 					continue
 
-			xy = np.fromstring(line, sep=' ')
-			x.append(xy[0])
-			y.append(xy[1])
+			xy = _parse_numbers(line)
+			if len(xy) >= 2:
+				points.append(xy[:2])
 
-	x = np.asarray(x)
-	y = np.asarray(y)
+	if len(points) < 3:
+		raise FileInputFormatError("Unable to process input file '{:s}'".format(file_name))
+
+	points = np.asarray(points)
 
 	# Shift data points if necessary
-	shift_factor = min(x)
+	shift_factor = min(points[:, 0])
 	if shift_factor != 0:
-		x -= shift_factor
+		points[:, 0] -= shift_factor
 
 	# Normalise data points if necessary
-	norm_factor = max(x)
-	x /= norm_factor
-	y /= norm_factor
-
-	# Account for numerical inaccuracies if necessary
-	if abs(1 - x[0]) < DATA_TOLERANCE:
-		x[0] = 1
-	elif abs(1 - x[0]) < 1 + DATA_TOLERANCE:
-		x[0] = 0
-
-	x_upper = []
-	y_upper = []
-	x_lower = []
-	y_lower = []
-
-	if x[0] == 0:
-		for i, xy in enumerate(zip(x, y)):
-			x_upper.append(xy[0])
-			y_upper.append(xy[1])
+	norm_factor = max(points[:, 0])
+	points /= norm_factor
 
-			if xy[0] == 1:
-					break
-		else:
-			# If we did not break, something went wrong
-			raise FileInputFormatError("Trailing edge point not found")
+	# Split at the leading edge found from the geometry (see bordes.py), so
+	# that neither the number of points nor exact x = 0 or x = 1 values matter
+	try:
+		ordered, le_idx, _ = ordenar_contorno(points)
+	except ValueError as error:
+		raise FileInputFormatError(f"Unable to process input file '{file_name}': {error}")
 
-	elif x[0] == 1:
-		for i, xy in enumerate(zip(x, y)):
-			x_upper.append(xy[0])
-			y_upper.append(xy[1])
-
-			if xy[0] < DATA_TOLERANCE:
-					break
-		else:
-			# If we did not break, something went wrong
-			raise FileInputFormatError("Leading edge point not found")
-	else:
-		raise FileInputFormatError("Unable to process input file '{:s}'".format(file_name))
-
-	x_lower = x[i:]
-	y_lower = y[i:]
-
-	upper = np.array([x_upper, y_upper])
-	lower = np.array([x_lower, y_lower])
+	upper = ordered[:le_idx + 1].T
+	lower = ordered[le_idx:].T
 
 	# Swap upper and lower side if necessary
-	if np.mean(y_lower) > np.mean(y_upper):
+	if np.mean(lower[1]) > np.mean(upper[1]):
 		upper, lower = lower, upper
 
 	return upper, lower
@@ -230,4 +213,190 @@ def _import_format_2(file_name):
 
 	upper = np.asarray((x_upper, y_upper))
 	lower = np.asarray((x_lower, y_lower))
-	return upper, lower
\ No newline at end of file
+	return upper, lower
+
+# ----- Streaming readers and writers -----
+
+@contextmanager
+def _open_stream(source, mode):
+	"""
+	Open a file name, '-' (stdin/stdout) or pass an open file through
+	"""
+
+	if source == '-' or source is None:
+		yield sys.stdin if 'r' in mode else sys.stdout
+	elif hasattr(source, 'read') or hasattr(source, 'write'):
+		yield source
+	else:
+		with open(source, mode) as stream:
+			yield stream
+
+
+def _parse_numbers(line):
+	"""
+	Parse a line of coordinates, with '.' or ',' as decimal separator
+
+	Returns:
+		:values: List of floats (empty if the line is not numeric)
+	"""
+
+	if '.' in line or (';' not in line and len(line.split()) < 2):
+		# Commas separate values ('0.5, 0.1, 0.0', '0.5,0.1' or '1,0')
+		tokens = line.replace(',', ' ').replace(';', ' ').split()
+	else:
+		# Decimal commas: JavaFoil style ('0,5\t0,1') or separated by ', ' or
+		# ';' ('0,5, 0,1', as Alerón.exportar(comaDec=True) writes them)
+		tokens = line.replace(', ', ' ').replace(',\t', ' ').replace(';', ' ').replace(',', '.').split()
+
+	try:
+		return [float(token) for token in tokens]
+	except ValueError:
+		return []
+
+
+def _looks_numeric(line):
+	"""
+	True for lines made only of numbers and separators (with at least two
+	numbers), which can not be the name of a record
+	"""
+
+	if not re.fullmatch(r"[-+0-9.,;eE\s]+", line) or not re.search(r"\d", line):
+		return False
+	return len(re.split(r"[,;\s]+", line.strip(",; \t"))) >= 2
+
+
+def _split_record(points):
+	"""
+	Split the points of one element (x, y rows of an ordered contour, e.g.
+	in the order of Airfoil.exportar) into its upper and lower side
+
+	Returns:
+		:upper: 2 x N array, from the leading to the trailing edge
+		:lower: 2 x N array, from the leading to the trailing edge
+	"""
+
+	# Leading and trailing edge from the geometry (see bordes.py), which also
+	# works for rotated elements
+	try:
+		upper, lower = separar_lados(np.asarray(points, dtype=float))
+	except ValueError as error:
+		raise FileInputFormatError(str(error))
+	upper, lower = upper.T, lower.T
+
+	# Swap upper and lower side if necessary
+	if np.mean(lower[1]) > np.mean(upper[1]):
+		upper, lower = lower, upper
+
+	return upper, lower
+
+
+def iter_airfoil_records(source='-', default_name='element_'):
+	"""
+	Read airfoil elements one by one from a (possibly huge) text stream
+
+	Args:
+		:source: File name, open file or '-' for stdin
+		:default_name: Prefix of the name of records without a name line
+
+	Yields:
+		:record: (name, upper, lower), upper and lower as 2 x N arrays from
+		the leading to the trailing edge
+
+	Note:
+		* Records are blocks of 'x y [z]' lines (format 1), separated by
+		blank lines, JavaFoil '9999,9 9999,9' lines or text lines
+		* A text line (or a single number) is the name of the next record
+		* Both '.' and JavaFoil's ',' are accepted as decimal separators;
+		with ',' the values are separated by blanks, ', ' or ';'
+		* A line of numbers that can not be read raises FileInputFormatError
+		instead of being taken as a name
+		* Coordinates are neither shifted nor normalised, so that the
+		elements of a multi-element wing keep their positions
+		* Only one record is kept in memory at a time
+	"""
+
+	name = None
+	points = []
+	n_records = 0
+
+	with _open_stream(source, 'r') as stream:
+		for line in stream:
+			line = line.strip()
+			values = _parse_numbers(line) if line else []
+
+			if len(values) >= 2 and values[0] < ELEMENT_SEPARATOR_VALUE:
+				points.append(values[:2])
+				continue
+
+			# End of a record (blank line, separator or name of the next one)
+			if points:
+				upper, lower = _split_record(points)
+				yield (name if name is not None else f"{default_name}{n_records}"), upper, lower
+				n_records += 1
+				name = None
+				points = []
+
+			if line and len(values) < 2:
+				if not values and _looks_numeric(line):
+					raise FileInputFormatError(f"Unable to read the coordinates in line '{line}'")
+				name = line
+
+		if points:
+			upper, lower = _split_record(points)
+			yield (name if name is not None else f"{default_name}{n_records}"), upper, lower
+
+
+def format_airfoil_record(upper, lower, separator=", ", decimal_comma=False, z_coordinate=True):
+	"""
+	Text of one element in the order of Airfoil.exportar (trailing edge,
+	upper side, leading edge, lower side, trailing edge)
+
+	Args:
+		:upper: 2 x N array, from the leading to the trailing edge
+		:lower: 2 x N array, from the leading to the trailing edge
+		:separator: Separator between coordinates
+		:decimal_comma: Use ',' as decimal separator (the separator then needs
+		a blank or ';', a bare ',' could not be read back)
+		:z_coordinate: Add a z = 0 column
+	"""
+
+	if decimal_comma and not re.search(r"[;\s]", separator):
+		raise ValueError(f"Separator {separator!r} can not be combined with decimal commas")
+
+	points = np.concatenate((np.asarray(upper, dtype=float)[:, ::-1], np.asarray(lower, dtype=float)), axis=1).T
+	line = separator.join(["%s"]*2) + (separator + "0.0000" if z_coordinate else "") + "\n"
+	text = (line*len(points)) % tuple(points.ravel().tolist())
+
+	if decimal_comma:
+		text = text.replace(".", ",")
+	return text
+
+
+def write_airfoil_records(records, target='-', record_separator=SEPARATOR_BLANK, names=False, **format_options):
+	"""
+	Write airfoil elements one by one, as they come from an iterator
+
+	Args:
+		:records: Iterable of (name, upper, lower), as iter_airfoil_records()
+		:target: File name, open file or '-' for stdout
+		:record_separator: Text between records, e.g. SEPARATOR_BLANK or
+		SEPARATOR_JAVAFOIL
+		:names: Write the name of each record in a line before its points
+		:format_options: separator, decimal_comma, z_coordinate (see
+		format_airfoil_record)
+
+	Returns:
+		:n_records: Number of records written
+	"""
+
+	n_records = 0
+	with _open_stream(target, 'w') as stream:
+		for name, upper, lower in records:
+			if n_records:
+				stream.write(record_separator)
+			if names:
+				stream.write(f"{name}\n")
+			stream.write(format_airfoil_record(upper, lower, **format_options))
+			n_records += 1
+
+	return n_records
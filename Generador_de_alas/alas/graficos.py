@@ -0,0 +1,204 @@
+"""
+Dibujo de perfiles y alerones sin pyplot, para barridos con miles de casos
+
+Todo va con el backend Agg sobre una Figure propia (matplotlib.figure +
+FigureCanvasAgg), sin el estado global de pyplot: no se abre ninguna ventana, no
+hace falta pantalla y las figuras no se quedan vivas en pyplot.
+
+Lienzo mantiene una figura con una LineCollection y solo cambia los segmentos de
+un caso a otro, así que dibujar una miniatura es rasterizar, sin crear ejes ni
+líneas nuevas. hoja_contactos junta las miniaturas de todo un barrido en una
+imagen y miniaturas las guarda sueltas; las dos reparten el trabajo entre
+procesos con un Lienzo por proceso, con memoria constante por proceso.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.alas.paneles import contorno
+
+
+figure = perezoso("matplotlib.figure")
+backend_agg = perezoso("matplotlib.backends.backend_agg")
+collections = perezoso("matplotlib.collections")
+image = perezoso("matplotlib.image")
+
+COLORES = ("tab:blue", "tab:orange", "tab:green", "tab:red", "tab:purple")
+
+_contador = itertools.count()
+
+
+def nombre_unico(prefijo, extension="png"):
+	"""
+		Nombre de archivo que no se repite aunque se pidan muchos en el mismo
+		segundo o desde varios procesos: fecha con microsegundos, pid y contador
+	"""
+	ahora = datetime.now().strftime("%F_%H%M%S_%f")
+	return f"{prefijo}_{ahora}_{os.getpid()}_{next(_contador)}.{extension}"
+
+
+def figura_agg(**kwargs):
+	"""
+		Figure de matplotlib con su FigureCanvasAgg, sin pasar por pyplot (se
+		libera sola al dejar de usarla)
+	"""
+	fig = figure.Figure(**kwargs)
+	backend_agg.FigureCanvasAgg(fig)
+	return fig
+
+
+def contornos_de(objeto):
+	"""
+		Contornos (N x 2) de un Airfoil, de los elementos de un Alerón o de una
+		lista de contornos ya hechos
+	"""
+	if hasattr(objeto, "foils"):
+		return [contorno(foil) for foil in objeto.foils]
+	if hasattr(objeto, "_x_upper"):
+		return [contorno(objeto)]
+	return [np.asarray(puntos, dtype=float)[:, :2] for puntos in objeto]
+
+
+class Lienzo:
+	"""
+		Figura Agg reutilizable para dibujar muchos casos seguidos
+
+		- Atributos:
+			- ancho, alto: tamaño de cada imagen en píxeles
+			- margen: fracción del tamaño que se deja alrededor del dibujo
+			- fig, ax, lineas, texto: los objetos de matplotlib que se reutilizan
+	"""
+
+	def __init__(self, ancho=160, alto=100, dpi=100, margen=0.05, grosor=0.8):
+		self.ancho = ancho
+		self.alto = alto
+		self.margen = margen
+		self.fig = figura_agg(figsize=(ancho/dpi, alto/dpi), dpi=dpi)
+		self.ax = self.fig.add_axes([0, 0, 1, 1])
+		self.ax.set_axis_off()
+		self.lineas = collections.LineCollection([], linewidths=grosor)
+		self.ax.add_collection(self.lineas)
+		self.texto = self.ax.text(0.02, 0.96, "", transform=self.ax.transAxes, fontsize=6, va="top")
+
+	def _encuadrar(self, contornos):
+		"""Límites con la misma escala en x e y, centrados en el dibujo"""
+		puntos = np.concatenate(contornos)
+		minimo, maximo = puntos.min(axis=0), puntos.max(axis=0)
+		centro = 0.5*(minimo + maximo)
+		semilado = 0.5*(maximo - minimo)*(1 + 2*self.margen)
+		# Misma escala en los dos ejes: se amplía el eje que se quede corto
+		escala = max(semilado[0]/self.ancho, semilado[1]/self.alto, np.finfo(float).tiny)
+		self.ax.set_xlim(centro[0] - escala*self.ancho, centro[0] + escala*self.ancho)
+		self.ax.set_ylim(centro[1] - escala*self.alto, centro[1] + escala*self.alto)
+
+	def dibujar(self, objeto, etiqueta=""):
+		"""
+			Dibuja un caso (ver contornos_de) y devuelve la imagen RGBA (alto x ancho x 4)
+		"""
+		contornos = contornos_de(objeto)
+		self.lineas.set_segments(contornos)
+		self.lineas.set_color([COLORES[i % len(COLORES)] for i in range(len(contornos))])
+		self.texto.set_text(etiqueta)
+		self._encuadrar(contornos)
+		self.fig.canvas.draw()
+		return np.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+	def guardar(self, objeto, ruta, etiqueta=""):
+		"""
+			Dibuja un caso y lo guarda en 'ruta' (png)
+		"""
+		image.imsave(ruta, self.dibujar(objeto, etiqueta))
+		return ruta
+
+
+# Un Lienzo por proceso trabajador (ver _repartir)
+_lienzo_trabajador = None
+
+
+def _iniciar_trabajador(opciones_lienzo):
+	global _lienzo_trabajador
+	_lienzo_trabajador = Lienzo(**opciones_lienzo)
+
+
+def _dibujar_lote(lote):
+	return [_lienzo_trabajador.dibujar(contornos, etiqueta) for contornos, etiqueta in lote]
+
+
+def _guardar_lote(lote):
+	return [_lienzo_trabajador.guardar(contornos, ruta, etiqueta) for contornos, ruta, etiqueta in lote]
+
+
+def _lotes(elementos, tamano):
+	for inicio in range(0, len(elementos), tamano):
+		yield elementos[inicio:inicio + tamano]
+
+
+def _repartir(funcion, trabajos, n_trabajos, opciones_lienzo, tamano_lote=50):
+	"""
+		Aplica funcion (_dibujar_lote o _guardar_lote) por lotes, en este proceso
+		o en n_trabajos procesos con un Lienzo cada uno; devuelve un generador con
+		los resultados en orden
+	"""
+	if n_trabajos <= 1:
+		_iniciar_trabajador(opciones_lienzo)
+		for lote in _lotes(trabajos, tamano_lote):
+			yield from funcion(lote)
+		return
+
+	with ProcessPoolExecutor(
+			max_workers=n_trabajos,
+			initializer=_iniciar_trabajador,
+			initargs=(opciones_lienzo,)) as pool:
+		for resultado in pool.map(funcion, _lotes(trabajos, tamano_lote)):
+			yield from resultado
+
+
+def hoja_contactos(casos, ruta, columnas=20, etiquetas=None, n_trabajos=1, **opciones_lienzo):
+	"""
+		Una imagen con la miniatura de cada caso en una cuadrícula
+		- Argumentos:
+			- casos: lista de Airfoil, Alerón o listas de contornos
+			- ruta: png de salida
+			- columnas: miniaturas por fila
+			- etiquetas: texto de cada miniatura (p.ej. el nombre del caso)
+			- n_trabajos: procesos que dibujan
+			- opciones_lienzo: ancho, alto, ... de Lienzo
+		- Devuelve la ruta
+	"""
+	etiquetas = [""]*len(casos) if etiquetas is None else list(etiquetas)
+	# Solo viajan arrays a los trabajadores, no los Airfoil
+	trabajos = [(contornos_de(caso), etiqueta) for caso, etiqueta in zip(casos, etiquetas)]
+	ancho = opciones_lienzo.get("ancho", 160)
+	alto = opciones_lienzo.get("alto", 100)
+	filas = -(-len(casos)//columnas)
+
+	hoja = np.full((filas*alto, columnas*ancho, 4), 255, dtype=np.uint8)
+	for i, miniatura in enumerate(_repartir(_dibujar_lote, trabajos, n_trabajos, opciones_lienzo)):
+		fila, columna = divmod(i, columnas)
+		hoja[fila*alto:(fila + 1)*alto, columna*ancho:(columna + 1)*ancho] = miniatura
+
+	image.imsave(ruta, hoja)
+	return ruta
+
+
+def miniaturas(casos, carpeta=".", nombres=None, n_trabajos=1, **opciones_lienzo):
+	"""
+		Guarda una miniatura (png) por caso
+		- Argumentos:
+			- nombres: nombre de archivo de cada caso (sin extensión), por defecto
+			  miniatura_00000, miniatura_00001, ...
+			- el resto como hoja_contactos
+		- Devuelve la lista de rutas
+	"""
+	os.makedirs(carpeta, exist_ok=True)
+	nombres = [f"miniatura_{i:05d}" for i in range(len(casos))] if nombres is None else list(nombres)
+	trabajos = [
+		(contornos_de(caso), os.path.join(carpeta, f"{nombre}.png"), "")
+		for caso, nombre in zip(casos, nombres)
+	]
+	return list(_repartir(_guardar_lote, trabajos, n_trabajos, opciones_lienzo))
@@ -0,0 +1,309 @@
+"""
+Generadores analíticos de perfiles NACA por lotes
+
+Todas las funciones aceptan escalares o arrays (con broadcasting) para los
+parámetros y devuelven los dos lados de todos los perfiles a la vez:
+
+	upper, lower: arrays (n_perfiles, 2, n_puntos) con x e y, del borde de ataque
+	al de salida, como los 2 x N que recibe Airfoil
+
+Así un barrido en espesor o curvatura no pasa por archivos.
+
+Series:
+	- 4 dígitos MPXX y 4 dígitos modificada MPXX-IT (radio del borde de ataque I y
+	  posición del espesor máximo T, NASA TM-4741)
+	- 5 dígitos LPSTT, normal y con reflexión
+	- serie 6 6X-ZTT / 6X(Y)-ZTT, y 6X-ZZTT con la convención de JavaFoil (cl de
+	  diseño ZZ/10, la de los archivos de datos_perfiles), con línea media de la
+	  serie a (exacta). El espesor
+	  de la serie 6 sale de una transformación conforme tabulada que no tiene
+	  fórmula cerrada: aquí se aproxima con el espesor de 4 dígitos modificado
+	  (posición del espesor máximo y radio del borde de ataque de cada familia),
+	  con errores del orden del 1 % de la cuerda frente a las tablas
+"""
+
+import re
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+special = perezoso("scipy.special")
+
+
+class NACADesignationError(ValueError):
+	"""Raised when a NACA designation can not be parsed"""
+
+	pass
+
+
+# Línea media de 5 dígitos: posición de curvatura máxima -> (r, k1) para cl = 0.3
+CINCO_DIGITOS = {
+	0.05: (0.0580, 361.4),
+	0.10: (0.1260, 51.64),
+	0.15: (0.2025, 15.957),
+	0.20: (0.2900, 6.643),
+	0.25: (0.3910, 3.230),
+}
+# Con reflexión: posición -> (r, k1, k2/k1)
+CINCO_DIGITOS_REFLEXION = {
+	0.10: (0.1300, 51.990, 0.000764),
+	0.15: (0.2170, 15.793, 0.00677),
+	0.20: (0.3180, 6.520, 0.0303),
+	0.25: (0.4410, 3.191, 0.1355),
+}
+# Serie 6: familia -> (posición del espesor máximo, índice del radio del borde de ataque)
+SERIE_6 = {
+	63: (0.35, 5.0),
+	64: (0.38, 5.0),
+	65: (0.40, 4.5),
+	66: (0.45, 4.5),
+	67: (0.48, 4.0),
+}
+
+
+def puntos_x(n_puntos):
+	"""Distribución cosenoidal de x en [0, 1] (más puntos en los bordes)"""
+	return 0.5*(1 - np.cos(np.linspace(0, np.pi, n_puntos)))
+
+
+def _columna(valor):
+	"""Parámetro como columna (n_perfiles, 1) para hacer broadcasting con x"""
+	return np.atleast_1d(np.asarray(valor, dtype=float)).reshape(-1, 1)
+
+
+def espesor_4(t, x, cerrado=False):
+	"""
+		Semiespesor de la serie de 4 dígitos, t como fracción de la cuerda
+		- cerrado: borde de salida de espesor nulo (coeficiente -0.1036)
+	"""
+	a4 = -0.1036 if cerrado else -0.1015
+	return 5*_columna(t)*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3 + a4*x**4)
+
+
+def espesor_4_modificado(t, x, radio=6.0, posicion=0.3):
+	"""
+		Semiespesor de la serie de 4 dígitos modificada (NASA TM-4741)
+		- Argumentos:
+			- t: espesor máximo (fracción de la cuerda)
+			- radio: índice I del radio del borde de ataque (6 = el de 4 dígitos)
+			- posicion: posición del espesor máximo (T/10)
+	"""
+	t, radio, m = np.broadcast_arrays(_columna(t), _columna(radio), _columna(posicion))
+	t, radio, m = t[:, 0], radio[:, 0], m[:, 0]
+	n = len(t)
+
+	# Tramo de detrás del espesor máximo
+	d0 = np.full(n, 0.002)
+	d1 = (2.24 - 5.42*m + 12.3*m**2)/(10*(1 - 0.878*m))
+	d2 = (0.294 - 2*(1 - m)*d1)/(1 - m)**2
+	d3 = (-0.196 + (1 - m)*d1)/(1 - m)**3
+
+	# Tramo de delante: a0 del radio, a1..a3 para empalmar en x = m el valor (0.1),
+	# la pendiente (0) y la curvatura del tramo de detrás
+	a0 = 0.296904*radio/6
+	sm = np.sqrt(m)
+	sistema = np.stack((
+		np.stack((m, m**2, m**3), axis=1),
+		np.stack((np.ones(n), 2*m, 3*m**2), axis=1),
+		np.stack((np.zeros(n), np.full(n, 2.0), 6*m), axis=1),
+	), axis=1)
+	derecha = np.stack((
+		0.1 - a0*sm,
+		-a0/(2*sm),
+		2*d2 + 6*d3*(1 - m) + a0/(4*m*sm),
+	), axis=1)
+	a1, a2, a3 = np.linalg.solve(sistema, derecha[..., None])[..., 0].T
+
+	col = lambda v: v[:, None]
+	delante = col(a0)*np.sqrt(x) + col(a1)*x + col(a2)*x**2 + col(a3)*x**3
+	detras = col(d0) + col(d1)*(1 - x) + col(d2)*(1 - x)**2 + col(d3)*(1 - x)**3
+	return col(t/0.2)*np.where(x < col(m), delante, detras)
+
+
+def linea_media_4(m, p, x):
+	"""
+		Línea media de 4 dígitos y su pendiente
+		- m: curvatura máxima, p: su posición (fracciones de la cuerda)
+	"""
+	m, p = _columna(m), _columna(p)
+	# Con p = 0 (simétrico) solo se usa el tramo de detrás
+	p_seguro = np.where(p > 0, p, 1.0)
+	delante = x < p
+	yc = np.where(delante, m/p_seguro**2*(2*p*x - x**2), m/(1 - p)**2*(1 - 2*p + 2*p*x - x**2))
+	dyc = np.where(delante, 2*m/p_seguro**2*(p - x), 2*m/(1 - p)**2*(p - x))
+	return yc, dyc
+
+
+def linea_media_5(cl, posicion, x, reflexion=False):
+	"""
+		Línea media de 5 dígitos y su pendiente
+		- cl: coeficiente de sustentación de diseño (L*0.15)
+		- posicion: posición de la curvatura máxima (P/20), de las tabuladas
+		- reflexion: línea media con reflexión (S = 1)
+	"""
+	cl, posicion = np.broadcast_arrays(_columna(cl), _columna(posicion))
+	tabla = CINCO_DIGITOS_REFLEXION if reflexion else CINCO_DIGITOS
+	try:
+		valores = np.array([tabla[round(float(p), 2)] for p in posicion[:, 0]])
+	except KeyError as error:
+		raise NACADesignationError(f"Posición de curvatura de 5 dígitos no tabulada: {error}")
+
+	r = valores[:, 0:1]
+	k1 = valores[:, 1:2]*cl/0.3
+	delante = x < r
+
+	if not reflexion:
+		yc = np.where(delante, k1/6*(x**3 - 3*r*x**2 + r**2*(3 - r)*x), k1*r**3/6*(1 - x))
+		dyc = np.where(delante, k1/6*(3*x**2 - 6*r*x + r**2*(3 - r)), -k1*r**3/6)
+		return yc, dyc
+
+	k21 = valores[:, 2:3]
+	yc = np.where(
+		delante,
+		k1/6*((x - r)**3 - k21*(1 - r)**3*x - r**3*x + r**3),
+		k1/6*(k21*(x - r)**3 - k21*(1 - r)**3*x - r**3*x + r**3),
+	)
+	dyc = np.where(
+		delante,
+		k1/6*(3*(x - r)**2 - k21*(1 - r)**3 - r**3),
+		k1/6*(3*k21*(x - r)**2 - k21*(1 - r)**3 - r**3),
+	)
+	return yc, dyc
+
+
+def linea_media_a(cl, a, x):
+	"""
+		Línea media de la serie a (carga uniforme hasta x = a y lineal hasta el borde
+		de salida), la de los perfiles de la serie 6, y su pendiente
+		- cl: coeficiente de sustentación de diseño
+		- a: fracción de la cuerda con carga uniforme (0 <= a <= 1)
+	"""
+	cl, a = np.broadcast_arrays(_columna(cl), _columna(a))
+	yc = np.zeros((len(cl), len(x)))
+	dyc = np.zeros_like(yc)
+	# Los logaritmos con x = 0, x = 1 o x = a valen 0 multiplicados (xlogy)
+	ln_x = np.log(np.maximum(x, 1e-300))
+	ln_1x = np.log(np.maximum(1 - x, 1e-300))
+
+	uniforme = np.isclose(a[:, 0], 1.0)
+	if uniforme.any():
+		c = cl[uniforme]
+		yc[uniforme] = -c/(4*np.pi)*(special.xlogy(1 - x, 1 - x) + special.xlogy(x, x))
+		dyc[uniforme] = -c/(4*np.pi)*(ln_x - ln_1x)
+
+	resto = ~uniforme
+	if resto.any():
+		c, aa = cl[resto], a[resto]
+		g = -1/(1 - aa)*(aa**2*(0.5*np.log(aa, where=aa > 0, out=np.zeros_like(aa)) - 0.25) + 0.25)
+		h = 1/(1 - aa)*(0.5*(1 - aa)**2*np.log(1 - aa) - 0.25*(1 - aa)**2) + g
+		factor = c/(2*np.pi*(aa + 1))
+		ax = aa - x
+		yc[resto] = factor*(
+			1/(1 - aa)*(0.5*special.xlogy(ax**2, np.abs(ax)) - 0.5*special.xlogy((1 - x)**2, 1 - x) + 0.25*(1 - x)**2 - 0.25*ax**2)
+			- special.xlogy(x, x) + g - h*x
+		)
+		dyc[resto] = factor*(
+			1/(1 - aa)*(special.xlogy(1 - x, 1 - x) - special.xlogy(ax, np.abs(ax))) - ln_x - 1 - h
+		)
+	return yc, dyc
+
+
+def _envolver(x, yc, dyc, yt):
+	"""
+		Pone el semiespesor perpendicular a la línea media
+		- Devuelve upper, lower (n_perfiles, 2, n_puntos)
+	"""
+	yc, dyc, yt = np.broadcast_arrays(yc, dyc, yt)
+	theta = np.arctan(dyc)
+	seno, coseno = np.sin(theta), np.cos(theta)
+	upper = np.stack((x - yt*seno, yc + yt*coseno), axis=1)
+	lower = np.stack((x + yt*seno, yc - yt*coseno), axis=1)
+	return upper, lower
+
+
+def naca4(m, p, t, n_puntos=121, cerrado=False):
+	"""
+		Lote de perfiles de 4 dígitos (m, p, t como fracciones: 2412 -> 0.02, 0.4, 0.12)
+	"""
+	x = puntos_x(n_puntos)
+	yc, dyc = linea_media_4(m, p, x)
+	return _envolver(x, yc, dyc, espesor_4(t, x, cerrado))
+
+
+def naca4_modificado(m, p, t, radio=6.0, posicion=0.3, n_puntos=121):
+	"""
+		Lote de perfiles de 4 dígitos modificados (2412-63 -> 0.02, 0.4, 0.12, 6, 0.3)
+	"""
+	x = puntos_x(n_puntos)
+	yc, dyc = linea_media_4(m, p, x)
+	return _envolver(x, yc, dyc, espesor_4_modificado(t, x, radio, posicion))
+
+
+def naca5(cl, posicion, t, reflexion=False, n_puntos=121, cerrado=False):
+	"""
+		Lote de perfiles de 5 dígitos (23012 -> cl 0.3, posición 0.15, t 0.12)
+	"""
+	x = puntos_x(n_puntos)
+	yc, dyc = linea_media_5(cl, posicion, x, reflexion)
+	return _envolver(x, yc, dyc, espesor_4(t, x, cerrado))
+
+
+def naca6(familia, cl, t, a=1.0, n_puntos=121):
+	"""
+		Lote de perfiles de la serie 6 (64(2)-320 a=0 -> familia 64, cl 0.3, t 0.2, a 0)
+		con la línea media exacta y el espesor aproximado (ver la cabecera del módulo)
+	"""
+	familia = np.atleast_1d(np.asarray(familia, dtype=int))
+	try:
+		posicion, radio = np.array([SERIE_6[f] for f in familia]).T
+	except KeyError as error:
+		raise NACADesignationError(f"Familia de la serie 6 desconocida: {error}")
+
+	x = puntos_x(n_puntos)
+	yc, dyc = linea_media_a(cl, a, x)
+	return _envolver(x, yc, dyc, espesor_4_modificado(t, x, radio, posicion))
+
+
+def _partir_por_borde_de_ataque(upper, lower):
+	"""
+		Con mucha curvatura el extradós pasa por detrás de x = 0 junto al borde de
+		ataque (el espesor va en normal a la línea media): se vuelven a separar los
+		lados por el punto de menor x, como en los archivos de JavaFoil, para que
+		las x de cada lado crezcan
+	"""
+	contorno = np.hstack((upper[:, ::-1], lower[:, 1:]))
+	k = np.argmin(contorno[0])
+	return contorno[:, k::-1], contorno[:, k:]
+
+
+def desde_designacion(designacion, n_puntos=121):
+	"""
+		Un perfil a partir de su designación: "2412", "2412-63", "23012", "64(2)-320",
+		"64-320 a=0.6" o "64-320a0.6" (sin a, a = 1), "64A-520" (serie 6A, a = 0.8 si
+		no se dice otra cosa). Con cuatro cifras tras el guion y sin subíndice se
+		sigue a JavaFoil: "64-2320a0" es cl de diseño 2.3 y espesor 20 % (no 64(2)-320)
+		- Devuelve upper, lower (2 x N, del punto de menor x al borde de salida; entre
+		  los dos lados suman 2 n_puntos - 1)
+	"""
+	texto = designacion.upper().replace("NACA", "").replace(" ", "").replace(",", ".")
+
+	if m := re.fullmatch(r"(\d)(\d)(\d\d)", texto):
+		upper, lower = naca4(int(m[1])/100, int(m[2])/10, int(m[3])/100, n_puntos)
+	elif m := re.fullmatch(r"(\d)(\d)(\d\d)-(\d)(\d)", texto):
+		upper, lower = naca4_modificado(int(m[1])/100, int(m[2])/10, int(m[3])/100, int(m[4]), int(m[5])/10, n_puntos)
+	elif m := re.fullmatch(r"(\d)(\d)([01])(\d\d)", texto):
+		upper, lower = naca5(int(m[1])*0.15, int(m[2])/20, int(m[4])/100, m[3] == "1", n_puntos)
+	elif m := re.fullmatch(r"(6\d)(A?)(\(\d\))?-(\d{1,2})(\d\d)(?:A=?(\d*\.?\d+))?", texto):
+		# El subíndice (intervalo de baja resistencia) no cambia la forma
+		if m[3] and len(m[4]) > 1:
+			raise NACADesignationError(
+				f"Designación NACA no reconocida: '{designacion}' (con subíndice van tres cifras tras el guion)"
+			)
+		a = float(m[6]) if m[6] else (0.8 if m[2] else 1.0)
+		upper, lower = naca6(int(m[1]), int(m[4])/10, int(m[5])/100, a, n_puntos)
+	else:
+		raise NACADesignationError(f"Designación NACA no reconocida: '{designacion}'")
+
+	return _partir_por_borde_de_ataque(upper[0], lower[0])
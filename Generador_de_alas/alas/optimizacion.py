@@ -0,0 +1,290 @@
+"""
+Optimización de la geometría de un alerón con derivadas exactas de la geometría
+
+Los parámetros son los mismos que se tocan a mano en Mi_aleron.py: la cuerda y el
+ángulo de cada elemento, los huecos (x, y) entre elementos y, si se quiere, un
+peso de mezcla entre dos perfiles de la biblioteca para cada elemento.
+
+Las coordenadas salen de la misma cadena afín que Alerón.ajustarCoords y
+Alerón.normalizarAleron:
+	- cada elemento: X_i = c_i R(a_i) P_i + T_i, con P_i el perfil base (cuerda 1,
+	  borde de ataque en el origen) y T_i la posición de su borde de ataque,
+	  T_0 = 0, T_i+1 = T_i + c_i u(a_i) + gap_i
+	- normalizado: Y = R(-theta) X / C, con C y theta la cuerda total y su ángulo
+	  (AOATotal), que dependen de todos los parámetros
+y su jacobiano dY/dp se calcula de forma analítica con la misma cadena, sin
+diferencias finitas. La parte aerodinámica (método de paneles + capa límite) se
+deriva por diferencias centradas a lo largo de esas direcciones exactas, con
+todas las evaluaciones del gradiente y de la búsqueda lineal en paralelo.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Generador_de_alas.alas.capa_limite import capa_limite
+from Generador_de_alas.alas.paneles import SolverPaneles, contorno
+
+
+def _rotacion(a):
+	return np.array([(np.cos(a), -np.sin(a)), (np.sin(a), np.cos(a))])
+
+
+def _perpendicular(v):
+	"""v girado 90 grados (J v), en la última dimensión"""
+	return np.stack((-v[..., 1], v[..., 0]), axis=-1)
+
+
+class ParametrosAleron:
+	"""
+		Parametrización de un alerón multielemento
+
+		- Atributos:
+			- bases: perfil base de cada elemento (N_i x 2, cuerda 1, borde de ataque en
+				el origen, en el orden de Airfoil.exportar)
+			- morph: {elemento: perfil B_i} para mezclar P_i = (1 - eta_i) base_i + eta_i B_i
+				(mismo número de puntos que la base, como sale de Airfoil)
+			- normalizar: True como normalizarAleron (cuerda total 1 y horizontal),
+				False solo escala la cuerda total a 1 (normalizarAleron + rotar(AOATotal),
+				como en Mi_aleron.py)
+			- nombres: nombre de cada parámetro del vector
+	"""
+
+	def __init__(self, bases, morph=None, normalizar=True):
+		self.bases = [np.asarray(base, dtype=float) for base in bases]
+		self.morph = {i: np.asarray(b, dtype=float) for i, b in (morph or {}).items()}
+		self.normalizar = normalizar
+
+		for i, b in self.morph.items():
+			if b.shape != self.bases[i].shape:
+				raise ValueError(f"El perfil de mezcla del elemento {i} tiene {len(b)} puntos y la base {len(self.bases[i])}")
+
+		n = len(self.bases)
+		self.n_elementos = n
+		self.elementos_morph = sorted(self.morph)
+		self.nombres = (
+			[f"cuerda_{i}" for i in range(n)]
+			+ [f"aoa_{i}" for i in range(n)]
+			+ [f"gap_x_{i}" for i in range(n - 1)]
+			+ [f"gap_y_{i}" for i in range(n - 1)]
+			+ [f"eta_{i}" for i in self.elementos_morph]
+		)
+
+	@classmethod
+	def desde_aleron(cls, aleron, morph=None, normalizar=True):
+		"""
+			Parametrización y vector de parámetros de un Alerón recién montado (antes
+			de normalizarAleron), deshaciendo escalar/setAOA/ajustarCoords de cada foil
+			- Devuelve (ParametrosAleron, p)
+		"""
+		bases = []
+		for foil in aleron.foils:
+			puntos = contorno(foil)
+			borde_ataque = np.array([foil._x_upper[0], foil._y_upper[0]])
+			bases.append((puntos - borde_ataque) @ _rotacion(np.deg2rad(foil.aoa)) / foil.cuerda)
+
+		parametros = cls(bases, morph, normalizar)
+		p = parametros.vector(
+			[foil.cuerda for foil in aleron.foils],
+			[foil.aoa for foil in aleron.foils],
+			aleron.gaps,
+		)
+		return parametros, p
+
+	def vector(self, cuerdas, aoas, gaps, etas=None):
+		"""
+			Junta los parámetros en el vector que usan coordenadas/jacobiano
+		"""
+		gaps = np.asarray(gaps, dtype=float).reshape(-1, 2)
+		etas = np.zeros(len(self.elementos_morph)) if etas is None else etas
+		return np.concatenate((cuerdas, aoas, gaps[:, 0], gaps[:, 1], etas)).astype(float)
+
+	def _separar(self, p):
+		n = self.n_elementos
+		cuerdas, aoas = p[:n], np.deg2rad(p[n:2*n])
+		gaps = np.column_stack((p[2*n:3*n - 1], p[3*n - 1:4*n - 2]))
+		etas = dict(zip(self.elementos_morph, p[4*n - 2:]))
+		return cuerdas, aoas, gaps, etas
+
+	def _perfiles(self, etas):
+		perfiles = list(self.bases)
+		for i, eta in etas.items():
+			perfiles[i] = (1 - eta)*self.bases[i] + eta*self.morph[i]
+		return perfiles
+
+	def coordenadas(self, p):
+		"""
+			Contornos de todos los elementos para el vector de parámetros 'p'
+		"""
+		return self.coordenadas_y_jacobiano(p, jacobiano=False)[0]
+
+	def coordenadas_y_jacobiano(self, p, jacobiano=True):
+		"""
+			Contornos Y_i (N_i x 2) y sus derivadas dY_i/dp (N_i x 2 x n_parametros)
+			(los ángulos en grados, como en el vector de parámetros)
+		"""
+		p = np.asarray(p, dtype=float)
+		n = self.n_elementos
+		n_p = len(p)
+		cuerdas, aoas, gaps, etas = self._separar(p)
+		perfiles = self._perfiles(etas)
+		direcciones = np.column_stack((np.cos(aoas), np.sin(aoas)))
+		grados = np.pi/180
+
+		# Bordes de ataque y final del último elemento (ajustarCoords)
+		bordes = np.zeros((n + 1, 2))
+		for i in range(n - 1):
+			bordes[i + 1] = bordes[i] + cuerdas[i]*direcciones[i] + gaps[i]
+		bordes[n] = bordes[n - 1] + cuerdas[n - 1]*direcciones[n - 1]
+
+		# dT_i/dp para todos los bordes de una vez: cada cuerda, ángulo y gap mueve
+		# todos los elementos que van detrás
+		d_bordes = np.zeros((n + 1, 2, n_p))
+		for j in range(n):
+			detras = np.arange(n + 1) > j
+			d_bordes[detras, :, j] = direcciones[j]
+			d_bordes[detras, :, n + j] = cuerdas[j]*_perpendicular(direcciones[j])*grados
+			if j < n - 1:
+				d_bordes[detras, 0, 2*n + j] = 1
+				d_bordes[detras, 1, 3*n - 1 + j] = 1
+
+		x = []
+		d_x = []
+		for i, perfil in enumerate(perfiles):
+			girado = perfil @ _rotacion(aoas[i]).T
+			x.append(cuerdas[i]*girado + bordes[i])
+			if jacobiano:
+				d = np.broadcast_to(d_bordes[i], (len(perfil), 2, n_p)).copy()
+				d[:, :, i] += girado
+				d[:, :, n + i] += cuerdas[i]*_perpendicular(girado)*grados
+				if i in etas:
+					k = 4*n - 2 + self.elementos_morph.index(i)
+					d[:, :, k] += cuerdas[i]*(self.morph[i] - self.bases[i]) @ _rotacion(aoas[i]).T
+				d_x.append(d)
+
+		# Normalización (normalizarAleron): escala 1/C y, si se pide, giro -theta
+		total = bordes[n]
+		cuerda_total = np.hypot(*total)
+		theta = np.arctan2(total[1], total[0]) if self.normalizar else 0.0
+		rot = _rotacion(-theta)
+		d_total = d_bordes[n]
+		d_cuerda = total @ d_total / cuerda_total
+		d_theta = (total[0]*d_total[1] - total[1]*d_total[0]) / cuerda_total**2 if self.normalizar else np.zeros(n_p)
+
+		y = [xi @ rot.T / cuerda_total for xi in x]
+		if not jacobiano:
+			return y, None
+
+		d_y = []
+		for yi, d in zip(y, d_x):
+			# dY = R(-theta) dX / C - dtheta J Y - Y dC / C
+			dyi = np.einsum("ab,nbp->nap", rot, d) / cuerda_total
+			dyi -= _perpendicular(yi)[:, :, None]*d_theta
+			dyi -= yi[:, :, None]*d_cuerda/cuerda_total
+			d_y.append(dyi)
+		return y, d_y
+
+
+class Evaluador:
+	"""
+		Objetivo aerodinámico rápido sobre los contornos: método de paneles y, con
+		'reynolds', capa límite. Se minimiza
+
+			f = -signo*Cl + peso_cd*Cd
+
+		(signo=-1 para buscar la máxima carga hacia abajo con los perfiles girados)
+	"""
+
+	def __init__(self, alfa=0.0, signo=1.0, reynolds=None, peso_cd=0.0):
+		self.alfa = alfa
+		self.signo = signo
+		self.reynolds = reynolds
+		self.peso_cd = peso_cd
+
+	def __call__(self, contornos):
+		solver = SolverPaneles(contornos)
+		resultado = solver.resolver([self.alfa])
+		f = -self.signo*resultado["Cl"][0]
+		if self.reynolds is not None and self.peso_cd:
+			viscoso = capa_limite(solver.centro, resultado["V"], solver.cuerpo_panel, self.reynolds)
+			f += self.peso_cd*viscoso["Cd"][0]
+		return f
+
+
+def optimizar(parametros, p0, limites, evaluador=None, n_trabajos=4, n_pasos=4,
+		paso_inicial=0.1, h=1e-4, max_iter=50, tolerancia=1e-4):
+	"""
+		Descenso por gradiente proyectado en las variables escaladas a los límites
+		- Argumentos:
+			- parametros: ParametrosAleron
+			- p0: vector de parámetros inicial
+			- limites: (inferiores, superiores), arrays como p0
+			- evaluador: función contornos -> f a minimizar (por defecto Evaluador())
+			- n_trabajos: hilos para las evaluaciones del gradiente y de la búsqueda lineal
+			- n_pasos: pasos que se prueban a la vez en cada búsqueda lineal (paso,
+			  paso/2, paso/4, ...)
+			- paso_inicial: paso en variables escaladas (1 = todo el rango)
+			- h: paso de las diferencias a lo largo de las direcciones exactas dY/dp
+			- max_iter, tolerancia: parada por iteraciones o por paso/mejora pequeños
+		- Devuelve un diccionario con p, f, historial (f en cada iteración),
+		  n_evaluaciones y nombres de los parámetros
+	"""
+	evaluador = Evaluador() if evaluador is None else evaluador
+	inferior, superior = (np.asarray(l, dtype=float) for l in limites)
+	rango = superior - inferior
+	p = np.clip(np.asarray(p0, dtype=float), inferior, superior)
+	n_evaluaciones = 0
+
+	def gradiente(pool, p):
+		# Direcciones exactas de la geometría; solo el objetivo va por diferencias
+		y, d_y = parametros.coordenadas_y_jacobiano(p)
+		casos = []
+		for k in range(len(p)):
+			for signo in (1, -1):
+				casos.append([yi + signo*h*di[:, :, k] for yi, di in zip(y, d_y)])
+		valores = np.array(list(pool.map(evaluador, casos))).reshape(-1, 2)
+		return (valores[:, 0] - valores[:, 1]) / (2*h)
+
+	with ThreadPoolExecutor(max_workers=n_trabajos) as pool:
+		f = evaluador(parametros.coordenadas(p))
+		n_evaluaciones += 1
+		historial = [f]
+		paso = paso_inicial
+
+		for _ in range(max_iter):
+			g = gradiente(pool, p)*rango
+			n_evaluaciones += 2*len(p)
+			# Las variables pegadas a un límite y que quieren salir no se mueven
+			libre = ~(((p <= inferior) & (g > 0)) | ((p >= superior) & (g < 0)))
+			g = np.where(libre, g, 0)
+			norma = np.linalg.norm(g)
+			if norma == 0:
+				break
+
+			pasos = paso*0.5**np.arange(n_pasos)
+			candidatos = [np.clip(p - a*g/norma*rango, inferior, superior) for a in pasos]
+			valores = list(pool.map(lambda c: evaluador(parametros.coordenadas(c)), candidatos))
+			n_evaluaciones += len(candidatos)
+
+			mejor = int(np.argmin(valores))
+			if valores[mejor] >= f:
+				paso *= 0.5**n_pasos
+				if paso < tolerancia:
+					break
+				continue
+
+			mejora = f - valores[mejor]
+			p, f = candidatos[mejor], valores[mejor]
+			historial.append(f)
+			# Si el paso más largo era el mejor, la próxima vez se prueba uno mayor
+			paso = 2*pasos[mejor] if mejor == 0 else pasos[mejor]
+			if mejora < tolerancia*max(1.0, abs(f)):
+				break
+
+	return {
+		"p": p,
+		"f": f,
+		"historial": np.array(historial),
+		"n_evaluaciones": n_evaluaciones,
+		"nombres": parametros.nombres,
+	}
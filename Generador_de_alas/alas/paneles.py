@@ -0,0 +1,226 @@
+"""
+Método de paneles 2D de vórtices lineales para alerones multielemento
+
+Sirve para cribar muchas configuraciones sin pasar por la malla ni por SU2:
+el flujo es potencial e incompresible (sin viscosidad), así que da Cl, Cm y Cp
+razonables mientras no haya separación.
+
+Cada elemento es un contorno cerrado de paneles rectos con una intensidad de
+vórtice que varía linealmente a lo largo de cada panel (continua en los nodos).
+Las incógnitas son las intensidades en los nodos; las ecuaciones son velocidad
+normal nula en el punto medio de cada panel más la condición de Kutta en el borde
+de salida de cada elemento. La matriz solo depende de la geometría: se monta y
+factoriza (LU) una vez y cada ángulo de ataque es solo otro término independiente.
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+linalg = perezoso("scipy.linalg")
+
+
+def contorno(foil, tolerancia=1e-12):
+	"""
+		Puntos del contorno de un Airfoil (array N x 2) en el orden de Airfoil.exportar:
+		borde de salida -> extradós -> borde de ataque -> intradós -> borde de salida,
+		sin puntos repetidos seguidos
+	"""
+	puntos = np.column_stack((
+		np.concatenate((foil._x_upper[::-1], foil._x_lower)),
+		np.concatenate((foil._y_upper[::-1], foil._y_lower)),
+	))
+	distinto = np.concatenate(([True], np.linalg.norm(np.diff(puntos, axis=0), axis=1) > tolerancia))
+	return puntos[distinto]
+
+
+def _influencia(x, y, l):
+	"""
+		Velocidad inducida en ejes locales de cada panel por una intensidad 1 en su
+		nodo inicial (a) y 1 en su nodo final (b)
+		- Argumentos:
+			- x, y: coordenadas de los puntos en ejes del panel (x a lo largo del panel)
+			- l: longitud de los paneles
+		- Devuelve (ua, va, ub, vb)
+	"""
+	r1 = x*x + y*y
+	r2 = r1 - 2*x*l + l*l
+	# Ángulo con el que se ve el panel desde el punto
+	dtheta = np.arctan2(l*y, r1 - x*l)
+	log = 0.5*np.log(np.maximum(r1, 1e-300) / np.maximum(r2, 1e-300))
+
+	# Integrales de la intensidad lineal gamma(s) = ga*(1 - s/l) + gb*s/l
+	lineal_u = (x*dtheta - y*log) / l
+	lineal_v = (x*log + y*dtheta) / l - 1
+
+	dos_pi = 2*np.pi
+	return -(dtheta - lineal_u)/dos_pi, (log - lineal_v)/dos_pi, -lineal_u/dos_pi, lineal_v/dos_pi
+
+
+class SolverPaneles:
+	"""
+		Solver de paneles para uno o varios cuerpos
+
+		- Atributos:
+			- cuerpos: lista de contornos (arrays N_i x 2), el primer y último punto de
+				cada uno son el borde de salida
+			- cuerda_ref: cuerda de referencia para los coeficientes
+			- x_ref: punto de referencia para el momento (Cm positivo encabritador)
+			- nodos: todos los nodos seguidos (N x 2)
+			- cuerpo_nodo, cuerpo_panel: a qué cuerpo pertenece cada nodo y cada panel
+			- centro: punto de colocación de cada panel (donde se dan V y Cp)
+			- lu, matriz_tangencial: factorización (lu, piv) de la matriz y matriz de
+				velocidad tangencial; se pueden pasar ya hechas para la misma geometría
+				(ver polares.CachePolares)
+	"""
+
+	def __init__(self, cuerpos, cuerda_ref=1.0, x_ref=(0.25, 0.0), lu=None, matriz_tangencial=None):
+		self.cuerpos = [np.asarray(cuerpo, dtype=float) for cuerpo in cuerpos]
+		self.cuerda_ref = cuerda_ref
+		self.x_ref = np.asarray(x_ref, dtype=float)
+
+		self.nodos = np.concatenate(self.cuerpos)
+		self.cuerpo_nodo = np.concatenate([np.full(len(c), i) for i, c in enumerate(self.cuerpos)])
+
+		# Paneles: del nodo k al k+1 dentro de cada cuerpo
+		desplazamientos = np.cumsum([0] + [len(c) for c in self.cuerpos])
+		self.nodo_inicio = np.concatenate([np.arange(d, d + len(c) - 1) for d, c in zip(desplazamientos, self.cuerpos)])
+		self.nodo_fin = self.nodo_inicio + 1
+		self.cuerpo_panel = self.cuerpo_nodo[self.nodo_inicio]
+		self.primer_nodo = desplazamientos[:-1]
+		self.ultimo_nodo = desplazamientos[1:] - 1
+
+		inicio = self.nodos[self.nodo_inicio]
+		lado = self.nodos[self.nodo_fin] - inicio
+		self.longitud = np.linalg.norm(lado, axis=1)
+		self.tangente = lado / self.longitud[:, None]
+		self.normal = np.column_stack((-self.tangente[:, 1], self.tangente[:, 0]))
+		self.centro = inicio + 0.5*lado
+
+		# Normal exterior: depende del sentido en que se recorre cada cuerpo
+		sentido = np.array([np.sign(_area(c)) for c in self.cuerpos])
+		self.normal_exterior = -self.normal*sentido[self.cuerpo_panel][:, None]
+
+		if lu is None:
+			self.lu = linalg.lu_factor(self._matriz())
+		else:
+			self.lu, self.matriz_tangencial = lu, matriz_tangencial
+
+	@classmethod
+	def desde_perfiles(cls, foils, **kwargs):
+		"""
+			Solver para una lista de Airfoil en su posición actual
+		"""
+		return cls([contorno(foil) for foil in foils], **kwargs)
+
+	@classmethod
+	def desde_aleron(cls, aleron, **kwargs):
+		"""
+			Solver para un Alerón en su posición actual. Si el alerón está normalizado
+			(normalizarAleron) la cuerda de referencia 1 es la cuerda total
+		"""
+		return cls.desde_perfiles(aleron.foils, **kwargs)
+
+	def _matriz(self):
+		"""
+			Monta la matriz del sistema y guarda la de velocidad tangencial en los
+			puntos de colocación (self.matriz_tangencial), que sale de los mismos términos
+		"""
+		n_paneles = len(self.longitud)
+		n_nodos = len(self.nodos)
+
+		# Puntos de colocación en ejes de cada panel
+		d = self.centro[:, None, :] - self.nodos[self.nodo_inicio][None, :, :]
+		x = d[..., 0]*self.tangente[None, :, 0] + d[..., 1]*self.tangente[None, :, 1]
+		y = d[..., 0]*self.normal[None, :, 0] + d[..., 1]*self.normal[None, :, 1]
+		# En el propio panel, el lado de fuera (el salto de velocidad de la lámina)
+		lado = np.sum(self.normal_exterior*self.normal, axis=1)
+		y[np.diag_indices(n_paneles)] = np.copysign(0.0, lado)
+		ua, va, ub, vb = _influencia(x, y, self.longitud[None, :])
+
+		# Componentes normal y tangencial en el punto de colocación
+		tn = self.normal @ self.tangente.T
+		nn = self.normal @ self.normal.T
+		tt = self.tangente @ self.tangente.T
+		nt = self.tangente @ self.normal.T
+
+		matriz = np.zeros((n_nodos, n_nodos))
+		# Cada nodo es inicio de un panel y/o fin de otro, sin repetir en cada grupo
+		matriz[:n_paneles, self.nodo_inicio] += ua*tn + va*nn
+		matriz[:n_paneles, self.nodo_fin] += ub*tn + vb*nn
+
+		self.matriz_tangencial = np.zeros((n_paneles, n_nodos))
+		self.matriz_tangencial[:, self.nodo_inicio] += ua*tt + va*nt
+		self.matriz_tangencial[:, self.nodo_fin] += ub*tt + vb*nt
+
+		# Kutta: gamma en el borde de salida de arriba y de abajo se anulan
+		filas = np.arange(n_paneles, n_nodos)
+		matriz[filas, self.primer_nodo] = 1
+		matriz[filas, self.ultimo_nodo] = 1
+		return matriz
+
+	def terminos_independientes(self, alfas):
+		"""
+			Términos independientes para los ángulos 'alfas' (grados), uno por columna
+		"""
+		a = np.deg2rad(np.atleast_1d(np.asarray(alfas, dtype=float)))
+		b = np.zeros((len(self.nodos), len(a)))
+		b[:len(self.longitud)] = -(np.outer(self.normal[:, 0], np.cos(a)) + np.outer(self.normal[:, 1], np.sin(a)))
+		return b
+
+	def resolver(self, alfas):
+		"""
+			Resuelve para todos los ángulos a la vez con la factorización ya hecha
+			- Argumentos:
+				- alfas: ángulo(s) de ataque de la corriente libre en grados, respecto a
+					los ejes del alerón tal como está colocado
+			- Devuelve un diccionario con arrays de n_alfas filas:
+					- gamma: intensidad en cada nodo
+					- V: velocidad en la superficie (/ V_inf) en el centro de cada panel, por
+						fuera del cuerpo y positiva en el sentido del contorno
+					- Cp: coeficiente de presión en el centro de cada panel
+					- Cl: sustentación total (Kutta-Joukowski)
+					- Cl_elementos, Cd_elementos: fuerzas de cada elemento integrando la presión
+					- Cm: momento respecto a x_ref
+		"""
+		alfas = np.atleast_1d(np.asarray(alfas, dtype=float))
+		gamma = linalg.lu_solve(self.lu, self.terminos_independientes(alfas)).T
+
+		circulacion = np.sum(0.5*(gamma[:, self.nodo_inicio] + gamma[:, self.nodo_fin])*self.longitud, axis=1)
+		cl = -2*circulacion / self.cuerda_ref
+
+		# No se usa gamma en los nodos para la velocidad: la condición solo fija la
+		# velocidad normal y cerca del borde de salida gamma oscila de un nodo a otro
+		a = np.deg2rad(alfas)
+		v = gamma @ self.matriz_tangencial.T + np.outer(np.cos(a), self.tangente[:, 0]) + np.outer(np.sin(a), self.tangente[:, 1])
+		cp = 1 - v**2
+		fx = -cp*self.normal_exterior[:, 0]*self.longitud / self.cuerda_ref
+		fy = -cp*self.normal_exterior[:, 1]*self.longitud / self.cuerda_ref
+		brazo = self.centro - self.x_ref
+		cm = np.sum(brazo[:, 1]*fx - brazo[:, 0]*fy, axis=1) / self.cuerda_ref
+
+		# Fuerzas de cada elemento en ejes viento
+		a = a[:, None]
+		l_panel = -fx*np.sin(a) + fy*np.cos(a)
+		d_panel = fx*np.cos(a) + fy*np.sin(a)
+		cuerpo_panel = self.cuerpo_panel
+		n_cuerpos = len(self.cuerpos)
+		cl_elementos = np.stack([l_panel[:, cuerpo_panel == i].sum(axis=1) for i in range(n_cuerpos)], axis=1)
+		cd_elementos = np.stack([d_panel[:, cuerpo_panel == i].sum(axis=1) for i in range(n_cuerpos)], axis=1)
+
+		return {
+			"alfa": alfas,
+			"gamma": gamma,
+			"V": v,
+			"Cp": cp,
+			"Cl": cl,
+			"Cl_elementos": cl_elementos,
+			"Cd_elementos": cd_elementos,
+			"Cm": cm,
+		}
+
+
+def _area(puntos):
+	x, y = puntos[:, 0], puntos[:, 1]
+	return 0.5*np.sum(x*np.roll(y, -1) - np.roll(x, -1)*y)
@@ -0,0 +1,176 @@
+"""
+Polares de un alerón: todos los ángulos de ataque de una vez
+
+La matriz del método de paneles solo depende de la geometría, así que para una
+polar se monta y factoriza una vez y todos los ángulos se resuelven juntos (una
+columna del término independiente por ángulo). La factorización y la matriz de
+velocidad tangencial se guardan en disco con la huella de la geometría como
+nombre, de forma que repetir una polar (o pedir otros ángulos) para la misma
+geometría es solo la sustitución.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from Generador_de_alas.alas.capa_limite import NCRIT, capa_limite
+from Generador_de_alas.alas.paneles import SolverPaneles, contorno
+
+
+# Cambiar si cambia la formulación del solver: invalida las cachés antiguas
+VERSION_CACHE = 2
+
+
+def huella_geometria(cuerpos, cuerda_ref=1.0, x_ref=(0.25, 0.0)):
+	"""
+		Hash (hex) de los contornos y de las referencias de los coeficientes
+	"""
+	h = hashlib.sha1()
+	h.update(f"paneles-v{VERSION_CACHE}-{len(cuerpos)}".encode())
+	for cuerpo in cuerpos:
+		cuerpo = np.ascontiguousarray(cuerpo, dtype=np.float64)
+		h.update(np.asarray(cuerpo.shape, dtype=np.int64).tobytes())
+		h.update(cuerpo.tobytes())
+	h.update(np.asarray([cuerda_ref, *x_ref], dtype=np.float64).tobytes())
+	return h.hexdigest()
+
+
+def cuerda_y_angulo(foils):
+	"""
+		Cuerda total y su ángulo (grados) medidos sobre la geometría actual: del
+		borde de ataque del primer perfil al borde de salida del último. Es lo mismo
+		que Alerón.cuerdaTotal y Alerón.AOATotal, pero vale también después de
+		normalizarAleron o rotar
+		- Devuelve (cuerda, angulo, borde_ataque)
+	"""
+	borde_ataque = np.array([foils[0]._x_upper[0], foils[0]._y_upper[0]])
+	ultimo = foils[-1]
+	borde_salida = 0.5*np.array([
+		ultimo._x_upper[-1] + ultimo._x_lower[-1],
+		ultimo._y_upper[-1] + ultimo._y_lower[-1],
+	])
+	dx, dy = borde_salida - borde_ataque
+	return np.hypot(dx, dy), np.rad2deg(np.arctan2(dy, dx)), borde_ataque
+
+
+class CachePolares:
+	"""
+		Caché de factorizaciones del método de paneles, en memoria (LRU) y en disco
+
+		- Atributos:
+			- carpeta: dónde se guardan los .npz (None para solo memoria)
+			- max_memoria: número de solvers que se mantienen en memoria
+			- aciertos, fallos: contadores de uso
+	"""
+
+	def __init__(self, carpeta=None, max_memoria=32):
+		self.carpeta = carpeta
+		self.max_memoria = max_memoria
+		self.aciertos = 0
+		self.fallos = 0
+		self._memoria = OrderedDict()
+
+		if carpeta is not None and not os.path.exists(carpeta):
+			os.makedirs(carpeta)
+
+	def ruta(self, huella):
+		return os.path.join(self.carpeta, huella + ".npz")
+
+	def solver(self, cuerpos, cuerda_ref=1.0, x_ref=(0.25, 0.0)):
+		"""
+			SolverPaneles para 'cuerpos', reutilizando la factorización si la
+			geometría ya se ha visto (en esta sesión o en otra, si hay carpeta)
+		"""
+		huella = huella_geometria(cuerpos, cuerda_ref, x_ref)
+
+		if huella in self._memoria:
+			self._memoria.move_to_end(huella)
+			self.aciertos += 1
+			return self._memoria[huella]
+
+		lu = None
+		if self.carpeta is not None and os.path.exists(self.ruta(huella)):
+			with np.load(self.ruta(huella)) as datos:
+				lu = (datos["lu"], datos["piv"])
+				tangencial = datos["tangencial"]
+
+		solver = SolverPaneles(cuerpos, cuerda_ref=cuerda_ref, x_ref=x_ref, lu=lu,
+			matriz_tangencial=None if lu is None else tangencial)
+
+		if lu is None:
+			self.fallos += 1
+			if self.carpeta is not None:
+				# Escritura atómica: otro proceso puede estar leyendo la misma huella
+				temporal = self.ruta(huella) + f".{os.getpid()}.tmp"
+				with open(temporal, "wb") as archivo:
+					np.savez(archivo, lu=solver.lu[0], piv=solver.lu[1], tangencial=solver.matriz_tangencial)
+				os.replace(temporal, self.ruta(huella))
+		else:
+			self.aciertos += 1
+
+		self._memoria[huella] = solver
+		if len(self._memoria) > self.max_memoria:
+			self._memoria.popitem(last=False)
+		return solver
+
+
+def polar(aleron, alfas, referencia="cuerda", cache=None, cuerda_ref=None, x_ref=None, reynolds=None, ncrit=NCRIT):
+	"""
+		Polar no viscosa de un Alerón (o lista de Airfoil) en su posición actual
+		- Argumentos:
+			- aleron: Alerón o lista de Airfoil
+			- alfas: vector de ángulos de ataque en grados
+			- referencia: respecto a qué se miden los ángulos
+				- "ejes": la corriente forma 'alfa' con el eje x, tal como está colocado
+				  el alerón (es como hacer Alerón.rotar(-alfa) con la corriente horizontal)
+				- "cuerda": respecto a la cuerda total (ver cuerda_y_angulo)
+			- cache: CachePolares (o None para no guardar nada)
+			- cuerda_ref: por defecto la cuerda total
+			- x_ref: punto para el momento, por defecto a 1/4 de la cuerda total
+			- reynolds: si se da, añade la capa límite (ver capa_limite.capa_limite)
+			- ncrit: N de transición para la capa límite
+		- Devuelve el diccionario de SolverPaneles.resolver (Cl, Cm de forma (n_alfas,),
+		  V y Cp de forma (n_alfas, n_paneles), ...) más:
+			- puntos: coordenadas de los centros de los paneles, donde están V y Cp
+			- cuerpo_panel: a qué elemento pertenece cada panel
+			- alfa_ejes: los ángulos respecto al eje x con los que se ha resuelto
+			- viscoso: resultado de capa_limite.capa_limite (solo con reynolds)
+	"""
+	foils = aleron.foils if hasattr(aleron, "foils") else list(aleron)
+	cuerda, angulo, borde_ataque = cuerda_y_angulo(foils)
+
+	if cuerda_ref is None:
+		cuerda_ref = cuerda
+	if x_ref is None:
+		a = np.deg2rad(angulo)
+		x_ref = borde_ataque + 0.25*cuerda*np.array([np.cos(a), np.sin(a)])
+
+	if referencia == "ejes":
+		desfase = 0
+	elif referencia == "cuerda":
+		# La cuerda forma 'angulo' con el eje x
+		desfase = angulo
+	else:
+		raise ValueError(f"referencia desconocida: '{referencia}' (\"ejes\" o \"cuerda\")")
+
+	cuerpos = [contorno(foil) for foil in foils]
+	x_ref = tuple(float(x) for x in x_ref)
+	if cache is None:
+		solver = SolverPaneles(cuerpos, cuerda_ref=cuerda_ref, x_ref=x_ref)
+	else:
+		solver = cache.solver(cuerpos, cuerda_ref=cuerda_ref, x_ref=x_ref)
+
+	alfas = np.atleast_1d(np.asarray(alfas, dtype=float))
+	resultado = solver.resolver(alfas + desfase)
+	resultado["alfa"] = alfas
+	resultado["alfa_ejes"] = alfas + desfase
+	resultado["puntos"] = solver.centro
+	resultado["cuerpo_panel"] = solver.cuerpo_panel
+	if reynolds is not None:
+		resultado["viscoso"] = capa_limite(
+			solver.centro, resultado["V"], solver.cuerpo_panel, reynolds,
+			cuerda_ref=cuerda_ref, ncrit=ncrit
+		)
+	return resultado
@@ -0,0 +1,321 @@
+"""
+Línea de comandos a partir de archivos de caso (ver configuracion.py)
+
+	python -m Generador_de_alas wing caso.yaml			# alerón: coordenadas y png
+	python -m Generador_de_alas mesh caso.yaml --jobs 4	# y su malla (4 hilos de gmsh)
+	python -m Generador_de_alas sweep caso.yaml --jobs 4	# alerón y malla de cada punto del barrido
+	python -m Generador_de_alas su2 caso.yaml --jobs 4	# y los casos de SU2 (4 a la vez) y su tabla
+
+(o python generador.py ... desde la raíz del repositorio). Nada abre ventanas: los
+gráficos se guardan con Agg y gmsh no enseña la interfaz.
+
+Las salidas van a <salida>/alas/<huella>, <salida>/mallas/<huella>,
+<salida>/su2/<huella> y <salida>/barridos/<huella>. Una etapa cuya carpeta ya
+existe no se repite (salvo con --forzar); las carpetas de alas y mallas se
+escriben aparte y se renombran al terminar, así que nunca quedan a medias.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import shutil
+import sys
+
+from Generador_de_alas import configuracion
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.aleron import Alerón, gaps_normalizados
+from Generador_de_alas.alas.fileio import import_airfoil_data
+from Generador_de_alas.configuracion import ConfiguracionError
+from Generador_de_alas.mallador.sesion import mallar_lote
+from Generador_de_alas.su2.casos import preparar_caso
+from Generador_de_alas.su2.ejecutor import COMANDO_SIMULADO, CONVERGIDO, TERMINADO, ejecutar_casos
+from Generador_de_alas.su2.resultados import guardar_tabla, tabla_resultados
+
+
+# Estados de una etapa al terminar
+HECHO = "hecho"
+YA_ESTABA = "ya estaba"
+PREPARADO = "preparado"		# caso de SU2 sin lanzar (--solo-preparar)
+FALLO = "falló"
+
+
+def _carpeta_etapa(config, etapa, huella):
+	return os.path.join(configuracion.ruta_caso(config, config["salida"]), etapa, huella)
+
+
+def _publicar(temporal, carpeta):
+	"""Pone la carpeta terminada en su sitio (sustituyendo la que hubiera)"""
+	if os.path.exists(carpeta):
+		shutil.rmtree(carpeta)
+	os.replace(temporal, carpeta)
+
+
+def _temporal(carpeta):
+	temporal = f"{carpeta}.tmp-{os.getpid()}"
+	if os.path.exists(temporal):
+		shutil.rmtree(temporal)
+	os.makedirs(temporal)
+	return temporal
+
+
+def _guardar_json(ruta, datos):
+	with open(ruta, "w") as archivo:
+		json.dump(datos, archivo, indent=1)
+
+
+def construir_ala(config):
+	"""
+		Alerón de la sección 'ala' del caso, como en Mi_aleron.py
+	"""
+	ala = config["ala"]
+	foils = []
+	gaps = []
+	for i, elemento in enumerate(ala["elementos"]):
+		meta = {"name": elemento["nombre"]}
+		if elemento["perfil"] is not None:
+			upper, lower = import_airfoil_data(configuracion.ruta_caso(config, elemento["perfil"]))
+			foil = Airfoil(upper, lower, meta, tolerance=elemento["tolerancia"])
+		else:
+			foil = Airfoil.NACA(elemento["naca"], meta=meta, tolerance=elemento["tolerancia"])
+		if elemento["invertir"]:
+			foil.flip()
+		foil.escalar(elemento["cuerda"])
+		foil.setAOA(elemento["aoa"])
+		if i > 0:
+			anterior = ala["elementos"][i - 1]
+			gaps.append(gaps_normalizados(anterior["cuerda"], anterior["aoa"], elemento["gap"]))
+		foils.append(foil)
+
+	aleron = Alerón(foils, gaps, {"name": ala["nombre"]})
+	if ala["normalizar"]:
+		aleron.normalizarAleron()
+	if ala["rotar_aoa_total"]:
+		aleron.rotar(aleron.AOATotal)
+	return aleron
+
+
+def etapa_ala(config, forzar=False):
+	"""
+		Coordenadas de cada elemento (una por archivo, las que lee el mallador),
+		ala.json con la cuerda y el AOA total y, si se pide, el archivo de JavaFoil y
+		el png
+		- Devuelve (carpeta, estado)
+	"""
+	carpeta = _carpeta_etapa(config, "alas", configuracion.huella_ala(config))
+	if os.path.isdir(carpeta) and not forzar:
+		return carpeta, YA_ESTABA
+
+	temporal = _temporal(carpeta)
+	# El alerón y los perfiles cuentan lo que hacen por pantalla
+	with contextlib.redirect_stdout(io.StringIO()):
+		aleron = construir_ala(config)
+		for foil in aleron.foils:
+			foil.exportar(filename=os.path.join(temporal, foil.meta["name"] + ".txt"))
+		if config["ala"]["javafoil"]:
+			aleron.exportarJavaFoil(carpeta=temporal)
+		if config["ala"]["grafico"]:
+			aleron.plot(show=False, save=True, settings={"path": temporal, "file_name": "ala.png"})
+
+	_guardar_json(os.path.join(temporal, "ala.json"), {
+		"ala": config["ala"],
+		"cuerdaTotal": float(aleron.cuerdaTotal),
+		"AOATotal": float(aleron.AOATotal),
+	})
+	_publicar(temporal, carpeta)
+	return carpeta, HECHO
+
+
+def archivos_ala(config, carpeta_ala):
+	"""(archivos de coordenadas, nombres) de los elementos"""
+	nombres = [elemento["nombre"] for elemento in config["ala"]["elementos"]]
+	return [os.path.join(carpeta_ala, nombre + ".txt") for nombre in nombres], nombres
+
+
+def etapa_mallas(configs, n_trabajos=1, hilos=1, forzar=False):
+	"""
+		Malla (malla.su2) de cada caso, las que falten a la vez con mallar_lote
+		- Argumentos:
+			- configs: casos (p.ej. uno por punto del barrido), los que den la
+			  misma malla se mallan una vez
+			- n_trabajos: procesos de mallado
+			- hilos: hilos de gmsh por proceso
+		- Devuelve [(carpeta, estado)], uno por caso
+	"""
+	carpetas = [_carpeta_etapa(config, "mallas", configuracion.huella_malla(config)) for config in configs]
+	estados = {}
+	tareas = []
+	for config, carpeta in zip(configs, carpetas):
+		if carpeta in estados:
+			continue
+		if os.path.isdir(carpeta) and not forzar:
+			estados[carpeta] = YA_ESTABA
+			continue
+		carpeta_ala, _ = etapa_ala(config, forzar)
+		archivos, nombres = archivos_ala(config, carpeta_ala)
+		temporal = _temporal(carpeta)
+		_guardar_json(os.path.join(temporal, "malla.json"), {"ala": carpeta_ala, "malla": config["malla"]})
+		tareas.append((carpeta, temporal, (archivos, nombres, os.path.join(temporal, "malla.su2"), config["malla"])))
+		estados[carpeta] = None
+
+	if tareas:
+		try:
+			salidas = mallar_lote([tarea for _, _, tarea in tareas], n_trabajos=n_trabajos, hilos=hilos)
+		except BaseException:
+			for _, temporal, _ in tareas:
+				shutil.rmtree(temporal, ignore_errors=True)
+			raise
+		for (carpeta, temporal, _), (salida, informe) in zip(tareas, salidas):
+			if salida is None:
+				# Rechazada por calidad (comprobar_calidad)
+				shutil.rmtree(temporal)
+				print(f"{carpeta}\tmalla rechazada: {'; '.join(informe.motivos)}", file=sys.stderr)
+				estados[carpeta] = FALLO
+			else:
+				_publicar(temporal, carpeta)
+				estados[carpeta] = HECHO
+
+	return [(carpeta, estados[carpeta]) for carpeta in carpetas]
+
+
+def _comando(su2):
+	if su2["comando"] == "simulado":
+		return COMANDO_SIMULADO
+	return tuple(shlex.split(su2["comando"]))
+
+
+def etapa_su2(configs, parametros, n_trabajos=1, hilos_gmsh=1, forzar=False, ejecutar=True):
+	"""
+		Un caso de SU2 por punto del barrido, con su malla, y la tabla de resultados
+		- Argumentos:
+			- configs, parametros: caso y {ruta: valor} de cada punto del barrido
+			- n_trabajos: procesos de mallado y casos de SU2 a la vez
+			- ejecutar: False para dejar los casos preparados sin lanzarlos
+		- Devuelve ([(carpeta, estado)] de cada caso, ruta de la tabla o None)
+	"""
+	mallas = etapa_mallas(configs, n_trabajos, hilos_gmsh, forzar)
+	base = configs[0]
+	su2 = base["su2"]
+	carpeta_su2 = os.path.join(configuracion.ruta_caso(base, base["salida"]), "su2")
+
+	carpetas = []
+	resultados = {}
+	pendientes = []
+	for config, punto, (carpeta_malla, estado_malla) in zip(configs, parametros, mallas):
+		huella = configuracion.huella_su2(config)
+		carpeta = os.path.join(carpeta_su2, huella)
+		carpetas.append(carpeta)
+		ruta_resultado = os.path.join(carpeta, "resultado.json")
+		if carpeta in resultados:
+			continue
+		if estado_malla == FALLO:
+			resultados[carpeta] = FALLO
+		elif os.path.exists(ruta_resultado) and not forzar:
+			with open(ruta_resultado, "r") as archivo:
+				resultados[carpeta] = json.load(archivo)
+		else:
+			if os.path.exists(ruta_resultado):
+				os.remove(ruta_resultado)
+			pendientes.append(preparar_caso(
+				carpeta_su2, huella, punto, os.path.join(carpeta_malla, "malla.su2"),
+				configuracion.ruta_caso(config, config["su2"]["cfg_base"]), config["su2"]["cambios"]
+			))
+			resultados[carpeta] = None
+
+	if pendientes and ejecutar:
+		hechos = ejecutar_casos(
+			pendientes, _comando(su2), su2["hilos"], su2["procesos_mpi"],
+			n_trabajos=n_trabajos, tiempo_max=su2["tiempo_max"]
+		)
+		for caso, resultado in zip(pendientes, hechos):
+			resultados[caso.carpeta] = resultado
+			# Los que fallan o se quedan sin tiempo se repiten la próxima vez
+			if resultado["estado"] in (CONVERGIDO, TERMINADO):
+				_guardar_json(os.path.join(caso.carpeta, "resultado.json"), resultado)
+
+	nuevos = {caso.carpeta for caso in pendientes}
+	filas = []
+	for carpeta in carpetas:
+		resultado = resultados[carpeta]
+		if resultado is None:
+			filas.append((carpeta, PREPARADO))
+		elif resultado == FALLO or resultado["estado"] not in (CONVERGIDO, TERMINADO):
+			filas.append((carpeta, FALLO))
+		else:
+			filas.append((carpeta, HECHO if carpeta in nuevos else YA_ESTABA))
+
+	completos = [resultados[carpeta] for carpeta in carpetas if isinstance(resultados[carpeta], dict)]
+	if not completos:
+		return filas, None
+	tabla = os.path.join(
+		configuracion.ruta_caso(base, base["salida"]), "barridos",
+		configuracion.huella("barrido", sorted(os.path.basename(carpeta) for carpeta in carpetas)), su2["tabla"]
+	)
+	guardar_tabla(tabla_resultados(completos), tabla)
+	return filas, tabla
+
+
+def _informe(filas):
+	for carpeta, estado in filas:
+		print(f"{carpeta}\t{estado}")
+	return 1 if any(estado == FALLO for _, estado in filas) else 0
+
+
+def argumentos():
+	parser = argparse.ArgumentParser(
+		prog="generador", description="Alerones, mallas y casos de SU2 a partir de un archivo de caso (YAML o TOML)"
+	)
+	subparsers = parser.add_subparsers(dest="orden", required=True)
+	ayudas = {
+		"wing": "alerón del caso (sin barrido): coordenadas, ala.json y png",
+		"mesh": "malla del caso (sin barrido); --jobs son hilos de gmsh",
+		"sweep": "alerón y malla de cada punto del barrido; --jobs son procesos",
+		"su2": "mallas, casos de SU2 y tabla de resultados del barrido; --jobs son casos a la vez",
+	}
+	for orden, ayuda in ayudas.items():
+		sub = subparsers.add_parser(orden, help=ayuda, description=ayuda)
+		sub.add_argument("caso", help="archivo de caso .yaml, .yml o .toml")
+		sub.add_argument("-j", "--jobs", type=int, default=1, help="trabajos en paralelo (por defecto 1)")
+		sub.add_argument("-o", "--salida", help="carpeta de salida (sustituye a 'salida' del caso)")
+		sub.add_argument("--forzar", action="store_true", help="rehacer aunque la salida ya exista")
+		if orden == "su2":
+			sub.add_argument("--solo-preparar", action="store_true", help="preparar los casos sin lanzar SU2")
+	return parser
+
+
+def main(argv=None):
+	opciones = argumentos().parse_args(argv)
+	if opciones.jobs < 1:
+		print("--jobs debe ser al menos 1", file=sys.stderr)
+		return 2
+
+	# Sin pantalla: nada de ventanas de matplotlib
+	os.environ.setdefault("MPLBACKEND", "Agg")
+
+	try:
+		config = configuracion.leer_caso(opciones.caso)
+		if opciones.orden == "su2" and config["su2"] is None:
+			raise ConfiguracionError(["su2: falta (hace falta para la orden su2)"])
+	except ConfiguracionError as error:
+		print(error, file=sys.stderr)
+		return 2
+	if opciones.salida is not None:
+		config["salida"] = os.path.abspath(opciones.salida)
+
+	if opciones.orden == "wing":
+		return _informe([etapa_ala(config, opciones.forzar)])
+	if opciones.orden == "mesh":
+		return _informe(etapa_mallas([config], 1, opciones.jobs, opciones.forzar))
+
+	puntos = configuracion.puntos_barrido(config)
+	configs = [configuracion.aplicar(config, punto) for punto in puntos]
+	if opciones.orden == "sweep":
+		return _informe(etapa_mallas(configs, opciones.jobs, 1, opciones.forzar))
+
+	filas, tabla = etapa_su2(configs, puntos, opciones.jobs, 1, opciones.forzar, not opciones.solo_preparar)
+	codigo = _informe(filas)
+	if tabla is not None:
+		print(f"{tabla}\ttabla")
+	return codigo
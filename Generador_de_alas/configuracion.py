@@ -0,0 +1,373 @@
+"""
+Archivos de caso (YAML o TOML) para la línea de comandos (ver cli.py)
+
+Un archivo de caso describe lo que antes se cambiaba a mano en Mi_aleron.py y
+mallador.py (ver caso_ejemplo.yaml):
+
+	salida: resultados					# carpeta de las salidas
+	ala:
+	  nombre: RW
+	  elementos:
+	    - {nombre: main, perfil: datos_perfiles/FX74.dat, invertir: true, cuerda: 0.75, aoa: -5}
+	    - {nombre: flap1, naca: "4412", cuerda: 0.375, aoa: 30, gap: [-0.2, 0.05]}
+	malla: {farfield_mesh_size: 0.2}	# cualquiera de mallado.OPCIONES_MALLA
+	su2: {cfg_base: su2_config_base.cfg, cambios: {ITER: 2000}}
+	barrido:							# ruta del parámetro -> valores
+	  su2.cambios.AOA: [0, 5, 10]
+	  ala.elementos.1.aoa: [25, 30]
+
+Las rutas de archivos son relativas a la carpeta del archivo de caso. El esquema
+se comprueba entero antes de hacer nada y se dan todos los errores a la vez.
+
+Cada etapa (ala, malla, caso de SU2) se guarda en una carpeta con el nombre de la
+huella (sha1) de todo lo que la define, contenido de los archivos de perfiles y
+del .cfg incluido, así que volver a lanzar un caso ya hecho no hace nada.
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+from collections import namedtuple
+
+from Generador_de_alas.mallador.mallado import OPCIONES_MALLA
+
+
+# Cambia cuando cambia lo que se escribe en cada etapa, para no reutilizar
+# salidas viejas
+VERSION_SALIDAS = 1
+
+# Opciones de la malla que abren ventanas de gmsh
+OPCIONES_GRAFICAS = ("preview_geometria",)
+
+
+class ConfiguracionError(ValueError):
+	"""
+		Archivo de caso inválido
+		- Atributos:
+			- errores: lista de "ruta: problema"
+	"""
+
+	def __init__(self, errores):
+		self.errores = list(errores)
+		super().__init__("Archivo de caso inválido:\n" + "\n".join("\t" + error for error in self.errores))
+
+
+Campo = namedtuple("Campo", ["tipos", "defecto", "obligatorio", "esquema", "elementos"])
+Campo.__doc__ = """
+	Una clave del esquema
+	- tipos: tipo o tupla de tipos válidos
+	- defecto: valor si falta (se copia)
+	- obligatorio: error si falta
+	- esquema: {clave: Campo} si el valor es un diccionario
+	- elementos: {clave: Campo} de cada elemento si el valor es una lista de diccionarios
+"""
+
+
+def campo(tipos, defecto=None, obligatorio=False, esquema=None, elementos=None):
+	return Campo(tipos, defecto, obligatorio, esquema, elementos)
+
+
+NUMERO = (int, float)
+
+ESQUEMA_ELEMENTO = {
+	"nombre": campo(str, obligatorio=True),		# también el marcador de la malla
+	"perfil": campo(str),						# archivo de coordenadas (ver fileio)
+	"naca": campo((str, int)),					# o designación NACA (ver naca.py)
+	"invertir": campo(bool, False),				# Airfoil.flip
+	"cuerda": campo(NUMERO, 1.0),
+	"aoa": campo(NUMERO, 0.0),
+	"gap": campo(list, [0.0, 0.0]),				# respecto al elemento anterior (gaps_normalizados)
+	"tolerancia": campo(NUMERO),				# refinado adaptativo (Airfoil tolerance)
+}
+
+ESQUEMA_ALA = {
+	"nombre": campo(str, "ala"),
+	"elementos": campo(list, obligatorio=True, elementos=ESQUEMA_ELEMENTO),
+	"normalizar": campo(bool, True),			# Alerón.normalizarAleron
+	"rotar_aoa_total": campo(bool, True),		# y luego rotar(AOATotal), como Mi_aleron.py
+	"javafoil": campo(bool, False),				# además el archivo de JavaFoil
+	"grafico": campo(bool, True),				# guardar un png del alerón
+}
+
+ESQUEMA_SU2 = {
+	"cfg_base": campo(str, obligatorio=True),
+	"cambios": campo(dict, {}),					# opciones del .cfg (AOA, ITER, ...)
+	"comando": campo(str, "SU2_CFD"),			# "simulado" -> ejecutor.COMANDO_SIMULADO
+	"hilos": campo(int, 1),
+	"procesos_mpi": campo(int, 1),
+	"tiempo_max": campo(NUMERO),				# segundos por caso
+	"tabla": campo(str, "resultados.npz"),		# tabla del barrido (ver resultados.py)
+}
+
+ESQUEMA = {
+	"salida": campo(str, "salida"),
+	"ala": campo(dict, obligatorio=True, esquema=ESQUEMA_ALA),
+	"malla": campo(dict, {}),
+	"su2": campo(dict, esquema=ESQUEMA_SU2),
+	"barrido": campo(dict, {}),
+}
+
+
+def _nombre_tipos(tipos):
+	tipos = tipos if isinstance(tipos, tuple) else (tipos,)
+	return " o ".join(tipo.__name__ for tipo in tipos)
+
+
+def _es(valor, tipos):
+	# En YAML/TOML true no es un número
+	tipos = tipos if isinstance(tipos, tuple) else (tipos,)
+	if isinstance(valor, bool):
+		return bool in tipos
+	return isinstance(valor, tipos)
+
+
+def _comprobar(seccion, esquema, ruta, errores):
+	"""
+		Comprueba 'seccion' contra 'esquema' y devuelve una copia con los valores
+		por defecto, apuntando en 'errores' todo lo que falle
+	"""
+	resultado = {}
+	for clave in seccion:
+		if clave not in esquema:
+			errores.append(f"{ruta}{clave}: clave desconocida (válidas: {', '.join(esquema)})")
+
+	for clave, definicion in esquema.items():
+		if clave not in seccion or seccion[clave] is None:
+			if definicion.obligatorio:
+				errores.append(f"{ruta}{clave}: falta")
+			resultado[clave] = copy.deepcopy(definicion.defecto)
+			continue
+
+		valor = seccion[clave]
+		if not _es(valor, definicion.tipos):
+			errores.append(f"{ruta}{clave}: debe ser {_nombre_tipos(definicion.tipos)}, no {type(valor).__name__}")
+			resultado[clave] = copy.deepcopy(definicion.defecto)
+		elif definicion.esquema is not None:
+			resultado[clave] = _comprobar(valor, definicion.esquema, f"{ruta}{clave}.", errores)
+		elif definicion.elementos is not None:
+			resultado[clave] = []
+			for i, elemento in enumerate(valor):
+				if isinstance(elemento, dict):
+					resultado[clave].append(_comprobar(elemento, definicion.elementos, f"{ruta}{clave}.{i}.", errores))
+				else:
+					errores.append(f"{ruta}{clave}.{i}: debe ser un diccionario")
+		else:
+			resultado[clave] = copy.deepcopy(valor)
+	return resultado
+
+
+def _comprobar_malla(malla, errores):
+	"""Claves de generar_malla, con el tipo de su valor por defecto"""
+	for clave, valor in malla.items():
+		if clave not in OPCIONES_MALLA:
+			errores.append(f"malla.{clave}: opción de malla desconocida (ver mallado.OPCIONES_MALLA)")
+			continue
+		defecto = OPCIONES_MALLA[clave]
+		if isinstance(defecto, bool) and not isinstance(valor, bool):
+			errores.append(f"malla.{clave}: debe ser bool")
+		elif _es(defecto, NUMERO) and valor is not None and not _es(valor, NUMERO):
+			errores.append(f"malla.{clave}: debe ser un número")
+	for clave in OPCIONES_GRAFICAS:
+		if malla.get(clave):
+			errores.append(f"malla.{clave}: abre la interfaz de gmsh, no se puede usar sin pantalla")
+
+
+def _comprobar_ala(ala, carpeta, errores):
+	if ala["elementos"] is None:
+		return
+	nombres = [elemento["nombre"] for elemento in ala["elementos"]]
+	if not ala["elementos"]:
+		errores.append("ala.elementos: hace falta al menos un elemento")
+	if len(set(nombres)) != len(nombres):
+		errores.append(f"ala.elementos: nombres repetidos {nombres}")
+
+	for i, elemento in enumerate(ala["elementos"]):
+		ruta = f"ala.elementos.{i}."
+		if (elemento["perfil"] is None) == (elemento["naca"] is None):
+			errores.append(f"{ruta}perfil/naca: hace falta uno de los dos (y solo uno)")
+		elif elemento["perfil"] is not None and not os.path.isfile(os.path.join(carpeta, elemento["perfil"])):
+			errores.append(f"{ruta}perfil: no existe {elemento['perfil']!r}")
+		if elemento["naca"] is not None:
+			elemento["naca"] = str(elemento["naca"])
+		gap = elemento["gap"]
+		if len(gap) != 2 or not all(_es(g, NUMERO) for g in gap):
+			errores.append(f"{ruta}gap: debe ser [x, y]")
+		if _es(elemento["cuerda"], NUMERO) and elemento["cuerda"] <= 0:
+			errores.append(f"{ruta}cuerda: debe ser positiva")
+
+
+def _comprobar_su2(su2, carpeta, errores):
+	if su2["cfg_base"] is not None and not os.path.isfile(os.path.join(carpeta, su2["cfg_base"])):
+		errores.append(f"su2.cfg_base: no existe {su2['cfg_base']!r}")
+	for clave in ("hilos", "procesos_mpi"):
+		if su2[clave] < 1:
+			errores.append(f"su2.{clave}: debe ser al menos 1")
+
+
+def _partes_ruta(ruta):
+	return [int(parte) if parte.isdigit() else parte for parte in ruta.split(".")]
+
+
+def _existe(config, ruta):
+	actual = config
+	for parte in _partes_ruta(ruta):
+		if isinstance(actual, dict) and isinstance(parte, str) and parte in actual:
+			actual = actual[parte]
+		elif isinstance(actual, list) and isinstance(parte, int) and parte < len(actual):
+			actual = actual[parte]
+		else:
+			return False
+	return True
+
+
+def _comprobar_barrido(config, errores):
+	"""Apunta los ejes del barrido que no valen y devuelve los que sí"""
+	validos = []
+	for ruta, valores in config["barrido"].items():
+		if not isinstance(valores, list) or not valores:
+			errores.append(f"barrido.{ruta}: debe ser una lista de valores no vacía")
+		elif ruta.startswith("su2.cambios.") and config["su2"] is not None:
+			# Las opciones de SU2 pueden no estar aún en los cambios
+			validos.append(ruta)
+		elif ruta.startswith("malla.") and ruta[len("malla."):] in OPCIONES_MALLA:
+			validos.append(ruta)
+		elif ruta.startswith(("salida", "barrido")) or not _existe(config, ruta):
+			errores.append(f"barrido.{ruta}: no es un parámetro del caso")
+		else:
+			validos.append(ruta)
+	return validos
+
+
+def _revisar(datos, carpeta):
+	"""Caso con los valores por defecto y lista de errores"""
+	errores = []
+	config = _comprobar(datos, ESQUEMA, "", errores)
+	if config["ala"] is not None:
+		_comprobar_ala(config["ala"], carpeta, errores)
+	_comprobar_malla(config["malla"], errores)
+	if config["su2"] is not None:
+		_comprobar_su2(config["su2"], carpeta, errores)
+	return config, errores
+
+
+def validar(datos, carpeta="."):
+	"""
+		Comprueba un caso ya leído, y cada valor de su barrido
+		- Argumentos:
+			- datos: diccionario del archivo de caso
+			- carpeta: carpeta respecto a la que van las rutas del caso
+		- Devuelve el caso completo, con los valores por defecto
+		- Lanza ConfiguracionError con todos los errores
+	"""
+	if not isinstance(datos, dict):
+		raise ConfiguracionError(["el archivo de caso debe ser un diccionario"])
+
+	config, errores = _revisar(datos, carpeta)
+	del_caso = set(errores)
+	# Cada valor de los ejes que valen, aunque haya otros errores: solo se
+	# apunta lo que falla por el valor, no lo que ya falla en el caso
+	for ruta in _comprobar_barrido(config, errores):
+		for valor in config["barrido"][ruta]:
+			_, otros = _revisar(aplicar(config, {ruta: valor}), carpeta)
+			errores += [f"barrido.{ruta}={valor!r} -> {error}" for error in otros if error not in del_caso]
+
+	if errores:
+		raise ConfiguracionError(errores)
+	config["carpeta"] = os.path.abspath(carpeta)
+	return config
+
+
+def leer_datos(ruta):
+	"""
+		Lee un archivo de caso .yaml/.yml (necesita PyYAML) o .toml
+	"""
+	extension = os.path.splitext(ruta)[1].lower()
+	if extension in (".yaml", ".yml"):
+		import yaml
+
+		with open(ruta, "r") as archivo:
+			return yaml.safe_load(archivo)
+	if extension == ".toml":
+		try:
+			import tomllib
+		except ImportError:		# Python < 3.11
+			import tomli as tomllib
+
+		with open(ruta, "rb") as archivo:
+			return tomllib.load(archivo)
+	raise ConfiguracionError([f"{ruta}: formato desconocido (.yaml, .yml o .toml)"])
+
+
+def leer_caso(ruta):
+	"""
+		Lee y comprueba un archivo de caso (ver validar)
+	"""
+	return validar(leer_datos(ruta), os.path.dirname(os.path.abspath(ruta)))
+
+
+def ruta_caso(config, ruta):
+	"""Ruta de un archivo del caso (relativa a la carpeta del archivo de caso)"""
+	return os.path.join(config["carpeta"], ruta)
+
+
+def aplicar(config, parametros):
+	"""
+		Copia del caso con los valores de un punto del barrido ({ruta: valor})
+	"""
+	config = copy.deepcopy(config)
+	for ruta, valor in parametros.items():
+		*camino, ultima = _partes_ruta(ruta)
+		actual = config
+		for parte in camino:
+			actual = actual[parte]
+		actual[ultima] = valor
+	return config
+
+
+def puntos_barrido(config):
+	"""
+		Producto cartesiano de los ejes del barrido ([{}] si no hay barrido)
+	"""
+	rutas = list(config["barrido"])
+	return [dict(zip(rutas, valores)) for valores in itertools.product(*config["barrido"].values())]
+
+
+def _sha1_archivo(ruta):
+	sha1 = hashlib.sha1()
+	with open(ruta, "rb") as archivo:
+		for bloque in iter(lambda: archivo.read(1 << 20), b""):
+			sha1.update(bloque)
+	return sha1.hexdigest()
+
+
+def huella(*partes):
+	"""
+		sha1 (12 caracteres) del JSON canónico de 'partes'
+	"""
+	texto = json.dumps([VERSION_SALIDAS, *partes], sort_keys=True, separators=(",", ":"))
+	return hashlib.sha1(texto.encode()).hexdigest()[:12]
+
+
+def huella_ala(config):
+	"""Huella del alerón: su sección y el contenido de los archivos de perfiles"""
+	archivos = [
+		_sha1_archivo(ruta_caso(config, elemento["perfil"]))
+		for elemento in config["ala"]["elementos"] if elemento["perfil"] is not None
+	]
+	return huella("ala", config["ala"], archivos)
+
+
+def huella_malla(config):
+	"""Huella de la malla: la del alerón y las opciones de la malla"""
+	return huella("malla", huella_ala(config), config["malla"])
+
+
+def huella_su2(config):
+	"""Huella de un caso de SU2: la de la malla, el .cfg base y los cambios"""
+	su2 = dict(config["su2"], cfg_base=_sha1_archivo(ruta_caso(config, config["su2"]["cfg_base"])))
+	# Lo que solo cambia cómo se lanza no cambia el caso
+	for clave in ("hilos", "procesos_mpi", "tiempo_max", "tabla"):
+		su2.pop(clave)
+	return huella("su2", huella_malla(config), su2)
@@ -0,0 +1,295 @@
+"""
+Calidad de malla y rechazo rápido antes de lanzar SU2
+
+Todas las métricas se calculan vectorizadas sobre los arrays de nodos y
+conectividad que da gmsh (triángulos y cuadriláteros), sin bucles por elemento,
+para poder revisar mallas de millones de celdas en segundos:
+	- relación de aspecto, skewness (equiangular), ángulo mínimo y máximo
+	- signo del jacobiano en cada esquina (elementos invertidos)
+	- altura de la primera celda junto a la pared frente a first_layer_height
+	- ratio de crecimiento de las capas frente a bl_ratio
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+gmsh = perezoso("gmsh")
+
+
+# Límites por defecto para dar una malla por buena
+UMBRALES_CALIDAD = {
+	"skewness_max": 0.95,
+	"angulo_min": 2.0,				# grados
+	"aspecto_max": 5000.0,			# las celdas de capa límite son muy alargadas
+	"invertidos_max": 0,
+	"tolerancia_primera_capa": 0.5,	# |h1/first_layer_height - 1| máximo
+	"tolerancia_crecimiento": 0.25,	# |crecimiento/bl_ratio - 1| máximo
+}
+
+# Marcadores que no son paredes (ver gmsh_helpers)
+MARCADORES_NO_PARED = ("farfield", "inlet", "outlet", "wall", "fluido", "borde de capa limite")
+
+
+class MallaInvalidaError(Exception):
+	"""Raised when a mesh does not pass the quality gate"""
+
+	def __init__(self, informe):
+		self.informe = informe
+		super().__init__("Mesh rejected: " + "; ".join(informe.motivos))
+
+
+class InformeCalidad:
+	"""
+		Resumen de la calidad de una malla
+		- Atributos:
+			- n_elementos, n_nodos
+			- estadisticas: {métrica: (mínimo, p1, mediana, p99, máximo)}
+			- invertidos: número de elementos con alguna esquina de jacobiano negativo
+			- motivos: razones por las que no pasa los umbrales (vacío si pasa)
+	"""
+
+	def __init__(self, n_nodos, metricas, capa_limite, umbrales):
+		self.n_nodos = n_nodos
+		self.n_elementos = len(metricas.get("aspecto", ()))
+		self.invertidos = int(np.count_nonzero(metricas.get("jacobiano", np.empty(0)) <= 0))
+		self.umbrales = umbrales
+
+		self.estadisticas = {}
+		for nombre, valores in dict(metricas, **capa_limite).items():
+			valores = valores[np.isfinite(valores)]
+			if len(valores):
+				self.estadisticas[nombre] = tuple(np.percentile(valores, (0, 1, 50, 99, 100)))
+
+		self.motivos = []
+		self._comprobar()
+
+	@property
+	def ok(self):
+		return not self.motivos
+
+	def _comprobar(self):
+		u = self.umbrales
+		e = self.estadisticas
+
+		if not self.n_elementos:
+			self.motivos.append("empty mesh")
+			return
+		if self.invertidos > u["invertidos_max"]:
+			self.motivos.append(f"{self.invertidos} inverted elements")
+		if e["skewness"][4] > u["skewness_max"]:
+			self.motivos.append(f"max skewness {e['skewness'][4]:.3f} > {u['skewness_max']}")
+		if e["angulo_min"][0] < u["angulo_min"]:
+			self.motivos.append(f"min angle {e['angulo_min'][0]:.2f} deg < {u['angulo_min']}")
+		if e["aspecto"][4] > u["aspecto_max"]:
+			self.motivos.append(f"max aspect ratio {e['aspecto'][4]:.1f} > {u['aspecto_max']}")
+		if "primera_capa" in e:
+			peor = max(abs(e["primera_capa"][1] - 1), abs(e["primera_capa"][3] - 1))
+			if peor > u["tolerancia_primera_capa"]:
+				self.motivos.append(f"first cell height off target by {100*peor:.0f}%")
+		if "crecimiento" in e:
+			peor = max(abs(e["crecimiento"][1] - 1), abs(e["crecimiento"][3] - 1))
+			if peor > u["tolerancia_crecimiento"]:
+				self.motivos.append(f"layer growth ratio off target by {100*peor:.0f}%")
+
+	def __str__(self):
+		lineas = [
+			f"Nodos: {self.n_nodos}  Elementos: {self.n_elementos}  Invertidos: {self.invertidos}",
+			f"{'':14s}{'min':>11s}{'p1':>11s}{'mediana':>11s}{'p99':>11s}{'max':>11s}",
+		]
+		for nombre, valores in self.estadisticas.items():
+			lineas.append(f"{nombre:14s}" + "".join(f"{v:11.4g}" for v in valores))
+		lineas.append("OK" if self.ok else "RECHAZADA: " + "; ".join(self.motivos))
+		return "\n".join(lineas)
+
+
+def metricas_elementos(nodos, conectividad):
+	"""
+		Métricas de calidad de elementos del mismo tipo
+		- Argumentos:
+			- nodos: array N x 2 (o N x 3, se usa x, y)
+			- conectividad: array M x k con k = 3 (triángulos) o 4 (cuadriláteros),
+				índices de fila en 'nodos'
+		- Devuelve {aspecto, skewness, angulo_min, angulo_max, jacobiano, area}, arrays de M
+			- jacobiano es el jacobiano escalado mínimo de las esquinas (1 = ideal, <= 0 invertido)
+			- area es con signo (positivo = sentido antihorario)
+	"""
+	p = nodos[conectividad][..., :2]
+	k = conectividad.shape[1]
+
+	lados = np.roll(p, -1, axis=1) - p			# lado i: de la esquina i a la i+1
+	longitudes = np.linalg.norm(lados, axis=2)
+	area = 0.5*np.sum(p[..., 0]*np.roll(p[..., 1], -1, axis=1) - np.roll(p[..., 0], -1, axis=1)*p[..., 1], axis=1)
+
+	# En la esquina i se juntan el lado i y el lado i-1 (invertido)
+	entrante = -np.roll(lados, 1, axis=1)
+	cruz = lados[..., 0]*entrante[..., 1] - lados[..., 1]*entrante[..., 0]
+	producto = np.sum(lados*entrante, axis=2)
+	normas = np.maximum(longitudes*np.roll(longitudes, 1, axis=1), np.finfo(float).tiny)
+	angulos = np.degrees(np.arctan2(np.abs(cruz), producto))
+
+	# El sentido de la malla lo marca la mayoría de los elementos
+	sentido = 1.0 if np.sum(area) >= 0 else -1.0
+	jacobiano = np.min(sentido*cruz / normas, axis=1)
+
+	angulo_ideal = 180.0*(k - 2)/k
+	angulo_min = angulos.min(axis=1)
+	angulo_max = angulos.max(axis=1)
+	skewness = np.maximum(
+		(angulo_max - angulo_ideal)/(180.0 - angulo_ideal),
+		(angulo_ideal - angulo_min)/angulo_ideal,
+	)
+
+	l_max = longitudes.max(axis=1)
+	if k == 3:
+		# 1 para el triángulo equilátero
+		aspecto = l_max*longitudes.sum(axis=1) / np.maximum(4*np.sqrt(3)*np.abs(area), np.finfo(float).tiny)
+	else:
+		aspecto = l_max / np.maximum(longitudes.min(axis=1), np.finfo(float).tiny)
+
+	return {
+		"aspecto": aspecto,
+		"skewness": skewness,
+		"angulo_min": angulo_min,
+		"angulo_max": angulo_max,
+		"jacobiano": jacobiano,
+		"area": area,
+	}
+
+
+def _claves_aristas(a, b):
+	menor = np.minimum(a, b).astype(np.int64)
+	mayor = np.maximum(a, b).astype(np.int64)
+	return menor*(np.int64(1) << 32) + mayor
+
+
+def metricas_capa_limite(nodos, cuadrilateros, aristas_pared, first_layer_height, bl_ratio, n_capas=3):
+	"""
+		Altura de las primeras capas de cuadriláteros sobre las paredes
+		- Argumentos:
+			- nodos: array N x 2
+			- cuadrilateros: array M x 4
+			- aristas_pared: array P x 2 con las aristas de las paredes
+			- first_layer_height, bl_ratio: objetivos de la capa límite
+			- n_capas: cuántas capas seguir hacia fuera para medir el crecimiento
+		- Devuelve {primera_capa: h1/first_layer_height, crecimiento: (h_i+1/h_i)/bl_ratio}
+	"""
+	if not len(cuadrilateros) or not len(aristas_pared):
+		return {}
+
+	p = nodos[cuadrilateros][..., :2]
+	area = np.abs(0.5*np.sum(p[..., 0]*np.roll(p[..., 1], -1, axis=1) - np.roll(p[..., 0], -1, axis=1)*p[..., 1], axis=1))
+
+	# Cada arista (a, b) de cada cuadrilátero, identificada por una clave única
+	a = cuadrilateros
+	b = np.roll(cuadrilateros, -1, axis=1)
+	claves = _claves_aristas(a, b).ravel()
+	orden = np.argsort(claves, kind="stable")
+	claves_ordenadas = claves[orden]
+
+	def buscar(claves_buscadas, excluir=None):
+		"""Posición (elemento*4 + lado) de un cuadrilátero con esa arista, -1 si no hay"""
+		inicio = np.searchsorted(claves_ordenadas, claves_buscadas, side="left")
+		fin = np.searchsorted(claves_ordenadas, claves_buscadas, side="right")
+		encontrado = np.full(len(claves_buscadas), -1)
+		for desplazamiento in (0, 1):
+			posicion = np.minimum(inicio + desplazamiento, len(orden) - 1)
+			valido = (inicio + desplazamiento < fin)
+			candidato = orden[posicion]
+			if excluir is not None:
+				valido &= (candidato // 4) != excluir
+			encontrado = np.where((encontrado < 0) & valido, candidato, encontrado)
+		return encontrado
+
+	posicion = buscar(_claves_aristas(aristas_pared[:, 0], aristas_pared[:, 1]))
+	posicion = posicion[posicion >= 0]
+
+	alturas = []
+	for _ in range(n_capas):
+		elemento = posicion // 4
+		lado = posicion % 4
+		longitud = np.linalg.norm(p[elemento, (lado + 1) % 4] - p[elemento, lado], axis=1)
+		alturas.append(area[elemento] / np.maximum(longitud, np.finfo(float).tiny))
+
+		# Lado opuesto del cuadrilátero y el elemento que hay al otro lado
+		opuesto = (lado + 2) % 4
+		clave_opuesta = _claves_aristas(cuadrilateros[elemento, opuesto], cuadrilateros[elemento, (opuesto + 1) % 4])
+		siguiente = buscar(clave_opuesta, excluir=elemento)
+		if not np.any(siguiente >= 0):
+			break
+		# Solo se sigue por los que continúan en cuadriláteros; 'siguiente' ya
+		# apunta al lado del elemento de fuera que toca a esta capa
+		alturas = [h[siguiente >= 0] for h in alturas]
+		posicion = siguiente[siguiente >= 0]
+
+	resultado = {"primera_capa": alturas[0] / first_layer_height}
+	if len(alturas) > 1:
+		crecimiento = np.concatenate([alturas[i + 1]/alturas[i] for i in range(len(alturas) - 1)])
+		resultado["crecimiento"] = crecimiento / bl_ratio
+	return resultado
+
+
+def informe_calidad(nodos, elementos, aristas_pared=None, first_layer_height=None, bl_ratio=None, umbrales=None):
+	"""
+		Informe de calidad a partir de arrays
+		- Argumentos:
+			- nodos: array N x 2 (o N x 3)
+			- elementos: lista de arrays de conectividad (M x 3 y/o M x 4)
+			- aristas_pared: array P x 2 con las aristas de las paredes (para la capa límite)
+			- first_layer_height, bl_ratio: objetivos de la capa límite
+			- umbrales: cambios sobre UMBRALES_CALIDAD
+	"""
+	umbrales = dict(UMBRALES_CALIDAD, **(umbrales or {}))
+
+	metricas = {}
+	for conectividad in elementos:
+		if not len(conectividad):
+			continue
+		for nombre, valores in metricas_elementos(nodos, conectividad).items():
+			metricas.setdefault(nombre, []).append(valores)
+	metricas = {nombre: np.concatenate(valores) for nombre, valores in metricas.items()}
+
+	capa_limite = {}
+	cuadrilateros = [conectividad for conectividad in elementos if conectividad.shape[1] == 4]
+	if aristas_pared is not None and cuadrilateros and first_layer_height:
+		capa_limite = metricas_capa_limite(
+			nodos, np.concatenate(cuadrilateros), aristas_pared, first_layer_height, bl_ratio or 1.0
+		)
+
+	return InformeCalidad(len(nodos), metricas, capa_limite, umbrales)
+
+
+def informe_gmsh(first_layer_height=None, bl_ratio=None, marcadores_pared=None, umbrales=None):
+	"""
+		Informe de calidad de la malla 2D del modelo actual de gmsh
+		- Argumentos:
+			- marcadores_pared: nombres de los grupos físicos que son paredes
+				(por defecto todos los de dimensión 1 menos MARCADORES_NO_PARED)
+			- el resto como informe_calidad
+	"""
+	etiquetas, coordenadas, _ = gmsh.model.mesh.getNodes()
+	etiquetas = etiquetas.astype(np.int64)
+	# Los tags de gmsh no tienen por qué ser consecutivos (sin nodos, sin malla:
+	# el informe sale vacío y rechazado)
+	indice = np.zeros(etiquetas.max() + 1 if len(etiquetas) else 0, dtype=np.int64)
+	indice[etiquetas] = np.arange(len(etiquetas))
+	nodos = coordenadas.reshape(-1, 3)
+
+	elementos = []
+	for tipo, n in ((2, 3), (3, 4)):
+		_, conectividad = gmsh.model.mesh.getElementsByType(tipo)
+		elementos.append(indice[conectividad.astype(np.int64)].reshape(-1, n))
+
+	aristas = []
+	for dim, grupo in gmsh.model.getPhysicalGroups(1):
+		nombre = gmsh.model.getPhysicalName(dim, grupo)
+		es_pared = nombre in marcadores_pared if marcadores_pared is not None else nombre not in MARCADORES_NO_PARED
+		if not es_pared:
+			continue
+		for entidad in gmsh.model.getEntitiesForPhysicalGroup(dim, grupo):
+			_, conectividad = gmsh.model.mesh.getElementsByType(1, entidad)
+			aristas.append(indice[conectividad.astype(np.int64)].reshape(-1, 2))
+	aristas = np.concatenate(aristas) if aristas else None
+
+	return informe_calidad(nodos, elementos, aristas, first_layer_height, bl_ratio, umbrales)
@@ -0,0 +1,251 @@
+"""
+Campo de tamaño de malla adaptativo, precalculado con NumPy
+
+En lugar de un "Distance" + "Threshold" que refina igual alrededor de todo el
+alerón, el tamaño se calcula a partir de unas fuentes (punto, tamaño):
+	- en la piel de cada perfil, según la curvatura local (cierto ángulo por segmento)
+	- en los huecos entre elementos, según la anchura del hueco (n celdas de lado a lado)
+	- en la estela detrás de cada borde de salida, creciendo con la distancia
+
+y en cada punto de una malla de fondo estructurada se toma
+	h(x) = min_i( h_i + crecimiento * |x - x_i| )
+que es un campo suave que nunca crece más rápido que 'crecimiento'. El resultado
+se pasa a gmsh como una vista (PostView) y se usa como campo de fondo.
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+gmsh = perezoso("gmsh")
+
+
+OPCIONES_CAMPO = {
+	"angulo_curvatura": 4.0,		# grados de giro de la piel por segmento
+	"celdas_hueco": 12,				# celdas de lado a lado en el hueco entre elementos
+	"hueco_max": 0.1,				# huecos más anchos que esto no se refinan aparte
+	"longitud_estela": 1.0,			# longitud de la zona de estela (en cuerdas)
+	"direccion_estela": 0.0,		# ángulo de la corriente libre (grados)
+	"tamano_estela": None,			# tamaño en el borde de salida (None = 5*size_min)
+	"crecimiento": 0.15,			# pendiente máxima del tamaño (adimensional)
+	"paso_fondo": None,				# paso de la malla de fondo (None = automático)
+	"margen_fondo": 1.0,			# margen de la malla de fondo alrededor del alerón
+}
+
+
+# Refinamiento de estela alineado con la corriente (campos_estela)
+OPCIONES_ESTELA = {
+	"longitud": 2.0,				# longitud de la zona refinada detrás de cada borde de salida
+	"tamano": None,					# tamaño en el borde de salida (None = 2*size_min)
+	"crecimiento": 0.04,			# crecimiento del tamaño a lo largo de la estela
+	"anchura": 0.02,				# semianchura de la zona en el borde de salida
+	"apertura": 0.1,				# lo que crece la semianchura por unidad de longitud
+	"crecimiento_fuera": 0.3,		# pendiente del tamaño al salir de la zona
+}
+
+
+def curvatura(puntos):
+	"""
+		Curvatura de Menger en cada punto de un contorno cerrado (array N x 2)
+	"""
+	anterior = np.roll(puntos, 1, axis=0)
+	siguiente = np.roll(puntos, -1, axis=0)
+	a = puntos - anterior
+	b = siguiente - puntos
+	c = siguiente - anterior
+	cruz = np.abs(a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0])
+	denominador = np.linalg.norm(a, axis=1)*np.linalg.norm(b, axis=1)*np.linalg.norm(c, axis=1)
+	return 2*cruz / np.maximum(denominador, np.finfo(float).tiny)
+
+
+def fuentes_curvatura(perfiles, size_min, size_max, angulo_curvatura=4.0):
+	"""
+		Fuentes en la piel: tamaño = ángulo por segmento / curvatura
+	"""
+	puntos = np.concatenate(perfiles)
+	kappa = np.concatenate([curvatura(perfil) for perfil in perfiles])
+	tamanos = np.deg2rad(angulo_curvatura) / np.maximum(kappa, np.finfo(float).tiny)
+	return puntos, np.clip(tamanos, size_min, size_max)
+
+
+def fuentes_huecos(perfiles, size_min, celdas_hueco=12, hueco_max=0.1):
+	"""
+		Fuentes en los huecos entre elementos: en cada punto de la piel más cerca
+		de otro elemento que 'hueco_max', y en el centro del hueco, con
+		tamaño = anchura / celdas_hueco
+	"""
+	from scipy.spatial import cKDTree
+
+	puntos = []
+	tamanos = []
+	for i, perfil in enumerate(perfiles):
+		otros = [otro for j, otro in enumerate(perfiles) if j != i]
+		if not otros:
+			continue
+		otros = np.concatenate(otros)
+		anchura, cercano = cKDTree(otros).query(perfil)
+		en_hueco = anchura < hueco_max
+		tamano = np.maximum(anchura[en_hueco] / celdas_hueco, size_min)
+		centro = 0.5*(perfil[en_hueco] + otros[cercano[en_hueco]])
+		puntos += [perfil[en_hueco], centro]
+		tamanos += [tamano, tamano]
+
+	if not puntos:
+		return np.empty((0, 2)), np.empty(0)
+	return np.concatenate(puntos), np.concatenate(tamanos)
+
+
+def fuentes_estela(perfiles, tamano_estela, size_max, longitud_estela=1.0, direccion_estela=0.0, crecimiento=0.15):
+	"""
+		Fuentes a lo largo de la estela de cada borde de salida (el primer y último
+		punto de cada perfil, como los escribe Airfoil.exportar). El tamaño crece
+		con la mitad de la pendiente general, así la estela queda más fina que el resto
+	"""
+	direccion = np.array([np.cos(np.deg2rad(direccion_estela)), np.sin(np.deg2rad(direccion_estela))])
+	n = max(2, int(np.ceil(longitud_estela / tamano_estela)))
+	s = longitud_estela*np.linspace(0, 1, n)**2		# más puntos cerca del borde de salida
+	tamanos = np.minimum(tamano_estela + 0.5*crecimiento*s, size_max)
+
+	puntos = [0.5*(perfil[0] + perfil[-1]) + s[:, None]*direccion for perfil in perfiles]
+	return np.concatenate(puntos), np.tile(tamanos, len(perfiles))
+
+
+def tamano_en_puntos(x, fuentes, tamanos, crecimiento=0.15, bloque=4096):
+	"""
+		h(x) = min_i(tamanos_i + crecimiento * |x - fuentes_i|), por bloques para no
+		crear matrices gigantes
+	"""
+	resultado = np.empty(len(x))
+	for inicio in range(0, len(x), bloque):
+		trozo = x[inicio:inicio + bloque]
+		distancias = np.sqrt(
+			(trozo[:, 0, None] - fuentes[None, :, 0])**2 + (trozo[:, 1, None] - fuentes[None, :, 1])**2
+		)
+		resultado[inicio:inicio + bloque] = np.min(tamanos[None, :] + crecimiento*distancias, axis=1)
+	return resultado
+
+
+def campo_fondo(all_airfoil_points, size_min, size_max, **opciones):
+	"""
+		Calcula el campo de tamaño sobre una malla de fondo estructurada
+		- Argumentos:
+			- all_airfoil_points: puntos (x, y, z) de cada perfil (ver read_profile)
+			- size_min, size_max: límites del tamaño
+			- opciones: cualquiera de OPCIONES_CAMPO
+		- Devuelve (X, Y, H): coordenadas de la malla de fondo y tamaño en cada nodo
+	"""
+	o = dict(OPCIONES_CAMPO, **opciones)
+	perfiles = [np.asarray(puntos, dtype=float)[:, :2] for puntos in all_airfoil_points]
+	tamano_estela = 5*size_min if o["tamano_estela"] is None else o["tamano_estela"]
+
+	fuentes, tamanos = zip(
+		fuentes_curvatura(perfiles, size_min, size_max, o["angulo_curvatura"]),
+		fuentes_huecos(perfiles, size_min, o["celdas_hueco"], o["hueco_max"]),
+		fuentes_estela(perfiles, tamano_estela, size_max, o["longitud_estela"], o["direccion_estela"], o["crecimiento"]),
+	)
+	fuentes = np.concatenate(fuentes)
+	tamanos = np.concatenate(tamanos)
+
+	minimo = fuentes.min(axis=0) - o["margen_fondo"]
+	maximo = fuentes.max(axis=0) + o["margen_fondo"]
+	paso = o["paso_fondo"]
+	if paso is None:
+		# Unos 40000 nodos, suficiente porque el campo varía suavemente
+		paso = np.sqrt(np.prod(maximo - minimo) / 40000)
+
+	X, Y = np.meshgrid(
+		np.arange(minimo[0], maximo[0] + paso, paso),
+		np.arange(minimo[1], maximo[1] + paso, paso),
+	)
+	H = tamano_en_puntos(np.column_stack((X.ravel(), Y.ravel())), fuentes, tamanos, o["crecimiento"])
+	return X, Y, np.clip(H, size_min, size_max).reshape(X.shape)
+
+
+def datos_vista(X, Y, H):
+	"""
+		Cuadriláteros de la malla de fondo en el formato de lista de gmsh ("SQ"):
+		por cada cuadrilátero x1..x4, y1..y4, z1..z4, h1..h4
+	"""
+	esquinas = [(slice(None, -1), slice(None, -1)), (slice(None, -1), slice(1, None)),
+				(slice(1, None), slice(1, None)), (slice(1, None), slice(None, -1))]
+	x = np.stack([X[e].ravel() for e in esquinas], axis=1)
+	y = np.stack([Y[e].ravel() for e in esquinas], axis=1)
+	h = np.stack([H[e].ravel() for e in esquinas], axis=1)
+	return len(x), np.hstack((x, y, np.zeros_like(x), h)).ravel()
+
+
+def aplicar_campo_fondo(X, Y, H):
+	"""
+		Crea en gmsh la vista con el campo de tamaño y un campo PostView que la usa.
+		- Devuelve el tag del campo (para setAsBackgroundMesh o combinarlo con "Min")
+	"""
+	n_cuadrilateros, datos = datos_vista(X, Y, H)
+	vista = gmsh.view.add("tamano_fondo")
+	gmsh.view.addListData(vista, "SQ", n_cuadrilateros, datos.tolist())
+
+	campo = gmsh.model.mesh.field.add("PostView")
+	gmsh.model.mesh.field.setNumber(campo, "ViewTag", vista)
+	return campo
+
+
+def _numero(valor):
+	return f"{float(valor):.12g}"
+
+
+def expresion_estela(borde_salida, direccion, tamano, size_max, longitud, crecimiento, anchura, apertura, crecimiento_fuera):
+	"""
+		Expresión de MathEval con el tamaño en la estela de un borde de salida, en
+		ejes girados con la corriente (s a lo largo, n de lado a lado):
+			dentro (0 < s < longitud, |n| < anchura + apertura s): tamano + crecimiento s
+			fuera: lo mismo más crecimiento_fuera por la distancia a la zona
+		sin pasar de size_max
+	"""
+	a = np.deg2rad(direccion)
+	c, sn = _numero(np.cos(a)), _numero(np.sin(a))
+	dx = f"(x - {_numero(borde_salida[0])})"
+	dy = f"(y - {_numero(borde_salida[1])})"
+	s = f"({dx}*{c} + {dy}*{sn})"
+	n = f"({dy}*{c} - {dx}*{sn})"
+	fuera = (
+		f"Max(-{s}, 0) + Max({s} - {_numero(longitud)}, 0)"
+		f" + Max(Abs({n}) - {_numero(anchura)} - {_numero(apertura)}*Max({s}, 0), 0)"
+	)
+	return (
+		f"Min({_numero(size_max)}, {_numero(tamano)} + {_numero(crecimiento)}*Max({s}, 0)"
+		f" + {_numero(crecimiento_fuera)}*({fuera}))"
+	)
+
+
+def campos_estela(all_airfoil_points, size_min, size_max, direccion=0.0, **opciones):
+	"""
+		Un campo MathEval por borde de salida (el primer y último punto de cada
+		perfil, como en fuentes_estela) con una zona refinada girada con la
+		dirección de la corriente (grados)
+		- opciones: cualquiera de OPCIONES_ESTELA
+		- Devuelve los tags de los campos, para combinarlos con "Min"
+	"""
+	o = dict(OPCIONES_ESTELA, **opciones)
+	tamano = 2*size_min if o["tamano"] is None else o["tamano"]
+
+	campos = []
+	for puntos in all_airfoil_points:
+		puntos = np.asarray(puntos, dtype=float)[:, :2]
+		campo = gmsh.model.mesh.field.add("MathEval")
+		gmsh.model.mesh.field.setString(campo, "F", expresion_estela(
+			0.5*(puntos[0] + puntos[-1]), direccion, tamano, size_max,
+			o["longitud"], o["crecimiento"], o["anchura"], o["apertura"], o["crecimiento_fuera"],
+		))
+		campos.append(campo)
+	return campos
+
+
+def campo_minimo(campos):
+	"""
+		Campo "Min" de varios campos (o el mismo campo si solo hay uno)
+	"""
+	if len(campos) == 1:
+		return campos[0]
+	campo = gmsh.model.mesh.field.add("Min")
+	gmsh.model.mesh.field.setNumbers(campo, "FieldsList", campos)
+	return campo
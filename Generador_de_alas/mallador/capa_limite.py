@@ -0,0 +1,162 @@
+"""
+Capa límite de cada elemento ajustada al campo de fondo
+
+Con un Size, Ratio y Thickness fijos para todos los elementos la última capa
+suele quedar mucho más fina que la primera celda isótropa de fuera, y ese salto
+obliga a un mesh_size_close muy fino en todo el alerón. Aquí, para cada elemento,
+con la altura de la primera capa y un número de capas objetivo:
+	- se busca el ratio con el que la última capa mide lo mismo que el campo de
+	  fondo a esa distancia de la piel (por bisección, el espesor depende del ratio)
+	- si hace falta un ratio mayor que razon_max se deja en razon_max y se añaden
+	  capas hasta llegar al tamaño del fondo
+	- el espesor no pasa de una fracción del hueco al elemento más cercano, y si
+	  no cabe se quitan capas
+
+El campo de fondo de cada elemento es una función de la distancia a su piel (ver
+fondo_threshold y fondo_campo). Todo es NumPy, no hace falta gmsh.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+OPCIONES_CAPA = {
+	"razon_max": 1.3,				# ratio de crecimiento máximo entre capas
+	"relacion_ultima": 1.0,			# altura de la última capa / tamaño del fondo ahí
+	"fraccion_hueco": 0.4,			# espesor máximo en fracción del hueco al elemento más cercano
+	"capas_max": 200,				# tope de capas al añadir capas por razon_max
+}
+
+
+CapaLimite = namedtuple("CapaLimite", ["capas", "razon", "espesor", "ultima", "tamano_fondo"])
+CapaLimite.__doc__ = """
+	Capa límite de un elemento
+	- capas: número de capas
+	- razon: ratio de crecimiento (Ratio del campo BoundaryLayer)
+	- espesor: espesor total (Thickness)
+	- ultima: altura de la última capa
+	- tamano_fondo: tamaño del campo de fondo a la distancia 'espesor'
+"""
+
+
+def espesor(primera, razon, capas):
+	"""Espesor de 'capas' capas que crecen con 'razon' desde 'primera'"""
+	if abs(razon - 1) < 1e-12:
+		return primera*capas
+	return primera*(razon**capas - 1)/(razon - 1)
+
+
+def fondo_threshold(size_min, size_max, dist_min, dist_max):
+	"""
+		Tamaño del campo Distance + Threshold de mallado.py en función de la
+		distancia a la piel
+	"""
+	def tamano(distancia):
+		if dist_max <= dist_min:
+			return size_min if distancia <= dist_min else size_max
+		t = min(max((distancia - dist_min)/(dist_max - dist_min), 0.0), 1.0)
+		return size_min + t*(size_max - size_min)
+	return tamano
+
+
+def fondo_campo(X, Y, H, contorno, crecimiento):
+	"""
+		Tamaño del campo adaptativo (campos.campo_fondo) en función de la distancia
+		a la piel de un elemento: la mediana del campo sobre la piel más lo que
+		crece el campo ('crecimiento' de OPCIONES_CAMPO) hasta esa distancia
+	"""
+	from scipy.interpolate import RegularGridInterpolator
+
+	interpolador = RegularGridInterpolator(
+		(Y[:, 0], X[0, :]), H, bounds_error=False, fill_value=None
+	)
+	contorno = np.asarray(contorno, dtype=float)
+	en_piel = float(np.median(interpolador(contorno[:, 1::-1])))
+	tamano_max = float(H.max())
+
+	def tamano(distancia):
+		return min(en_piel + crecimiento*distancia, tamano_max)
+	return tamano
+
+
+def huecos(contornos):
+	"""Distancia mínima de cada contorno a los demás (inf si está solo)"""
+	from scipy.spatial import cKDTree
+
+	contornos = [np.asarray(contorno, dtype=float)[:, :2] for contorno in contornos]
+	resultado = []
+	for i, contorno in enumerate(contornos):
+		otros = [otro for j, otro in enumerate(contornos) if j != i]
+		if not otros:
+			resultado.append(np.inf)
+			continue
+		resultado.append(float(cKDTree(np.concatenate(otros)).query(contorno)[0].min()))
+	return resultado
+
+
+def _desajuste(primera, razon, capas, fondo, relacion):
+	"""Última capa menos el tamaño que pide el fondo en el borde de la capa"""
+	return primera*razon**(capas - 1) - relacion*fondo(espesor(primera, razon, capas))
+
+
+def ajustar_capa(primera, capas, fondo, hueco=np.inf, razon_max=1.3, relacion_ultima=1.0,
+		fraccion_hueco=0.4, capas_max=200, iteraciones=60):
+	"""
+		Capa límite de un elemento
+		- Argumentos:
+			- primera: altura de la primera capa
+			- capas: número de capas objetivo
+			- fondo: tamaño del campo de fondo en función de la distancia a la piel
+			- hueco: distancia al elemento más cercano
+			- el resto: ver OPCIONES_CAPA
+		- Devuelve un CapaLimite
+	"""
+	if capas < 1:
+		raise ValueError(f"Hacen falta al menos 1 capa, no {capas}")
+
+	if _desajuste(primera, 1.0, capas, fondo, relacion_ultima) >= 0:
+		# Ni con capas iguales queda por debajo del fondo
+		razon = 1.0
+	elif _desajuste(primera, razon_max, capas, fondo, relacion_ultima) <= 0:
+		# Ni con razon_max llega: más capas
+		razon = razon_max
+		while capas < capas_max and _desajuste(primera, razon, capas, fondo, relacion_ultima) < 0:
+			capas += 1
+	else:
+		bajo, alto = 1.0, razon_max
+		for _ in range(iteraciones):
+			razon = 0.5*(bajo + alto)
+			if _desajuste(primera, razon, capas, fondo, relacion_ultima) < 0:
+				bajo = razon
+			else:
+				alto = razon
+		razon = 0.5*(bajo + alto)
+
+	# Que quepa en el hueco con el elemento de al lado
+	while capas > 1 and espesor(primera, razon, capas) > fraccion_hueco*hueco:
+		capas -= 1
+
+	total = espesor(primera, razon, capas)
+	return CapaLimite(capas, razon, total, primera*razon**(capas - 1), fondo(total))
+
+
+def capas_limite(contornos, primera, capas, fondos, **opciones):
+	"""
+		Capa límite de cada elemento
+		- Argumentos:
+			- contornos: puntos de cada perfil (N x 2 o N x 3)
+			- primera: altura de la primera capa (first_layer_height)
+			- capas: número de capas objetivo
+			- fondos: tamaño del fondo en función de la distancia, uno por contorno
+			  (o uno solo para todos)
+			- opciones: cualquiera de OPCIONES_CAPA
+		- Devuelve una lista de CapaLimite
+	"""
+	o = dict(OPCIONES_CAPA, **opciones)
+	if callable(fondos):
+		fondos = [fondos]*len(contornos)
+	return [
+		ajustar_capa(primera, capas, fondo, hueco, **o)
+		for fondo, hueco in zip(fondos, huecos(contornos))
+	]
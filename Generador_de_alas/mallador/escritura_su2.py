@@ -0,0 +1,142 @@
+"""
+Escritura de la malla del modelo actual de gmsh en formato SU2, por trozos
+
+gmsh.write guarda toda la malla en estructuras propias antes de escribir, lo que
+con decenas de millones de celdas se come la memoria. Aquí los elementos de cada
+tipo se leen en n_tareas trozos (getElementsByType con task/numTasks) y cada trozo
+se formatea y se escribe antes de pedir el siguiente; los nodos van entidad a
+entidad. Como con Mesh.SaveAll = 0, solo se escriben los grupos físicos: los de
+la dimensión de la malla son los elementos y los de una dimensión menos los
+marcadores.
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+gmsh = perezoso("gmsh")
+
+
+# Tipo de elemento de gmsh -> (tipo VTK que usa SU2, número de nodos)
+TIPOS_SU2 = {
+	1: (3, 2),		# línea
+	2: (5, 3),		# triángulo
+	3: (9, 4),		# cuadrilátero
+	4: (10, 4),		# tetraedro
+	5: (12, 8),		# hexaedro
+	6: (13, 6),		# prisma
+	7: (14, 5),		# pirámide
+}
+
+# Ancho reservado para los contadores que se rellenan al final
+_ANCHO_CONTADOR = 20
+
+
+def _escribir_filas(archivo, filas, formato, bloque=65536):
+	"""Escribe un array 2D con una sola operación de formato por bloque"""
+	for inicio in range(0, len(filas), bloque):
+		parte = filas[inicio:inicio + bloque]
+		archivo.write(((formato + "\n")*len(parte) % tuple(parte.ravel())).encode())
+
+
+def _contador(archivo, clave):
+	"""Deja sitio para 'clave= n' y devuelve dónde rellenarlo"""
+	archivo.write(f"{clave}= ".encode())
+	posicion = archivo.tell()
+	archivo.write(b" "*_ANCHO_CONTADOR + b"\n")
+	return posicion
+
+
+def _rellenar(archivo, posicion, valor):
+	final = archivo.tell()
+	archivo.seek(posicion)
+	archivo.write(str(valor).rjust(_ANCHO_CONTADOR).encode())
+	archivo.seek(final)
+
+
+def _entidades(dim):
+	"""Entidades de todos los grupos físicos de dimensión dim, con el nombre del grupo"""
+	for _, grupo in gmsh.model.getPhysicalGroups(dim):
+		nombre = gmsh.model.getPhysicalName(dim, grupo)
+		for entidad in gmsh.model.getEntitiesForPhysicalGroup(dim, grupo):
+			yield nombre, int(entidad)
+
+
+def _indice_nodos():
+	"""
+		Índice de SU2 (0, 1, ...) de cada tag de nodo, en el orden en que se
+		escriben (entidad a entidad)
+	"""
+	maximo = int(gmsh.model.mesh.getMaxNodeTag())
+	indice = np.full(maximo + 1, -1, dtype=np.int64 if maximo >= 2**31 else np.int32)
+	n = 0
+	for dim, tag in gmsh.model.getEntities():
+		etiquetas, _, _ = gmsh.model.mesh.getNodes(dim, tag, includeBoundary=False, returnParametricCoord=False)
+		indice[etiquetas.astype(np.int64)] = np.arange(n, n + len(etiquetas))
+		n += len(etiquetas)
+	return indice, n
+
+
+def escribir_su2(ruta, n_tareas=16):
+	"""
+		Escribe la malla del modelo actual en un .su2 sin tenerla entera en memoria
+		- Argumentos:
+			- ruta: archivo de salida
+			- n_tareas: trozos en que se lee cada tipo de elemento (más trozos, menos
+			  memoria y algo más de tiempo)
+		- Devuelve el número de elementos
+	"""
+	dim = gmsh.model.getDimension()
+	indice, n_nodos = _indice_nodos()
+
+	with open(ruta, "wb") as archivo:
+		archivo.write(f"NDIME= {dim}\n".encode())
+
+		posicion = _contador(archivo, "NELEM")
+		n_elementos = 0
+		for _, entidad in _entidades(dim):
+			for tipo in gmsh.model.mesh.getElementTypes(dim, entidad):
+				vtk, n = TIPOS_SU2[tipo]
+				for tarea in range(n_tareas):
+					_, conectividad = gmsh.model.mesh.getElementsByType(tipo, entidad, tarea, n_tareas)
+					if not len(conectividad):
+						continue
+					nodos = indice[conectividad.astype(np.int64)].reshape(-1, n)
+					filas = np.column_stack((
+						np.full(len(nodos), vtk), nodos,
+						np.arange(n_elementos, n_elementos + len(nodos)),
+					))
+					_escribir_filas(archivo, filas, " ".join(["%d"]*(n + 2)))
+					n_elementos += len(nodos)
+		_rellenar(archivo, posicion, n_elementos)
+
+		archivo.write(f"NPOIN= {n_nodos}\n".encode())
+		formato = " ".join(["%.15g"]*dim) + " %d"
+		for d, tag in gmsh.model.getEntities():
+			etiquetas, coordenadas, _ = gmsh.model.mesh.getNodes(d, tag, includeBoundary=False, returnParametricCoord=False)
+			if not len(etiquetas):
+				continue
+			# Mismo orden que en _indice_nodos, así que los índices salen seguidos
+			filas = np.column_stack((coordenadas.reshape(-1, 3)[:, :dim], indice[etiquetas.astype(np.int64)]))
+			_escribir_filas(archivo, filas, formato)
+
+		marcadores = {}
+		for nombre, entidad in _entidades(dim - 1):
+			marcadores.setdefault(nombre, []).append(entidad)
+
+		archivo.write(f"NMARK= {len(marcadores)}\n".encode())
+		for nombre, entidades in marcadores.items():
+			archivo.write(f"MARKER_TAG= {nombre}\n".encode())
+			posicion = _contador(archivo, "MARKER_ELEMS")
+			n_marcador = 0
+			for entidad in entidades:
+				for tipo in gmsh.model.mesh.getElementTypes(dim - 1, entidad):
+					vtk, n = TIPOS_SU2[tipo]
+					_, conectividad = gmsh.model.mesh.getElementsByType(tipo, entidad)
+					nodos = indice[conectividad.astype(np.int64)].reshape(-1, n)
+					_escribir_filas(archivo, np.column_stack((np.full(len(nodos), vtk), nodos)), " ".join(["%d"]*(n + 1)))
+					n_marcador += len(nodos)
+			_rellenar(archivo, posicion, n_marcador)
+
+	return n_elementos
@@ -0,0 +1,108 @@
+"""
+Malla 3D por extrusión de la malla 2D a lo largo de la envergadura
+
+Para comprobaciones cuasi-3D: un tramo de ala de envergadura finita entre dos
+placas, o una rebanada periódica (recta o en flecha). La superficie del dominio
+2D se extruye con extrude (del núcleo elegido en gmsh_helpers) en capas
+(numElements/heights) y con recombine, así que los cuadriláteros de la capa
+límite dan hexaedros y los triángulos prismas: no hay tetraedros y la malla 3D
+sale directamente de la 2D, sin optimización de volumen, lo que mantiene la
+memoria de gmsh proporcional al número de celdas.
+
+Los marcadores siguen los nombres de la malla 2D: cada curva da la superficie
+lateral con su mismo nombre (los perfiles, "farfield", "inlet", ...), "fluido" pasa
+a ser el volumen y las dos caras extremas se nombran según EXTREMOS.
+"""
+
+import math
+
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.mallador.gmsh_helpers import factory
+
+
+gmsh = perezoso("gmsh")
+
+
+# Nombres de los marcadores de la cara de la raíz (z = 0) y de la punta
+EXTREMOS = {
+	"simetria": ("simetria", "simetria"),
+	"periodico": ("periodico_raiz", "periodico_punta"),
+	"placas": ("placa_raiz", "placa_punta"),
+}
+
+
+def capas(n_capas, alturas=None):
+	"""
+		numElements y heights de extrude
+		- Argumentos:
+			- n_capas: número de capas (uniformes) o lista de capas por tramo
+			- alturas: fracción de la envergadura acumulada al final de cada tramo
+			  (la última 1), hace falta si n_capas es una lista
+	"""
+	if isinstance(n_capas, int):
+		if alturas is not None:
+			raise ValueError("Con alturas hay que dar las capas de cada tramo")
+		return [n_capas], []
+
+	n_capas = [int(n) for n in n_capas]
+	alturas = [] if alturas is None else [float(h) for h in alturas]
+	if len(alturas) != len(n_capas) or abs(alturas[-1] - 1) > 1e-12 or sorted(alturas) != alturas:
+		raise ValueError(f"alturas debe ser creciente, acabar en 1 y tener un valor por tramo ({len(n_capas)})")
+	return n_capas, alturas
+
+
+def extruir(superficie, envergadura, n_capas=16, alturas=None, flecha=0.0, extremos="simetria"):
+	"""
+		Extruye la superficie del dominio 2D (con los grupos físicos que pone
+		generar_malla) y rehace los grupos físicos en 3D
+		- Argumentos:
+			- superficie: tag de la PlaneSurface del dominio
+			- envergadura: longitud en z
+			- n_capas, alturas: ver capas
+			- flecha: grados, la extrusión avanza también en x (rebanada en flecha)
+			- extremos: una de las claves de EXTREMOS
+		- Devuelve la traslación (x, y, z) de la raíz a la punta, la que pide
+		  MARKER_PERIODIC de SU2 con extremos="periodico"
+	"""
+	if extremos not in EXTREMOS:
+		raise ValueError(f"extremos debe ser uno de {sorted(EXTREMOS)}, no {extremos!r}")
+
+	factory().synchronize()
+	nombres = {}
+	for dim, grupo in gmsh.model.getPhysicalGroups(1):
+		nombre = gmsh.model.getPhysicalName(dim, grupo)
+		for curva in gmsh.model.getEntitiesForPhysicalGroup(dim, grupo):
+			nombres[int(curva)] = nombre
+	nombre_volumen = "fluido"
+	for dim, grupo in gmsh.model.getPhysicalGroups(2):
+		if superficie in gmsh.model.getEntitiesForPhysicalGroup(dim, grupo):
+			nombre_volumen = gmsh.model.getPhysicalName(dim, grupo)
+	gmsh.model.removePhysicalGroups()
+
+	# Las superficies laterales salen en el mismo orden que las curvas del borde
+	borde = gmsh.model.getBoundary([(2, superficie)], combined=False, oriented=False)
+	traslacion = (envergadura*math.tan(math.radians(flecha)), 0.0, envergadura)
+	numero, alturas = capas(n_capas, alturas)
+	salida = factory().extrude(
+		[(2, superficie)], *traslacion, numElements=numero, heights=alturas, recombine=True
+	)
+	factory().synchronize()
+	punta, volumen = salida[0][1], salida[1][1]
+	laterales = [tag for dim, tag in salida[2:] if dim == 2]
+
+	superficies = {}
+	for (_, curva), lateral in zip(borde, laterales):
+		if abs(curva) in nombres:
+			superficies.setdefault(nombres[abs(curva)], []).append(lateral)
+
+	nombre_raiz, nombre_punta = EXTREMOS[extremos]
+	superficies.setdefault(nombre_raiz, []).append(superficie)
+	superficies.setdefault(nombre_punta, []).append(punta)
+
+	for nombre, tags in superficies.items():
+		grupo = gmsh.model.addPhysicalGroup(2, tags)
+		gmsh.model.setPhysicalName(2, grupo, nombre)
+	grupo = gmsh.model.addPhysicalGroup(3, [volumen])
+	gmsh.model.setPhysicalName(3, grupo, nombre_volumen)
+
+	return traslacion
@@ -1,7 +1,39 @@
-import gmsh
 import math
 import numpy as np
 
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.alas.bordes import ordenar_contorno
+
+
+gmsh = perezoso("gmsh")
+
+# Núcleos de geometría de gmsh con los que se pueden crear las entidades:
+# "geo" (el propio de gmsh) u "occ" (OpenCASCADE)
+KERNELS = ("geo", "occ")
+_kernel = "geo"
+
+
+def set_kernel(name):
+	"""
+	Elige el núcleo de geometría de todas las clases de este módulo
+	- Argumentos:
+		- name: uno de KERNELS
+	- Devuelve el núcleo que había antes
+	"""
+	global _kernel
+	if name not in KERNELS:
+		raise ValueError(f"Núcleo de geometría desconocido: {name!r} (opciones: {', '.join(KERNELS)})")
+	previous, _kernel = _kernel, name
+	return previous
+
+
+def factory():
+	"""
+	Módulo de gmsh del núcleo elegido (gmsh.model.geo o gmsh.model.occ): los
+	dos tienen addPoint, addLine, rotate, extrude... con los mismos argumentos
+	"""
+	return getattr(gmsh.model, _kernel)
+
 
 def import_airfoil(filename, eps=1e-9):
 	"""
@@ -88,7 +120,7 @@ class Point:
 		self.dim = 0
 
 		# create the gmsh object and store the tag of the geometric object
-		self.tag = gmsh.model.geo.addPoint(
+		self.tag = factory().addPoint(
 			self.x, self.y, self.z, self.mesh_size)
 
 
@@ -113,7 +145,7 @@ class Line:
 		self.dim = 1
 
 		# create the gmsh object and store the tag of the geometric object
-		self.tag = gmsh.model.geo.addLine(
+		self.tag = factory().addLine(
 			self.start_point.tag, self.end_point.tag)
 
 
@@ -139,7 +171,7 @@ class CurveLoop:
 		# generate the Lines tag list to follow
 		self.tag_list = [line.tag for line in self.line_list]
 		# create the gmsh object and store the tag of the geometric object
-		self.tag = gmsh.model.geo.addCurveLoop(self.tag_list)
+		self.tag = factory().addCurveLoop(self.tag_list)
 
 	def close_loop(self):
 		"""
@@ -184,7 +216,7 @@ class Spline:
 		self.tag_list = [point.tag for point in self.point_list]
 		self.dim = 1
 		# create the gmsh object and store the tag of the geometric object
-		self.tag = gmsh.model.geo.addSpline(self.tag_list)
+		self.tag = factory().addSpline(self.tag_list)
 
 
 class Circle:
@@ -218,8 +250,6 @@ class Circle:
 		self.mesh_size = mesh_size
 		self.dim = 1
 
-		# create multiples ArcCircle to merge in one circle
-
 		# first compute how many points on the circle (for the meshing to be alined with the points)
 		self.distribution = math.floor(
 			(np.pi * 2 * self.radius) / self.mesh_size)
@@ -228,32 +258,28 @@ class Circle:
 		# Create the center of the circle
 		center = Point(self.xc, self.yc, self.zc, realmeshsize)
 
-		# Create all the points for the circle
-		points = []
-		for i in range(0, self.distribution):
-			angle = 2 * np.pi / self.distribution * i
-			p = Point(self.xc+self.radius*math.cos(angle), self.yc+self.radius *
-							math.sin(angle), self.zc, realmeshsize)
-			points.append(p)
-		# Add the first point last for continuity when creating the arcs
-		points.append(points[0])
-		# Create arcs between two neighbouring points to create a circle
+		# With OCC the circle is only three arcs (they must be smaller than pi)
+		# and the mesh size of their end points gives the same resolution;
+		# with the built-in kernel one arc between each pair of mesh points
+		n_arcs = 3 if _kernel == "occ" else self.distribution
+		angles = 2 * np.pi / n_arcs * np.arange(n_arcs)
+		points = [
+			Point(x, y, self.zc, realmeshsize)
+			for x, y in zip(
+				self.xc + self.radius * np.cos(angles),
+				self.yc + self.radius * np.sin(angles),
+			)
+		]
+		# Create arcs between two neighbouring points to create a circle, the
+		# last one closing on the first point (no duplicated points to remove)
 		self.arcCircle_list = [
-			gmsh.model.geo.addCircleArc(
+			factory().addCircleArc(
 					points[i].tag,
 					center.tag,
-					points[i+1].tag,
+					points[(i + 1) % n_arcs].tag,
 			)
-			for i in range(0, self.distribution)
+			for i in range(n_arcs)
 		]
-		print(center.tag)
-		# gmsh.model.geo.remove([(center.dim, center.tag)])
-
-		# Remove the duplicated points generated by the arcCircle
-		gmsh.model.geo.synchronize()
-		gmsh.model.geo.removeAllDuplicates()
-
-		# gmsh.model.geo.remove([(center.dim, center.tag)])
 
 	def close_loop(self):
 		"""
@@ -264,7 +290,7 @@ class Circle:
 		_ : int
 			return the tag of the CurveLoop object
 		"""
-		return gmsh.model.geo.addCurveLoop(self.arcCircle_list)
+		return factory().addCurveLoop(self.arcCircle_list)
 
 	def define_bc(self):
 		"""
@@ -291,15 +317,12 @@ class Circle:
 		axis : tuple
 			tuple of point (x,y,z) which represent the axis of rotation
 		"""
-		[
-			gmsh.model.geo.rotate(
-					[(self.dim, arccircle)],
-					*origin,
-					*axis,
-					angle,
-			)
-			for arccircle in self.arcCircle_list
-		]
+		factory().rotate(
+			[(self.dim, arccircle) for arccircle in self.arcCircle_list],
+			*origin,
+			*axis,
+			angle,
+		)
 
 	def translation(self, vector):
 		"""
@@ -311,10 +334,9 @@ class Circle:
 		direction : tuple
 			tuple of point (x,y,z) which represent the direction of the translation
 		"""
-		[
-			gmsh.model.geo.translate([(self.dim, arccircle)], *vector)
-			for arccircle in self.arcCircle_list
-		]
+		factory().translate(
+			[(self.dim, arccircle) for arccircle in self.arcCircle_list], *vector
+		)
 
 
 class Rectangle:
@@ -361,7 +383,6 @@ class Rectangle:
 			Point(self.xc - self.dx / 2, self.yc +
 					self.dy / 2, z, self.mesh_size),
 		]
-		gmsh.model.geo.synchronize()
 
 		# Generate the 4 lines of the rectangle
 		self.lines = [
@@ -371,8 +392,6 @@ class Rectangle:
 			Line(self.points[3], self.points[0]),
 		]
 
-		gmsh.model.geo.synchronize()
-
 	def close_loop(self):
 		"""
 		Method to form a close loop with the current geometrical object
@@ -410,6 +429,98 @@ class Rectangle:
 		self.bc = [self.bc_in, self.bc_out, self.bc_wall]
 
 
+class CDomain:
+	"""
+	A class to represent a C-shaped farfield: a half circle upstream and a
+	straight channel downstream, aligned with the freestream direction
+	...
+
+	Attributes
+	----------
+	xc : float
+		position in x of the center of the half circle
+	yc : float
+		position in y of the center of the half circle
+	z : float
+		position in z
+	radius : float
+		radius of the half circle (and half height of the channel)
+	length : float
+		length of the channel downstream of the center
+	angle : float
+		freestream direction in degrees (e.g. Alerón.AOATotal when the wing has
+		been normalised and SU2 runs at that angle of attack)
+	mesh_size : float
+		attribute given for the class Point
+	outlet_mesh_size : float
+		mesh size at the outlet corners (by default mesh_size)
+	"""
+
+	def __init__(self, xc, yc, z, radius, length, angle, mesh_size, outlet_mesh_size=None):
+
+		self.xc = xc
+		self.yc = yc
+		self.z = z
+		self.radius = radius
+		self.length = length
+		self.angle = angle
+		self.mesh_size = mesh_size
+		self.outlet_mesh_size = mesh_size if outlet_mesh_size is None else outlet_mesh_size
+		self.dim = 1
+
+		# Local axes: s along the freestream, n normal to it
+		a = math.radians(angle)
+		s = np.array([math.cos(a), math.sin(a)])
+		n = np.array([-math.sin(a), math.cos(a)])
+		center = np.array([xc, yc])
+
+		def point(ds, dn, size):
+			x, y = center + ds*s + dn*n
+			return Point(x, y, z, size)
+
+		center_point = point(0, 0, mesh_size)
+		self.points = [
+			point(0, radius, mesh_size),						# top of the half circle
+			point(-radius, 0, mesh_size),						# stagnation side
+			point(0, -radius, mesh_size),						# bottom of the half circle
+			point(length, -radius, self.outlet_mesh_size),
+			point(length, radius, self.outlet_mesh_size),
+		]
+
+		# Two arcs (gmsh arcs must be smaller than pi) and three lines
+		self.arcs = [
+			factory().addCircleArc(self.points[0].tag, center_point.tag, self.points[1].tag),
+			factory().addCircleArc(self.points[1].tag, center_point.tag, self.points[2].tag),
+		]
+		self.lines = [
+			Line(self.points[2], self.points[3]),
+			Line(self.points[3], self.points[4]),
+			Line(self.points[4], self.points[0]),
+		]
+
+	def close_loop(self):
+		"""
+		Method to form a close loop with the current geometrical object
+
+		Returns
+		-------
+		_ : int
+			return the tag of the CurveLoop object
+		"""
+		return factory().addCurveLoop(self.arcs + [line.tag for line in self.lines])
+
+	def define_bc(self):
+		"""
+		Method that define the marker of the C domain for the boundary condition,
+		everything is "farfield" (as with Circle) so the same SU2 config works
+		-------
+		"""
+		self.bc = gmsh.model.addPhysicalGroup(
+			self.dim, self.arcs + [line.tag for line in self.lines]
+		)
+		gmsh.model.setPhysicalName(self.dim, self.bc, "farfield")
+
+
 class AirfoilSpline:
 	"""
 	A class to represent and airfoil as a CurveLoop object formed with Splines
@@ -420,7 +531,8 @@ class AirfoilSpline:
 	point_cloud : list(list(float))
 		List of points forming the airfoil in the order,
 		each point is a list containing in the order
-		its position x,y,z
+		its position x,y,z. Any ordered contour is accepted; it is
+		stored starting at the trailing edge (see alas/bordes.py)
 	mesh_size : float
 		attribute given for the class Point, (Note that a mesh size larger
 		than the resolution given by the cloud of points
@@ -436,27 +548,22 @@ class AirfoilSpline:
 		self.dim = 1
 		self.mesh_size = mesh_size
 
-		# Generate Points object from the point_cloud
+		# Find leading and trailing edge location from the geometry (see
+		# alas/bordes.py) and start the cloud at the trailing edge, so any
+		# ordered cloud works, whatever its number of points or first point
+		self.point_cloud, self.le_idx, self.blunt_te = ordenar_contorno(point_cloud)
+
+		# Generate Points object from the point_cloud (with a sharp trailing
+		# edge its repeated last point is left out: both splines end at the
+		# first Point)
 		self.points = [
 			Point(point_cord[0], point_cord[1], point_cord[2], mesh_size)
-			for point_cord in point_cloud
+			for point_cord in (self.point_cloud if self.blunt_te else self.point_cloud[:-1])
 		]
 
-		# Find leading and trailing edge location
-		# in points array
-		self.te_idx = 0									# max(self.points, key=attrgetter("x"))
-		self.le_idx = (len(self.points) - 1) // 2		# min(self.points, key=attrgetter("x"))
-
+		self.te_idx = 0
 		self.te = self.points[self.te_idx]
 		self.le = self.points[self.le_idx]
-		print("Total points: " + str(len(self.points)))
-		print("Leading edge index: " + str(self.le_idx))
-
-		print(len(self.points))
-		print("Margins: ")
-		print(self.te_idx, ":", self.le_idx+1)
-		print(self.le_idx, ":", len(self.points)+1)
-		print(len(self.points[self.te_idx:self.le_idx+1]) + len(self.points[self.le_idx:len(self.points)+1]))
 
 	def gen_skin(self):
 		"""
@@ -482,16 +589,26 @@ class AirfoilSpline:
 			self.points[0: self.le_idx + 1])
 
 		# create a spline from the trailing edge to the up down point (down part)
+		# With a sharp trailing edge it closes on the first point
 		self.lower_spline = Spline(
-			self.points[self.le_idx:]
+			self.points[self.le_idx:] + ([] if self.blunt_te else [self.points[0]])
 		)
 
+		# Blunt trailing edge: straight line across its base
 		self.closing_line = Line(
 			self.points[len(self.points)-1], self.points[0]
-		)
-		with open("testing.txt", "w") as file:
-			for point in self.points:
-				file.write("{0},{1},{2}\n".format(point.x,point.y,point.z))
+		) if self.blunt_te else None
+
+	@property
+	def curves(self):
+		"""
+		Curves of the airfoil skin (the closing line only with a blunt
+		trailing edge)
+		"""
+		curves = [self.upper_spline, self.lower_spline]
+		if self.closing_line is not None:
+			curves.append(self.closing_line)
+		return curves
 
 	def close_loop(self):
 		"""
@@ -502,7 +619,7 @@ class AirfoilSpline:
 		_ : int
 			return the tag of the CurveLoop object
 		"""
-		self.close_loop_tag = CurveLoop([self.upper_spline, self.lower_spline, self.closing_line]).tag
+		self.close_loop_tag = CurveLoop(self.curves).tag
 		return self.close_loop_tag
 
 	def define_bc(self):
@@ -510,17 +627,8 @@ class AirfoilSpline:
 		Method that define the marker of the airfoil for the boundary condition
 		-------
 		"""
-		print("Line tags: ")
-		print([
-			self.upper_spline.tag,
-			self.lower_spline.tag,
-			self.closing_line.tag
-		])
-
 		self.bc = gmsh.model.addPhysicalGroup(
-			self.dim, [self.upper_spline.tag,
-							self.lower_spline.tag,
-							self.closing_line.tag]
+			self.dim, [curve.tag for curve in self.curves]
 		)
 		gmsh.model.setPhysicalName(self.dim, self.bc, self.name)
 
@@ -550,15 +658,13 @@ class PlaneSurface:
 			self.tag_list.append(
 				geom_object.close_loop()
 			)
-			print("bien")
 
 		self.dim = 2
-
-		print(self.tag_list)
 		if preview_geom:
+			factory().synchronize()
 			gmsh.fltk.run()
 		# create the gmsh object and store the tag of the geometric object
-		self.tag = gmsh.model.geo.addPlaneSurface(self.tag_list)
+		self.tag = factory().addPlaneSurface(self.tag_list)
 
 	def define_bc(self):
 		"""
@@ -0,0 +1,255 @@
+"""
+Mallado 2D de un alerón multielemento con gmsh
+
+Es lo que hacía mallador.py, metido en una función para poder mallar muchos
+casos seguidos (ver sesion.py). Supone que gmsh ya está inicializado y malla en
+el modelo actual.
+"""
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.mallador.calidad import MallaInvalidaError, informe_gmsh
+from Generador_de_alas.mallador.campos import OPCIONES_CAMPO, aplicar_campo_fondo, campo_fondo, campo_minimo, campos_estela
+from Generador_de_alas.mallador.capa_limite import capas_limite, fondo_campo, fondo_threshold
+from Generador_de_alas.mallador.escritura_su2 import escribir_su2
+from Generador_de_alas.mallador.extrusion import extruir
+from Generador_de_alas.mallador.gmsh_helpers import *
+
+
+gmsh = perezoso("gmsh")
+
+
+# Valores por defecto de las opciones de generar_malla (los de mallador.py)
+OPCIONES_MALLA = {
+	"use_circle_farfield": True,	# True -> círculo, False -> caja
+	"farfield_radius": 7,			# radio del dominio exterior (si usas círculo)
+	"circlex_offset": 2,			# adelantar el perfil dentro del circulo
+	"tunnel_length": 20.0,
+	"tunnel_height": 10.0,
+	"tunnelx_offset": 5,			# adelantar el perfil dentro de la caja
+	"farfield_c": False,			# True -> dominio en C (manda sobre use_circle_farfield)
+	"longitud_c": 15.0,				# longitud del canal aguas abajo del centro del semicírculo
+	"c_x_centro": 1.0,				# x del centro del semicírculo (radio farfield_radius)
+	# Dirección de la corriente libre en grados, para el dominio en C y la estela
+	# (Alerón.AOATotal si se malla el alerón normalizado y SU2 va a AOA = AOATotal)
+	"angulo_corriente": 0.0,
+	"first_layer_height": 0.001,	# altura primera capa BL
+	"bl_ratio": 1.2,
+	"espesor_bl": 0.001*(3+1),
+	# Número de capas objetivo: con él el ratio, el espesor y las capas de cada
+	# elemento salen del campo de fondo (ver capa_limite.py) y bl_ratio y
+	# espesor_bl no se usan. None -> bl_ratio y espesor_bl para todos
+	"capas_bl": None,
+	"opciones_capa": None,			# opciones de capa_limite.capas_limite (ver OPCIONES_CAPA)
+	"mesh_size_airfoil": 0.001,		# tamaño en el contorno del perfil
+	"distanciaMinRefinamiento": 0,
+	"distanciaMaxRefinamiento": 4,
+	"mesh_size_close": 0.001,		# tamaño cerca del ala
+	"farfield_mesh_size": 0.2,		# tamaño lejos del ala
+	"preview_geometria": False,
+	# Núcleo de geometría de gmsh_helpers: "geo" u "occ" (OpenCASCADE, el círculo
+	# del farfield son tres arcos en vez de uno por elemento de malla)
+	"nucleo_geometria": "geo",
+	# False -> Distance + Threshold, True -> campo por curvatura, huecos y estela (ver campos.py)
+	"campo_adaptativo": False,
+	"opciones_campo": None,			# opciones de campos.campo_fondo (ver OPCIONES_CAMPO)
+	# Zona refinada detrás de cada borde de salida, girada con angulo_corriente
+	"refinar_estela": False,
+	"opciones_estela": None,		# opciones de campos.campos_estela (ver OPCIONES_ESTELA)
+	# Revisar la malla antes de escribirla y lanzar MallaInvalidaError si no pasa
+	"comprobar_calidad": False,
+	"umbrales_calidad": None,		# cambios sobre calidad.UMBRALES_CALIDAD
+	# Malla 3D extruida en z (ver extrusion.py), None -> malla 2D
+	"envergadura": None,
+	"capas_envergadura": 16,		# capas en z, o lista de capas por tramo
+	"alturas_envergadura": None,	# fracción acumulada al final de cada tramo (heights de gmsh)
+	"flecha_extrusion": 0.0,		# grados, rebanada en flecha
+	"extremos": "simetria",			# "simetria", "periodico" o "placas" (ver extrusion.EXTREMOS)
+	"tareas_escritura": 16,			# trozos por tipo de elemento al escribir el .su2 en 3D
+}
+
+
+def generar_malla(all_airfoil_points, airfoil_names, output=None, mostrar=False, **opciones):
+	"""
+		Malla el dominio alrededor de los perfiles en el modelo actual de gmsh
+		- Argumentos:
+			- all_airfoil_points: lista con los puntos (x, y, z) de cada perfil (ver read_profile)
+			- airfoil_names: nombre de la boundary de cada perfil (el farfield es "farfield")
+			- output: archivo donde escribir la malla (.su2, .msh, ...), None para no escribir
+			- mostrar: abrir la interfaz de gmsh al terminar
+			- opciones: cualquiera de OPCIONES_MALLA
+		- Con envergadura extruye la malla en z (ver extrusion.extruir) y escribe los
+		  .su2 por trozos (escritura_su2)
+		- Con comprobar_calidad=True lanza MallaInvalidaError (con el informe) si la
+		  malla no pasa los umbrales de calidad, sin llegar a escribirla
+	"""
+	desconocidas = set(opciones) - set(OPCIONES_MALLA)
+	if desconocidas:
+		raise TypeError(f"Unknown mesh options: {sorted(desconocidas)}")
+	o = dict(OPCIONES_MALLA, **opciones)
+	malla_3d = o["envergadura"] is not None
+	if malla_3d and o["comprobar_calidad"]:
+		raise ValueError("comprobar_calidad solo revisa mallas 2D")
+	set_kernel(o["nucleo_geometria"])
+
+	airfoils = []
+
+	for foil_points, name in zip(all_airfoil_points, airfoil_names):
+		airfoils.append(
+			AirfoilSpline(
+				foil_points, o["mesh_size_airfoil"], name)
+		)
+
+	# Los contornos empezando en el borde de salida (AirfoilSpline los ordena), que
+	# es donde los campos buscan la estela
+	contornos = [airfoil.point_cloud for airfoil in airfoils]
+
+	for airfoil in airfoils:
+		airfoil.gen_skin()
+
+	# crear farfield
+	if o["farfield_c"]:
+		ext_domain = CDomain(o["c_x_centro"], 0, 0, o["farfield_radius"], o["longitud_c"],
+									o["angulo_corriente"], mesh_size=o["farfield_mesh_size"])
+	elif o["use_circle_farfield"]:
+		ext_domain = Circle(0+o["circlex_offset"], 0, 0, radius=o["farfield_radius"],
+									mesh_size=o["farfield_mesh_size"])
+	else:
+		ext_domain = Rectangle(0+o["tunnelx_offset"], 0, 0, o["tunnel_length"], o["tunnel_height"],
+										mesh_size=o["farfield_mesh_size"])
+
+	surface = PlaneSurface([ext_domain] + airfoils, preview_geom=o["preview_geometria"])
+	# Única sincronización: la geometría 2D ya está completa
+	factory().synchronize()
+
+	if o["campo_adaptativo"]:
+		# El tamaño en todo el dominio (piel incluida) lo marca el campo de fondo
+		opciones_campo = dict({"direccion_estela": o["angulo_corriente"]}, **(o["opciones_campo"] or {}))
+		X, Y, H = campo_fondo(contornos, o["mesh_size_close"], o["farfield_mesh_size"], **opciones_campo)
+
+	# Ratio y espesor de la capa límite de cada elemento
+	if o["capas_bl"] is None:
+		capas = [(o["bl_ratio"], o["espesor_bl"])]*len(airfoils)
+	else:
+		if o["campo_adaptativo"]:
+			crecimiento = dict(OPCIONES_CAMPO, **opciones_campo)["crecimiento"]
+			fondos = [fondo_campo(X, Y, H, contorno, crecimiento) for contorno in contornos]
+		else:
+			fondos = fondo_threshold(
+				o["mesh_size_close"], o["farfield_mesh_size"],
+				o["distanciaMinRefinamiento"], o["distanciaMaxRefinamiento"]
+			)
+		capas = [
+			(capa.razon, capa.espesor) for capa in capas_limite(
+				contornos, o["first_layer_height"], o["capas_bl"], fondos, **(o["opciones_capa"] or {})
+			)
+		]
+
+	# crear superficie con agujeros = outer_loop + todos los inner loops
+	airfoil_curves = []
+	for airfoil, (razon, espesor) in zip(airfoils, capas):
+		curv = [airfoil.upper_spline.tag,
+					airfoil.lower_spline.tag]
+
+		airfoil_curves += curv
+		# Creates a new mesh field of type 'BoundaryLayer' and assigns it an ID (f).
+		f = gmsh.model.mesh.field.add('BoundaryLayer')
+
+		# Add the curves where we apply the boundary layer (around the airfoil for us)
+		gmsh.model.mesh.field.setNumbers(f, 'CurvesList', curv)
+		gmsh.model.mesh.field.setNumber(f, 'Size', o["first_layer_height"])  # size 1st layer
+		gmsh.model.mesh.field.setNumber(f, 'Ratio', razon)  # Growth ratio
+		# Total thickness of boundary layer
+		gmsh.model.mesh.field.setNumber(f, 'Thickness', espesor)
+
+		# Forces to use quads and not triangle when =1 (i.e. true)
+		gmsh.model.mesh.field.setNumber(f, 'Quads', 1)
+
+		# Enter the points where we want a "fan" (points must be at end on line)(only te for us)
+		gmsh.model.mesh.field.setNumbers(
+				f, "FanPointsList", [airfoil.te.tag])
+
+		gmsh.model.mesh.field.setAsBoundaryLayer(f)
+
+	ext_domain.define_bc()
+	surface.define_bc()
+	for airfoil in airfoils:
+		airfoil.define_bc()
+
+	if malla_3d:
+		extruir(
+			surface.tag, o["envergadura"], o["capas_envergadura"], o["alturas_envergadura"],
+			o["flecha_extrusion"], o["extremos"]
+		)
+
+	if o["campo_adaptativo"]:
+		fondo = aplicar_campo_fondo(X, Y, H)
+		gmsh.option.setNumber("Mesh.MeshSizeFromPoints", 0)
+		gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 0)
+		gmsh.option.setNumber("Mesh.MeshSizeMax", o["farfield_mesh_size"])
+	else:
+		# Campo "Distance" a las curvas de los perfiles y "Threshold" que pasa de
+		# mesh_size_close a farfield_mesh_size entre DistMin y DistMax
+		#
+		# SizeMax -                     /------------------
+		#                              /
+		#                             /
+		#                            /
+		# SizeMin -o----------------/
+		#          |                |    |
+		#        Point         DistMin  DistMax
+		campoDistancia = gmsh.model.mesh.field.add("Distance")
+		gmsh.model.mesh.field.setNumbers(campoDistancia, "CurvesList", airfoil_curves)
+		gmsh.model.mesh.field.setNumber(campoDistancia, "Sampling", 500)
+
+		zonaRefinamiento = gmsh.model.mesh.field.add("Threshold")
+		gmsh.model.mesh.field.setNumber(zonaRefinamiento, "InField", campoDistancia)
+		gmsh.model.mesh.field.setNumber(zonaRefinamiento, "SizeMin", o["mesh_size_close"])
+		gmsh.model.mesh.field.setNumber(zonaRefinamiento, "SizeMax", o["farfield_mesh_size"])
+		gmsh.model.mesh.field.setNumber(zonaRefinamiento, "DistMin", o["distanciaMinRefinamiento"])
+		gmsh.model.mesh.field.setNumber(zonaRefinamiento, "DistMax", o["distanciaMaxRefinamiento"])
+
+		fondo = zonaRefinamiento
+		gmsh.option.setNumber("Mesh.MeshSizeFromPoints", 1)
+		gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 1)
+		gmsh.option.setNumber("Mesh.MeshSizeMax", 1e22)
+
+	if o["refinar_estela"]:
+		fondo = campo_minimo([fondo] + campos_estela(
+			contornos, o["mesh_size_close"], o["farfield_mesh_size"],
+			o["angulo_corriente"], **(o["opciones_estela"] or {})
+		))
+	gmsh.model.mesh.field.setAsBackgroundMesh(fondo)
+
+	gmsh.option.setNumber("Mesh.SaveAll", 0)
+
+	# Generate mesh
+	gmsh.model.mesh.generate(1)
+	gmsh.model.mesh.generate(2)
+	if malla_3d:
+		# Solo capas extruidas (hexaedros y prismas), sin optimizar el volumen
+		gmsh.model.mesh.generate(3)
+	else:
+		gmsh.model.mesh.optimize("Laplace2D", 5) # La librería que he copiado lo usaba, yo no he visto gran diferencia
+
+	if o["comprobar_calidad"]:
+		# Con capas_bl cada elemento tiene su ratio: se compara con la media
+		informe = informe_gmsh(
+			o["first_layer_height"], float(np.mean([razon for razon, _ in capas])),
+			marcadores_pared=airfoil_names,
+			umbrales=o["umbrales_calidad"]
+		)
+		if not informe.ok:
+			raise MallaInvalidaError(informe)
+
+	if mostrar:
+		gmsh.fltk.run()
+
+	if output is not None:
+		if malla_3d and output.endswith(".su2"):
+			escribir_su2(output, o["tareas_escritura"])
+		else:
+			gmsh.write(output)
+
+	return output
@@ -0,0 +1,167 @@
+"""
+Sesión de gmsh reutilizable para mallar muchos casos seguidos
+
+Inicializar gmsh (y en un proceso nuevo, importarlo) cuesta más que mallar un
+perfil pequeño. MeshSession mantiene un gmsh abierto por proceso, fija las
+opciones una sola vez y malla cada configuración en un modelo nuevo con nombre
+propio que se borra al terminar, de forma que los tags de entidades, grupos
+físicos y campos (en gmsh los campos son de cada modelo) nunca pasan de una
+malla a la siguiente.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from Generador_de_alas._perezoso import perezoso
+from Generador_de_alas.mallador.calidad import MallaInvalidaError
+from Generador_de_alas.mallador.gmsh_helpers import read_profile
+from Generador_de_alas.mallador.mallado import OPCIONES_MALLA, generar_malla
+
+
+gmsh = perezoso("gmsh")
+
+
+# Opciones globales de gmsh que se fijan una vez por sesión
+OPCIONES_GMSH = {
+	"General.Terminal": 0,
+	"General.Verbosity": 1,
+	"Mesh.SaveAll": 0,
+}
+
+
+class MeshSession:
+	"""
+	A class to keep one gmsh instance alive across many meshes
+	...
+
+	Attributes
+	----------
+	opciones_gmsh : dict
+		gmsh options ("Mesh.Algorithm", ...) set once for the whole session
+	opciones_malla : dict
+		default options for generar_malla (see OPCIONES_MALLA), can be
+		overridden per mesh
+	hilos : int
+		General.NumThreads for this worker
+	"""
+
+	def __init__(self, opciones_gmsh=None, opciones_malla=None, hilos=1):
+		self.opciones_gmsh = dict(OPCIONES_GMSH, **(opciones_gmsh or {}))
+		self.opciones_malla = dict(OPCIONES_MALLA, **(opciones_malla or {}))
+		self.hilos = hilos
+		self.n_mallas = 0
+		self._propia = False
+
+		if not gmsh.isInitialized():
+			gmsh.initialize(readConfigFiles=False)
+			self._propia = True
+
+		self.aplicar_opciones()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.cerrar()
+
+	def aplicar_opciones(self):
+		"""
+		Method to set the session options in gmsh (options are global, they
+		survive model changes, so this is only needed once)
+		"""
+		gmsh.option.setNumber("General.NumThreads", self.hilos)
+		for nombre, valor in self.opciones_gmsh.items():
+			if isinstance(valor, str):
+				gmsh.option.setString(nombre, valor)
+			else:
+				gmsh.option.setNumber(nombre, valor)
+
+	@contextmanager
+	def modelo(self, nombre=None):
+		"""
+		Context manager giving a fresh, empty gmsh model that is removed on exit
+
+		Parameters
+		----------
+		nombre : str
+			name of the model, by default "malla_<n>"
+		"""
+		nombre = f"malla_{self.n_mallas}" if nombre is None else nombre
+		gmsh.model.add(nombre)
+		gmsh.model.setCurrent(nombre)
+		try:
+			yield nombre
+		finally:
+			gmsh.model.remove()
+			# Las vistas (p.ej. el campo de fondo de campos.py) son globales, no del modelo
+			for vista in gmsh.view.getTags():
+				gmsh.view.remove(vista)
+			self.n_mallas += 1
+
+	def mallar(self, all_airfoil_points, airfoil_names, output=None, nombre=None, **opciones):
+		"""
+		Method to mesh one configuration in its own model (see generar_malla)
+		"""
+		with self.modelo(nombre):
+			return generar_malla(
+				all_airfoil_points, airfoil_names, output,
+				**dict(self.opciones_malla, **opciones)
+			)
+
+	def mallar_archivos(self, airfoil_files, airfoil_names, output=None, nombre=None, **opciones):
+		"""
+		Same as mallar, reading each airfoil from a coordinates file
+		"""
+		puntos = [read_profile(archivo) for archivo in airfoil_files]
+		return self.mallar(puntos, airfoil_names, output, nombre, **opciones)
+
+	def cerrar(self):
+		"""
+		Method to finalize gmsh, only if this session initialized it
+		"""
+		if self._propia and gmsh.isInitialized():
+			gmsh.finalize()
+		self._propia = False
+
+
+# Una sesión por proceso trabajador (ver mallar_lote)
+_sesion_trabajador = None
+
+
+def _iniciar_trabajador(opciones_gmsh, opciones_malla, hilos):
+	global _sesion_trabajador
+	_sesion_trabajador = MeshSession(opciones_gmsh, opciones_malla, hilos)
+
+
+def _mallar_caso(sesion, caso):
+	airfoil_files, airfoil_names, output, opciones = caso
+	try:
+		return sesion.mallar_archivos(airfoil_files, airfoil_names, output, **opciones), None
+	except MallaInvalidaError as error:
+		return None, error.informe
+
+
+def _mallar_en_trabajador(caso):
+	return _mallar_caso(_sesion_trabajador, caso)
+
+
+def mallar_lote(casos, n_trabajos=1, opciones_gmsh=None, opciones_malla=None, hilos=1):
+	"""
+		Malla muchos casos con una sesión de gmsh por proceso trabajador
+		- Argumentos:
+			- casos: lista de (archivos de perfiles, nombres, archivo de salida, {opciones})
+			- n_trabajos: procesos trabajadores
+			- opciones_gmsh, opciones_malla, hilos: ver MeshSession
+		- Devuelve una lista de (archivo de salida, informe), uno por caso: los
+		  rechazados por calidad (opción comprobar_calidad) dan (None, InformeCalidad)
+		  y el resto (salida, None)
+	"""
+	if n_trabajos <= 1:
+		with MeshSession(opciones_gmsh, opciones_malla, hilos) as sesion:
+			return [_mallar_caso(sesion, caso) for caso in casos]
+
+	with ProcessPoolExecutor(
+			max_workers=n_trabajos,
+			initializer=_iniciar_trabajador,
+			initargs=(opciones_gmsh, opciones_malla, hilos)) as pool:
+		return list(pool.map(_mallar_en_trabajador, casos))
@@ -0,0 +1,109 @@
+"""
+Generación de casos de SU2 a partir de un barrido de parámetros
+
+Un caso es una carpeta con su malla y su .cfg, más el diccionario de parámetros
+del barrido que lo ha generado (para luego juntarlo con los resultados).
+"""
+
+import itertools
+import json
+import os
+import shutil
+
+from Generador_de_alas.su2.config import escribir_config
+
+
+class Caso:
+	"""
+		Un caso de SU2 listo para lanzar
+		- Atributos:
+			- nombre: identificador del caso (también nombre de la carpeta)
+			- carpeta: carpeta donde se ejecuta SU2
+			- cfg: nombre del archivo .cfg dentro de la carpeta
+			- parametros: {parámetro: valor} del barrido
+	"""
+
+	def __init__(self, nombre, carpeta, cfg, parametros):
+		self.nombre = nombre
+		self.carpeta = carpeta
+		self.cfg = cfg
+		self.parametros = dict(parametros)
+
+	def __repr__(self):
+		return self.__class__.__name__ + f"({self.nombre!r})"
+
+	@property
+	def ruta_cfg(self):
+		return os.path.join(self.carpeta, self.cfg)
+
+
+def barrido_producto(**ejes):
+	"""
+		Producto cartesiano de los ejes del barrido
+		- Ejemplo:
+			barrido_producto(AOA=[0, 5, 10], gap_x=[-0.2, -0.1])
+			--> [{"AOA": 0, "gap_x": -0.2}, {"AOA": 0, "gap_x": -0.1}, ...]
+	"""
+	claves = list(ejes.keys())
+	return [dict(zip(claves, valores)) for valores in itertools.product(*ejes.values())]
+
+
+def preparar_caso(carpeta, nombre, parametros, malla, cfg_base, cambios=None, copiar_malla=False):
+	"""
+		Crea la carpeta del caso con su .cfg
+		- Argumentos:
+			- carpeta: carpeta raíz del barrido, el caso va en carpeta/nombre
+			- nombre: nombre del caso
+			- parametros: parámetros del barrido (se guardan en parametros.json)
+			- malla: archivo .su2 del caso
+			- cfg_base: .cfg de partida
+			- cambios: opciones de SU2 a sobrescribir (AOA, ITER, ...)
+			- copiar_malla: copiar la malla dentro de la carpeta en vez de referenciarla
+	"""
+	carpeta_caso = os.path.join(carpeta, nombre)
+	if not os.path.exists(carpeta_caso):
+		os.makedirs(carpeta_caso)
+
+	if copiar_malla:
+		shutil.copy(malla, carpeta_caso)
+		malla = os.path.basename(malla)
+	else:
+		malla = os.path.relpath(os.path.abspath(malla), os.path.abspath(carpeta_caso))
+
+	cambios = dict(cambios or {})
+	cambios["MESH_FILENAME"] = malla
+	# El historial se lee en CSV para poder seguirlo mientras corre
+	cambios.setdefault("TABULAR_FORMAT", "CSV")
+
+	escribir_config(cfg_base, os.path.join(carpeta_caso, "caso.cfg"), cambios)
+
+	with open(os.path.join(carpeta_caso, "parametros.json"), "w") as archivo:
+		json.dump(parametros, archivo, indent=1)
+
+	return Caso(nombre, carpeta_caso, "caso.cfg", parametros)
+
+
+def generar_casos(carpeta, barrido, mallas, cfg_base, cambios=None, opciones_su2=()):
+	"""
+		Prepara un caso por cada punto del barrido
+		- Argumentos:
+			- carpeta: carpeta raíz del barrido
+			- barrido: lista de diccionarios de parámetros (ver barrido_producto)
+			- mallas: una malla por caso, o una sola malla para todos (barridos de AOA)
+			- cfg_base: .cfg de partida
+			- cambios: opciones de SU2 comunes a todos los casos
+			- opciones_su2: parámetros del barrido que son opciones de SU2 (p.ej. "AOA")
+				y se pasan directamente al .cfg
+	"""
+	if isinstance(mallas, str):
+		mallas = [mallas]*len(barrido)
+	if len(mallas) != len(barrido):
+		raise ValueError(f"Se esperaban {len(barrido)} mallas, hay {len(mallas)}")
+
+	casos = []
+	for i, (parametros, malla) in enumerate(zip(barrido, mallas)):
+		cambios_caso = dict(cambios or {})
+		cambios_caso.update({clave: parametros[clave] for clave in opciones_su2})
+		casos.append(preparar_caso(carpeta, f"caso_{i:05d}", parametros, malla, cfg_base, cambios_caso))
+
+	return casos
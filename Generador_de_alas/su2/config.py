@@ -0,0 +1,81 @@
+"""
+Lectura y escritura de archivos de configuración de SU2 (.cfg)
+
+El formato es "CLAVE= VALOR" por línea, con comentarios que empiezan por '%'.
+Al escribir se parte siempre del archivo base para conservar comentarios y orden.
+"""
+
+import os
+import re
+
+
+_linea_clave = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=(.*)$")
+
+
+def leer_config(ruta):
+	"""
+		Devuelve un diccionario {CLAVE: "valor"} con las opciones del .cfg
+		- Argumentos:
+			- ruta: archivo de configuración de SU2
+	"""
+	opciones = {}
+	with open(ruta, "r") as archivo:
+		for linea in archivo:
+			if linea.lstrip().startswith("%"):
+				continue
+			encontrada = _linea_clave.match(linea)
+			if encontrada:
+				opciones[encontrada.group(1).upper()] = encontrada.group(2).strip()
+	return opciones
+
+
+def formatear_valor(valor):
+	"""
+		Pasa un valor de Python a texto de SU2:
+			- bool -> YES / NO
+			- lista o tupla -> ( a, b, c )
+	"""
+	if isinstance(valor, bool):
+		return "YES" if valor else "NO"
+	if isinstance(valor, (list, tuple)):
+		return "( " + ", ".join(formatear_valor(v) for v in valor) + " )"
+	return str(valor)
+
+
+def escribir_config(ruta_base, ruta_salida, cambios=None):
+	"""
+		Copia el .cfg base en ruta_salida sustituyendo las claves de 'cambios'.
+		Las claves que no existían en el archivo base se añaden al final.
+		- Argumentos:
+			- ruta_base: .cfg de partida (p.ej. su2_config_base.cfg)
+			- ruta_salida: donde escribir el .cfg del caso
+			- cambios: {CLAVE: valor}
+	"""
+	cambios = {clave.upper(): formatear_valor(valor) for clave, valor in (cambios or {}).items()}
+	pendientes = dict(cambios)
+
+	lineas = []
+	with open(ruta_base, "r") as archivo:
+		for linea in archivo:
+			encontrada = None if linea.lstrip().startswith("%") else _linea_clave.match(linea)
+			if encontrada and encontrada.group(1).upper() in cambios:
+				clave = encontrada.group(1).upper()
+				lineas.append(f"{encontrada.group(1)}= {cambios[clave]}\n")
+				pendientes.pop(clave, None)
+			else:
+				lineas.append(linea)
+
+	if pendientes:
+		if lineas and not lineas[-1].endswith("\n"):
+			lineas[-1] += "\n"
+		lineas.append("%\n% ----------- Añadido por el generador de casos -----------%\n")
+		lineas += [f"{clave}= {valor}\n" for clave, valor in pendientes.items()]
+
+	carpeta = os.path.dirname(ruta_salida)
+	if carpeta and not os.path.exists(carpeta):
+		os.makedirs(carpeta)
+
+	with open(ruta_salida, "w") as archivo:
+		archivo.writelines(lineas)
+
+	return ruta_salida
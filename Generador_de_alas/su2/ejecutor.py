@@ -0,0 +1,156 @@
+"""
+Lanzador local de casos de SU2
+
+Ejecuta SU2_CFD (o el sustituto su2_simulado.py para pruebas, ver COMANDO_SIMULADO)
+para cada caso, con tantos casos a la vez como quepan en la máquina según los hilos
+y procesos MPI por caso. Mientras corre cada caso se sigue su historial y se para en
+cuanto se cumple el criterio de convergencia.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Generador_de_alas.su2.config import leer_config
+from Generador_de_alas.su2.historial import CriterioConvergencia, SeguidorHistorial
+
+
+COMANDO_SU2 = ("SU2_CFD",)
+COMANDO_SIMULADO = (sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "su2_simulado.py"))
+
+# Estados de un caso
+CONVERGIDO = "convergido"
+TERMINADO = "terminado"		# SU2 acabó por su cuenta (ITER o sus propios criterios)
+TIEMPO_AGOTADO = "tiempo_agotado"
+ERROR = "error"
+
+
+def trabajos_simultaneos(hilos=1, procesos_mpi=1):
+	"""
+		Cuántos casos se pueden lanzar a la vez sin sobresuscribir la máquina
+	"""
+	return max(1, (os.cpu_count() or 1) // max(1, hilos*procesos_mpi))
+
+
+def comando_caso(caso, comando=COMANDO_SU2, hilos=1, procesos_mpi=1, mpirun="mpirun"):
+	"""
+		Línea de comandos para lanzar un caso
+	"""
+	linea = list(comando)
+	if hilos > 1:
+		linea += ["-t", str(hilos)]
+	linea.append(caso.cfg)
+	if procesos_mpi > 1:
+		linea = [mpirun, "-n", str(procesos_mpi)] + linea
+	return linea
+
+
+def ruta_historial(caso, opciones=None):
+	opciones = leer_config(caso.ruta_cfg) if opciones is None else opciones
+	nombre = opciones.get("CONV_FILENAME", "history")
+	if not os.path.splitext(nombre)[1]:
+		extension = ".dat" if opciones.get("TABULAR_FORMAT", "CSV").upper() == "TECPLOT" else ".csv"
+		nombre += extension
+	return os.path.join(caso.carpeta, nombre)
+
+
+def _parar(proceso):
+	proceso.terminate()
+	try:
+		proceso.wait(timeout=10)
+	except subprocess.TimeoutExpired:
+		proceso.kill()
+		proceso.wait()
+
+
+def ejecutar_caso(caso, comando=COMANDO_SU2, hilos=1, procesos_mpi=1, criterio=None,
+		intervalo=1.0, tiempo_max=None, parar_al_converger=True):
+	"""
+		Lanza un caso y espera a que acabe
+		- Argumentos:
+			- caso: Caso (ver casos.py)
+			- comando: ejecutable de SU2 (tupla, p.ej. ("SU2_CFD",) o COMANDO_SIMULADO)
+			- hilos: hilos OpenMP por proceso
+			- procesos_mpi: procesos MPI por caso (se lanza con mpirun si es > 1)
+			- criterio: CriterioConvergencia, por defecto el de las opciones CONV_* del .cfg
+			- intervalo: segundos entre lecturas del historial
+			- tiempo_max: segundos máximos por caso (None = sin límite)
+			- parar_al_converger: matar SU2 en cuanto se cumple el criterio
+		- Devuelve un diccionario con nombre, parametros, CL, CD, iteraciones, estado y tiempo
+	"""
+	opciones = leer_config(caso.ruta_cfg)
+	criterio = CriterioConvergencia.desde_config(opciones) if criterio is None else criterio
+	historial = SeguidorHistorial(ruta_historial(caso, opciones))
+
+	# Si queda un historial de una ejecución anterior no debe contar
+	if os.path.exists(historial.ruta):
+		os.remove(historial.ruta)
+
+	entorno = dict(os.environ, OMP_NUM_THREADS=str(hilos))
+	inicio = time.perf_counter()
+	estado = None
+
+	with open(os.path.join(caso.carpeta, "su2.log"), "w") as log:
+		proceso = subprocess.Popen(
+			comando_caso(caso, comando, hilos, procesos_mpi),
+			cwd=caso.carpeta, stdout=log, stderr=subprocess.STDOUT, env=entorno
+		)
+
+		while proceso.poll() is None:
+			time.sleep(intervalo)
+			if historial.leer_nuevas() and parar_al_converger and criterio.convergido(historial):
+				_parar(proceso)
+				estado = CONVERGIDO
+			elif tiempo_max is not None and time.perf_counter() - inicio > tiempo_max:
+				_parar(proceso)
+				estado = TIEMPO_AGOTADO
+
+	historial.leer_nuevas()
+	if estado is None:
+		if proceso.returncode != 0:
+			estado = ERROR
+		elif criterio.convergido(historial):
+			estado = CONVERGIDO
+		else:
+			estado = TERMINADO
+
+	resultado = {
+		"nombre": caso.nombre,
+		"parametros": caso.parametros,
+		"CL": float("nan"),
+		"CD": float("nan"),
+		"iteraciones": len(historial),
+		"estado": estado,
+		"tiempo": time.perf_counter() - inicio,
+	}
+	for campo in ("CL", "CD"):
+		try:
+			resultado[campo] = float(historial.ultimo(campo))
+		except KeyError:
+			pass
+
+	return resultado
+
+
+def ejecutar_casos(casos, comando=COMANDO_SU2, hilos=1, procesos_mpi=1, n_trabajos=None, **kwargs):
+	"""
+		Lanza todos los casos, varios a la vez
+		- Argumentos:
+			- casos: lista de Caso
+			- n_trabajos: casos simultáneos, por defecto los que caben en la máquina
+				(núcleos / (hilos * procesos_mpi))
+			- el resto igual que ejecutar_caso
+		- Devuelve la lista de resultados en el mismo orden que 'casos'
+	"""
+	if n_trabajos is None:
+		n_trabajos = trabajos_simultaneos(hilos, procesos_mpi)
+
+	# El trabajo de verdad lo hacen los procesos de SU2, los hilos solo los vigilan
+	with ThreadPoolExecutor(max_workers=n_trabajos) as pool:
+		futuros = [
+			pool.submit(ejecutar_caso, caso, comando, hilos, procesos_mpi, **kwargs)
+			for caso in casos
+		]
+		return [futuro.result() for futuro in futuros]
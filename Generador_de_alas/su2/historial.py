@@ -0,0 +1,162 @@
+"""
+Seguimiento del historial de convergencia de SU2 (CONV_FILENAME) mientras corre
+
+SU2 escribe el historial en CSV (TABULAR_FORMAT= CSV) con una cabecera del tipo
+	"Inner_Iter","rms[P]","rms[U]","rms[V]","CL","CD"
+y una fila por iteración. Aquí se lee de forma incremental, sin volver a leer
+el archivo entero cada vez.
+"""
+
+import os
+
+import numpy as np
+
+
+# Nombre de la opción CONV_FIELD del .cfg --> columna del historial
+CAMPOS_HISTORIAL = {
+	"RMS_PRESSURE": "rms[P]",
+	"RMS_VELOCITY-X": "rms[U]",
+	"RMS_VELOCITY-Y": "rms[V]",
+	"RMS_DENSITY": "rms[Rho]",
+	"RMS_NU_TILDE": "rms[nu]",
+	"LIFT": "CL",
+	"DRAG": "CD",
+}
+
+
+def _limpiar(campo):
+	return campo.strip().strip('"').strip()
+
+
+class SeguidorHistorial:
+	"""
+		Lee las filas nuevas del historial desde la última lectura
+
+		- Atributos:
+			- ruta: archivo del historial (p.ej. history.csv)
+			- columnas: nombres de las columnas (None hasta leer la cabecera)
+			- datos: {columna: lista de valores}
+	"""
+
+	def __init__(self, ruta):
+		self.ruta = ruta
+		self.columnas = None
+		self.datos = {}
+		self._posicion = 0
+		self._resto = ""
+
+	def __len__(self):
+		if not self.columnas:
+			return 0
+		return len(self.datos[self.columnas[0]])
+
+	def leer_nuevas(self):
+		"""
+			Lee lo que SU2 haya añadido desde la última llamada.
+			Devuelve el número de filas nuevas
+		"""
+		if not os.path.exists(self.ruta):
+			return 0
+
+		with open(self.ruta, "r") as archivo:
+			archivo.seek(self._posicion)
+			texto = archivo.read()
+			self._posicion = archivo.tell()
+
+		texto = self._resto + texto
+		lineas = texto.split("\n")
+		# La última línea puede estar a medio escribir
+		self._resto = lineas.pop()
+
+		nuevas = 0
+		for linea in lineas:
+			if not linea.strip():
+				continue
+			campos = [_limpiar(campo) for campo in linea.split(",")]
+			if self.columnas is None:
+				self.columnas = campos
+				self.datos = {columna: [] for columna in campos}
+				continue
+			try:
+				valores = [float(campo) for campo in campos]
+			except ValueError:
+				continue
+			for columna, valor in zip(self.columnas, valores):
+				self.datos[columna].append(valor)
+			nuevas += 1
+
+		return nuevas
+
+	def columna(self, nombre):
+		"""
+			Devuelve la columna como array, buscando sin distinguir mayúsculas.
+			Acepta también los nombres de CONV_FIELD (RMS_VELOCITY-X, LIFT, ...)
+		"""
+		nombre = CAMPOS_HISTORIAL.get(nombre.upper(), nombre)
+		for columna in self.columnas or []:
+			if columna.lower() == nombre.lower():
+				return np.asarray(self.datos[columna])
+		raise KeyError(f"Column '{nombre}' not found in '{self.ruta}'")
+
+	def ultimo(self, nombre):
+		valores = self.columna(nombre)
+		return valores[-1] if len(valores) else np.nan
+
+
+class CriterioConvergencia:
+	"""
+		Criterio para parar un caso antes de llegar a ITER
+
+		Se da por convergido si, pasadas 'iter_inicio' iteraciones:
+			- el residuo de 'campo_residuo' (log10, como lo escribe SU2) baja de 'residuo_min', o
+			- la variación relativa media de cada campo de 'campos_cauchy' en las últimas
+			  'cauchy_elems' iteraciones baja de 'cauchy_eps'
+	"""
+
+	def __init__(self, campo_residuo="RMS_VELOCITY-X", residuo_min=-7.5, cauchy_eps=1e-6,
+			cauchy_elems=100, iter_inicio=100, campos_cauchy=("LIFT", "DRAG")):
+		self.campo_residuo = campo_residuo
+		self.residuo_min = residuo_min
+		self.cauchy_eps = cauchy_eps
+		self.cauchy_elems = int(cauchy_elems)
+		self.iter_inicio = int(iter_inicio)
+		self.campos_cauchy = tuple(campos_cauchy)
+
+	@classmethod
+	def desde_config(cls, opciones, campos_cauchy=("LIFT", "DRAG")):
+		"""
+			Construye el criterio con las opciones CONV_* de un .cfg (ver leer_config)
+		"""
+		campo = opciones.get("CONV_FIELD", "RMS_VELOCITY-X").strip("() ").split(",")[0].strip()
+		return cls(
+			campo_residuo=campo,
+			residuo_min=float(opciones.get("CONV_RESIDUAL_MINVAL", -7.5)),
+			cauchy_eps=float(opciones.get("CONV_CAUCHY_EPS", 1e-6)),
+			cauchy_elems=int(opciones.get("CONV_CAUCHY_ELEMS", 100)),
+			iter_inicio=int(opciones.get("CONV_STARTITER", 100)),
+			campos_cauchy=campos_cauchy,
+		)
+
+	def convergido(self, historial):
+		if len(historial) <= max(self.iter_inicio, 1):
+			return False
+
+		try:
+			if historial.ultimo(self.campo_residuo) < self.residuo_min:
+				return True
+		except KeyError:
+			pass
+
+		if len(historial) <= self.cauchy_elems:
+			return False
+
+		for campo in self.campos_cauchy:
+			try:
+				valores = historial.columna(campo)[-(self.cauchy_elems + 1):]
+			except KeyError:
+				return False
+			escala = np.maximum(np.abs(valores[1:]), np.finfo(float).tiny)
+			if np.mean(np.abs(np.diff(valores)) / escala) >= self.cauchy_eps:
+				return False
+
+		return bool(self.campos_cauchy)
@@ -0,0 +1,206 @@
+"""
+Arranque en caliente encadenado entre casos vecinos de un barrido
+
+Los casos de un barrido de AOA o de gaps se parecen mucho entre sí. En lugar de
+arrancar cada uno desde la corriente libre, se ordenan siguiendo un camino por el
+espacio de parámetros y cada caso arranca con la solución del anterior interpolada
+en su malla (vecino más próximo o lineal, buscando con un KD-tree).
+
+SU2 tiene que escribir el reinicio en ASCII para poder interpolarlo, por eso los
+casos encadenados añaden RESTART_ASCII a OUTPUT_FILES y leen con READ_BINARY_RESTART= NO.
+"""
+
+import os
+
+import numpy as np
+
+from Generador_de_alas.su2.config import escribir_config, leer_config
+from Generador_de_alas.su2.ejecutor import COMANDO_SU2, ejecutar_caso
+
+
+SOLUCION_INICIAL = "solucion_inicial"
+VECINO = "vecino"
+LINEAL = "lineal"
+
+
+def ordenar_casos(casos, claves=None):
+	"""
+		Ordena los casos por un camino corto a través del espacio de parámetros
+		(vecino más próximo partiendo del caso con los parámetros más bajos)
+		- Argumentos:
+			- casos: lista de Caso
+			- claves: parámetros a tener en cuenta (por defecto todos los numéricos)
+		- Los parámetros se escalan a [0, 1] para que pesen lo mismo
+	"""
+	if len(casos) < 3:
+		return list(casos)
+
+	if claves is None:
+		claves = [
+			clave for clave, valor in casos[0].parametros.items()
+			if isinstance(valor, (int, float, np.number)) and not isinstance(valor, bool)
+		]
+
+	puntos = np.array([[caso.parametros[clave] for clave in claves] for caso in casos], dtype=float)
+	rango = np.ptp(puntos, axis=0)
+	puntos = (puntos - puntos.min(axis=0)) / np.where(rango > 0, rango, 1)
+
+	pendientes = np.ones(len(casos), dtype=bool)
+	actual = int(np.lexsort(puntos.T[::-1])[0])
+	orden = [actual]
+	pendientes[actual] = False
+
+	for _ in range(len(casos) - 1):
+		distancias = np.sum((puntos - puntos[actual])**2, axis=1)
+		distancias[~pendientes] = np.inf
+		actual = int(np.argmin(distancias))
+		orden.append(actual)
+		pendientes[actual] = False
+
+	return [casos[i] for i in orden]
+
+
+def leer_puntos_malla(ruta):
+	"""
+		Coordenadas de los nodos de una malla .su2 (array NPOIN x NDIME)
+	"""
+	ndime = 2
+	with open(ruta, "r") as archivo:
+		for linea in archivo:
+			linea = linea.split("%")[0].strip()
+			if linea.startswith("NDIME"):
+				ndime = int(linea.split("=")[1])
+			elif linea.startswith("NPOIN"):
+				npoin = int(linea.split("=")[1].split()[0])
+				puntos = np.loadtxt(archivo, max_rows=npoin, usecols=range(ndime), ndmin=2)
+				return puntos
+
+	raise ValueError(f"NPOIN section not found in '{ruta}'")
+
+
+def leer_reinicio(ruta):
+	"""
+		Lee un reinicio ASCII de SU2 (restart_flow.csv)
+		- Devuelve (columnas, datos) con datos de tamaño NPOIN x columnas
+	"""
+	with open(ruta, "r") as archivo:
+		columnas = [columna.strip().strip('"') for columna in archivo.readline().split(",")]
+		datos = np.genfromtxt(archivo, delimiter=",", ndmin=2, invalid_raise=False)
+	if datos.size == 0 or datos.shape[1] != len(columnas):
+		raise ValueError(f"Restart file '{ruta}' is empty or incomplete")
+	return columnas, datos
+
+
+def escribir_reinicio(ruta, columnas, datos):
+	cabecera = ",".join(f'"{columna}"' for columna in columnas)
+	formatos = ["%d"] + ["%.15e"]*(len(columnas) - 1)
+	np.savetxt(ruta, datos, delimiter=", ", header=cabecera, comments="", fmt=formatos)
+
+
+def interpolar_reinicio(ruta_reinicio, ruta_malla, ruta_salida, metodo=VECINO):
+	"""
+		Pasa la solución de un reinicio ASCII a los nodos de otra malla
+		- Argumentos:
+			- ruta_reinicio: restart_flow.csv del caso anterior
+			- ruta_malla: malla .su2 del caso nuevo
+			- ruta_salida: reinicio interpolado para el caso nuevo
+			- metodo: VECINO (vecino más próximo) o LINEAL (baricéntrica en la
+				triangulación de los nodos antiguos, vecino más próximo fuera de ella)
+	"""
+	from scipy.spatial import cKDTree
+
+	columnas, datos = leer_reinicio(ruta_reinicio)
+	nuevos = leer_puntos_malla(ruta_malla)
+	ndime = nuevos.shape[1]
+
+	# Las coordenadas van justo después de PointID
+	antiguos = datos[:, 1:1 + ndime]
+	campos = datos[:, 1 + ndime:]
+
+	_, cercano = cKDTree(antiguos).query(nuevos, k=1)
+	interpolados = campos[cercano]
+
+	if metodo == LINEAL:
+		from scipy.spatial import Delaunay
+
+		triangulacion = Delaunay(antiguos)
+		simplex = triangulacion.find_simplex(nuevos)
+		dentro = simplex >= 0
+		transformada = triangulacion.transform[simplex[dentro]]
+		bar = np.einsum("ijk,ik->ij", transformada[:, :ndime], nuevos[dentro] - transformada[:, ndime])
+		pesos = np.column_stack((bar, 1 - bar.sum(axis=1)))
+		vertices = triangulacion.simplices[simplex[dentro]]
+		interpolados[dentro] = np.einsum("ij,ijk->ik", pesos, campos[vertices])
+	elif metodo != VECINO:
+		raise ValueError(f"Unknown interpolation method '{metodo}'")
+
+	salida = np.column_stack((np.arange(len(nuevos)), nuevos, interpolados))
+	escribir_reinicio(ruta_salida, columnas, salida)
+	return ruta_salida
+
+
+def _archivo_reinicio(caso, opciones):
+	nombre = opciones.get("RESTART_FILENAME", "restart_flow")
+	return os.path.join(caso.carpeta, os.path.splitext(nombre)[0] + ".csv")
+
+
+def _salidas_con_ascii(opciones):
+	salidas = [salida.strip() for salida in opciones.get("OUTPUT_FILES", "(RESTART)").strip("() ").split(",")]
+	if "RESTART_ASCII" not in salidas:
+		salidas.append("RESTART_ASCII")
+	return [salida for salida in salidas if salida]
+
+
+def preparar_arranque(caso, anterior, metodo=VECINO):
+	"""
+		Prepara 'caso' para arrancar desde la solución del caso 'anterior'
+		(o desde la corriente libre si anterior es None o no dejó reinicio)
+		- Devuelve True si el caso arranca en caliente
+	"""
+	opciones = leer_config(caso.ruta_cfg)
+	cambios = {"OUTPUT_FILES": _salidas_con_ascii(opciones), "RESTART_SOL": False}
+
+	if anterior is not None:
+		reinicio = _archivo_reinicio(anterior, leer_config(anterior.ruta_cfg))
+		malla = os.path.join(caso.carpeta, opciones["MESH_FILENAME"])
+		try:
+			interpolar_reinicio(reinicio, malla, os.path.join(caso.carpeta, SOLUCION_INICIAL + ".csv"), metodo)
+		except (OSError, ValueError):
+			# Sin reinicio válido (el caso anterior falló o se cortó escribiéndolo): en frío
+			pass
+		else:
+			cambios.update({
+				"RESTART_SOL": True,
+				"READ_BINARY_RESTART": False,
+				"SOLUTION_FILENAME": SOLUCION_INICIAL,
+			})
+
+	escribir_config(caso.ruta_cfg, caso.ruta_cfg, cambios)
+	return cambios["RESTART_SOL"]
+
+
+def ejecutar_encadenado(casos, comando=COMANDO_SU2, hilos=1, procesos_mpi=1, metodo=VECINO,
+		claves=None, ordenar=True, **kwargs):
+	"""
+		Ejecuta los casos uno detrás de otro, cada uno arrancando desde el anterior
+		- Argumentos:
+			- casos: lista de Caso
+			- metodo: interpolación entre mallas, VECINO o LINEAL
+			- claves: parámetros que definen el camino (ver ordenar_casos)
+			- ordenar: ordenar los casos antes de encadenarlos
+			- el resto igual que ejecutar_caso
+		- Devuelve los resultados en el orden de 'casos', con 'arranque_caliente' añadido.
+		  Las iteraciones totales del barrido son sum(r["iteraciones"] for r in resultados)
+	"""
+	cadena = ordenar_casos(casos, claves) if ordenar else list(casos)
+
+	resultados = {}
+	anterior = None
+	for caso in cadena:
+		caliente = preparar_arranque(caso, anterior, metodo)
+		resultado = ejecutar_caso(caso, comando, hilos, procesos_mpi, **kwargs)
+		resultado["arranque_caliente"] = caliente
+		resultados[caso.nombre] = resultado
+		anterior = caso
+
+	return [resultados[caso.nombre] for caso in casos]
@@ -0,0 +1,65 @@
+"""
+Tabla de resultados de un barrido: una fila por caso, con los parámetros del
+barrido y los coeficientes finales de SU2, guardada por columnas (Parquet o npz)
+"""
+
+import os
+
+import numpy as np
+
+
+COLUMNAS_RESULTADO = ("nombre", "CL", "CD", "iteraciones", "estado", "tiempo")
+
+
+def tabla_resultados(resultados):
+	"""
+		Junta los resultados de ejecutar_casos con sus parámetros en una tabla por columnas
+		- Devuelve {columna: array}, una entrada por caso
+	"""
+	parametros = []
+	for resultado in resultados:
+		for clave in resultado["parametros"]:
+			if clave not in parametros and clave not in COLUMNAS_RESULTADO:
+				parametros.append(clave)
+
+	tabla = {}
+	for clave in parametros:
+		tabla[clave] = np.asarray([resultado["parametros"].get(clave, np.nan) for resultado in resultados])
+	for clave in COLUMNAS_RESULTADO:
+		tabla[clave] = np.asarray([resultado[clave] for resultado in resultados])
+
+	return tabla
+
+
+def guardar_tabla(tabla, ruta):
+	"""
+		Guarda la tabla en Parquet (si la extensión es .parquet, necesita pyarrow)
+		o en npz (cualquier otra extensión)
+	"""
+	carpeta = os.path.dirname(ruta)
+	if carpeta and not os.path.exists(carpeta):
+		os.makedirs(carpeta)
+
+	if ruta.endswith(".parquet"):
+		import pyarrow
+		import pyarrow.parquet
+
+		pyarrow.parquet.write_table(pyarrow.table({clave: list(valores) for clave, valores in tabla.items()}), ruta)
+	else:
+		np.savez(ruta, **tabla)
+
+	return ruta
+
+
+def cargar_tabla(ruta):
+	"""
+		Lee una tabla guardada con guardar_tabla
+	"""
+	if ruta.endswith(".parquet"):
+		import pyarrow.parquet
+
+		tabla = pyarrow.parquet.read_table(ruta)
+		return {clave: tabla.column(clave).to_numpy() for clave in tabla.column_names}
+
+	with np.load(ruta, allow_pickle=False) as datos:
+		return {clave: datos[clave] for clave in datos.files}
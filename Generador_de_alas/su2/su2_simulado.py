@@ -0,0 +1,104 @@
+"""
+Sustituto de SU2_CFD para probar el lanzador sin tener SU2 instalado
+
+Lee el .cfg igual que SU2 y escribe un historial CSV con un residuo que baja de
+forma exponencial y unos CL/CD que convergen a valores que dependen del AOA.
+Cada OUTPUT_WRT_FREQ iteraciones escribe un reinicio ASCII en los nodos de la malla
+(con el CL actual como "presión") y, con RESTART_SOL= YES, arranca desde el CL
+guardado en SOLUTION_FILENAME, de forma que un buen arranque ahorra iteraciones.
+
+No depende del paquete para poder lanzarlo desde la carpeta del caso igual que SU2.
+
+Uso:
+	python su2_simulado.py [-t HILOS] caso.cfg
+"""
+
+import math
+import os
+import sys
+import time
+
+
+# Segundos por iteración, para que haya algo que seguir
+PAUSA = 1e-4
+
+
+def leer_opciones(cfg):
+	opciones = {}
+	with open(cfg, "r") as archivo:
+		for linea in archivo:
+			if "=" in linea and not linea.lstrip().startswith("%"):
+				clave, valor = linea.split("=", 1)
+				opciones[clave.strip().upper()] = valor.strip()
+	return opciones
+
+
+def leer_nodos(malla):
+	if not os.path.exists(malla):
+		return [(0.0, 0.0)]
+	nodos = []
+	with open(malla, "r") as archivo:
+		for linea in archivo:
+			if linea.startswith("NPOIN"):
+				for _ in range(int(linea.split("=")[1].split()[0])):
+					x, y = archivo.readline().split()[:2]
+					nodos.append((float(x), float(y)))
+				break
+	return nodos or [(0.0, 0.0)]
+
+
+def escribir_reinicio(ruta, nodos, cl):
+	with open(ruta + ".tmp", "w") as archivo:
+		archivo.write('"PointID","x","y","Pressure","Velocity_x","Velocity_y"\n')
+		for i, (x, y) in enumerate(nodos):
+			archivo.write(f"{i}, {x:.10e}, {y:.10e}, {cl:.10e}, 1.0, 0.0\n")
+	os.replace(ruta + ".tmp", ruta)
+
+
+def leer_cl_reinicio(ruta):
+	with open(ruta, "r") as archivo:
+		archivo.readline()
+		valores = [float(linea.split(",")[3]) for linea in archivo if linea.strip()]
+	return sum(valores) / len(valores)
+
+
+def main(argumentos):
+	cfg = [argumento for argumento in argumentos if argumento.endswith(".cfg")][-1]
+	opciones = leer_opciones(cfg)
+
+	iteraciones = int(opciones.get("ITER", 1000))
+	aoa = math.radians(float(opciones.get("AOA", 0)))
+	historial = opciones.get("CONV_FILENAME", "history") + ".csv"
+	reinicio = opciones.get("RESTART_FILENAME", "restart_flow").rsplit(".", 1)[0] + ".csv"
+	frecuencia = int(opciones.get("OUTPUT_WRT_FREQ", "50").strip("() ").split(",")[0])
+	nodos = leer_nodos(opciones.get("MESH_FILENAME", ""))
+
+	cl_final = 2*math.pi*math.sin(aoa)
+	cd_final = 0.01 + 0.05*math.sin(aoa)**2
+
+	# Error inicial relativo: 1 desde la corriente libre, menos si se arranca de otra solución
+	cl_inicial = 0.0
+	solucion = opciones.get("SOLUTION_FILENAME", "solution_flow").rsplit(".", 1)[0] + ".csv"
+	if opciones.get("RESTART_SOL", "NO").upper() == "YES" and os.path.exists(solucion):
+		cl_inicial = leer_cl_reinicio(solucion)
+	error_inicial = max(abs(cl_final - cl_inicial) / max(abs(cl_final), 0.1), 1e-6)
+
+	with open(historial, "w") as archivo:
+		archivo.write('"Inner_Iter","rms[P]","rms[U]","rms[V]","CL","CD"\n')
+		for i in range(iteraciones):
+			decaimiento = error_inicial*math.exp(-i/150)
+			residuo = math.log10(decaimiento) - 1
+			cl = cl_final + (cl_inicial - cl_final)*math.exp(-i/150)*math.cos(i/20)
+			cd = cd_final*(1 + decaimiento)
+			archivo.write(f"{i}, {residuo:.6f}, {residuo:.6f}, {residuo:.6f}, {cl:.10f}, {cd:.10f}\n")
+			archivo.flush()
+			if (i + 1) % frecuencia == 0:
+				escribir_reinicio(reinicio, nodos, cl)
+			time.sleep(PAUSA)
+
+	escribir_reinicio(reinicio, nodos, cl)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
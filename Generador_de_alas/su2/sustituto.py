@@ -0,0 +1,257 @@
+"""
+Modelo sustituto sobre los resultados de los barridos
+
+Proceso gaussiano con kernel RBF aproximado con características de Fourier
+aleatorias: con m características el modelo es una regresión lineal bayesiana en
+m dimensiones, así que entrenar cuesta O(n m^2), añadir resultados nuevos es una
+actualización de rango bajo (sin volver a ver los anteriores) y predecir un lote
+es un producto de matrices más una sustitución triangular para la incertidumbre.
+
+servir() expone el modelo por HTTP en local para consultas de "qué pasaría si"
+desde otros procesos:
+	POST /predecir    {"x": [[...], ...]}        -> {"media": [[...]], "std": [[...]]}
+	POST /actualizar  {"x": [[...]], "y": [[...]]} -> {"n": total de puntos}
+	GET  /info                                   -> entradas, salidas, n
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from Generador_de_alas._perezoso import perezoso
+
+
+linalg = perezoso("scipy.linalg")
+
+
+class ModeloSustituto:
+	"""
+		Regresión bayesiana sobre características de Fourier aleatorias (GP RBF aproximado)
+
+		- Atributos:
+			- entradas, salidas: nombres de las columnas de X e Y
+			- n_caracteristicas: número de características de Fourier (m)
+			- escala: longitud de correlación en variables normalizadas (una o una por entrada)
+			- ruido: varianza del ruido en variables normalizadas
+			- n: puntos con los que se ha entrenado
+			- max_cache: predicciones individuales que se guardan (0 para no guardar)
+
+		La normalización de X e Y se fija con el primer entrenamiento y no cambia con
+		las actualizaciones.
+	"""
+
+	def __init__(self, entradas, salidas, n_caracteristicas=512, escala=0.5, ruido=1e-3, semilla=0, max_cache=100000):
+		self.entradas = list(entradas)
+		self.salidas = list(salidas)
+		self.n_caracteristicas = n_caracteristicas
+		self.escala = np.broadcast_to(np.asarray(escala, dtype=float), (len(self.entradas),)).copy()
+		self.ruido = ruido
+		self.max_cache = max_cache
+		self.n = 0
+
+		generador = np.random.default_rng(semilla)
+		self.frecuencias = generador.standard_normal((len(self.entradas), n_caracteristicas)) / self.escala[:, None]
+		self.fases = generador.uniform(0, 2*np.pi, n_caracteristicas)
+
+		self.media_x = self.std_x = self.media_y = self.std_y = None
+		# Precisión a posteriori de los pesos (m x m) y Phi^T y (m x salidas)
+		self.precision = np.eye(n_caracteristicas)
+		self.phi_y = np.zeros((n_caracteristicas, len(self.salidas)))
+		self.pesos = np.zeros_like(self.phi_y)
+		self.covarianza = np.eye(n_caracteristicas)
+		self._cache = OrderedDict()
+		self._cerrojo = threading.RLock()
+
+	@classmethod
+	def desde_tabla(cls, tabla, entradas, salidas=("CL", "CD"), filtro=None, **kwargs):
+		"""
+			Modelo entrenado con una tabla de resultados (su2.resultados)
+			- filtro: array de booleanos con las filas que se usan, por defecto las que
+			  no tienen ningún NaN (p.ej. casos con error)
+		"""
+		x = np.column_stack([np.asarray(tabla[c], dtype=float) for c in entradas])
+		y = np.column_stack([np.asarray(tabla[c], dtype=float) for c in salidas])
+		if filtro is None:
+			filtro = np.isfinite(x).all(axis=1) & np.isfinite(y).all(axis=1)
+		modelo = cls(entradas, salidas, **kwargs)
+		modelo.entrenar(x[filtro], y[filtro])
+		return modelo
+
+	def _caracteristicas(self, x):
+		z = (np.atleast_2d(np.asarray(x, dtype=float)) - self.media_x) / self.std_x
+		return np.sqrt(2/self.n_caracteristicas)*np.cos(z @ self.frecuencias + self.fases)
+
+	def entrenar(self, x, y):
+		"""
+			Entrena desde cero con X (n x entradas) e Y (n x salidas)
+		"""
+		x = np.atleast_2d(np.asarray(x, dtype=float))
+		y = np.asarray(y, dtype=float).reshape(len(x), -1)
+		with self._cerrojo:
+			self.media_x, self.std_x = x.mean(axis=0), x.std(axis=0)
+			self.std_x[self.std_x == 0] = 1
+			self.media_y, self.std_y = y.mean(axis=0), y.std(axis=0)
+			self.std_y[self.std_y == 0] = 1
+			self.precision = np.eye(self.n_caracteristicas)
+			self.phi_y = np.zeros((self.n_caracteristicas, len(self.salidas)))
+			self.n = 0
+			self.actualizar(x, y)
+
+	def actualizar(self, x, y):
+		"""
+			Añade resultados nuevos sin rehacer el entrenamiento con los anteriores
+		"""
+		if self.media_x is None:
+			return self.entrenar(x, y)
+
+		x = np.atleast_2d(np.asarray(x, dtype=float))
+		y = np.asarray(y, dtype=float).reshape(len(x), -1)
+		phi = self._caracteristicas(x)
+		with self._cerrojo:
+			self.precision += phi.T @ phi / self.ruido
+			self.phi_y += phi.T @ ((y - self.media_y) / self.std_y) / self.ruido
+			self.n += len(x)
+			self._posterior()
+			self._cache.clear()
+
+	def _posterior(self):
+		factor = linalg.cho_factor(self.precision, lower=True)
+		self.pesos = linalg.cho_solve(factor, self.phi_y)
+		self.covarianza = linalg.cho_solve(factor, np.eye(self.n_caracteristicas))
+
+	def predecir(self, x, con_std=True):
+		"""
+			Predicción de un lote X (n x entradas)
+			- Devuelve media (n x salidas) y, con con_std, su desviación típica
+		"""
+		phi = self._caracteristicas(x)
+		with self._cerrojo:
+			media = phi @ self.pesos*self.std_y + self.media_y
+			if not con_std:
+				return media
+			# Varianza de los pesos en cada punto (diagonal de phi A^-1 phi^T), más el ruido
+			varianza = np.einsum("ij,ij->i", phi @ self.covarianza, phi)
+		std = np.sqrt(np.maximum(varianza, 0) + self.ruido)[:, None]*self.std_y
+		return media, std
+
+	def predecir_cache(self, x):
+		"""
+			Como predecir, pero recordando las predicciones de puntos ya consultados
+			(se olvidan al actualizar el modelo)
+		"""
+		x = np.atleast_2d(np.asarray(x, dtype=float))
+		claves = [fila.tobytes() for fila in x]
+		media = np.empty((len(x), len(self.salidas)))
+		std = np.empty_like(media)
+
+		with self._cerrojo:
+			faltan = []
+			for i, clave in enumerate(claves):
+				if clave in self._cache:
+					self._cache.move_to_end(clave)
+					media[i], std[i] = self._cache[clave]
+				else:
+					faltan.append(i)
+
+			if faltan:
+				media[faltan], std[faltan] = self.predecir(x[faltan])
+				for i in faltan:
+					self._cache[claves[i]] = (media[i], std[i])
+				while len(self._cache) > self.max_cache:
+					self._cache.popitem(last=False)
+
+		return media, std
+
+	def guardar(self, ruta):
+		"""
+			Guarda el modelo en un .npz (sin pickle)
+		"""
+		with self._cerrojo:
+			np.savez(
+				ruta,
+				entradas=np.array(self.entradas), salidas=np.array(self.salidas),
+				escala=self.escala, ruido=self.ruido, n=self.n,
+				frecuencias=self.frecuencias, fases=self.fases,
+				media_x=self.media_x, std_x=self.std_x, media_y=self.media_y, std_y=self.std_y,
+				precision=self.precision, phi_y=self.phi_y,
+			)
+		return ruta
+
+	@classmethod
+	def cargar(cls, ruta, max_cache=100000):
+		"""
+			Lee un modelo guardado con guardar
+		"""
+		with np.load(ruta, allow_pickle=False) as datos:
+			modelo = cls(
+				datos["entradas"].tolist(), datos["salidas"].tolist(),
+				n_caracteristicas=len(datos["fases"]), escala=datos["escala"],
+				ruido=float(datos["ruido"]), max_cache=max_cache,
+			)
+			modelo.frecuencias, modelo.fases = datos["frecuencias"], datos["fases"]
+			modelo.media_x, modelo.std_x = datos["media_x"], datos["std_x"]
+			modelo.media_y, modelo.std_y = datos["media_y"], datos["std_y"]
+			modelo.precision, modelo.phi_y = datos["precision"], datos["phi_y"]
+			modelo.n = int(datos["n"])
+
+		modelo._posterior()
+		return modelo
+
+
+class _Manejador(BaseHTTPRequestHandler):
+	modelo = None
+
+	def _responder(self, codigo, datos):
+		cuerpo = json.dumps(datos).encode()
+		self.send_response(codigo)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(cuerpo)))
+		self.end_headers()
+		self.wfile.write(cuerpo)
+
+	def do_GET(self):
+		if self.path != "/info":
+			return self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+		self._responder(200, {"entradas": self.modelo.entradas, "salidas": self.modelo.salidas, "n": self.modelo.n})
+
+	def do_POST(self):
+		try:
+			peticion = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+			x = np.asarray(peticion["x"], dtype=float).reshape(-1, len(self.modelo.entradas))
+
+			if self.path == "/predecir":
+				media, std = self.modelo.predecir_cache(x)
+				return self._responder(200, {"media": media.tolist(), "std": std.tolist()})
+			if self.path == "/actualizar":
+				self.modelo.actualizar(x, peticion["y"])
+				return self._responder(200, {"n": self.modelo.n})
+			self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+		except (KeyError, ValueError, TypeError) as error:
+			self._responder(400, {"error": str(error)})
+
+	def log_message(self, *args):
+		pass
+
+
+def servidor(modelo, host="127.0.0.1", puerto=8765):
+	"""
+		Servidor HTTP (un hilo por conexión) para el modelo; llamar a serve_forever()
+		o usar servir()
+	"""
+	manejador = type("Manejador", (_Manejador,), {"modelo": modelo})
+	return ThreadingHTTPServer((host, puerto), manejador)
+
+
+def servir(modelo, host="127.0.0.1", puerto=8765):
+	"""
+		Sirve el modelo hasta que se interrumpa (Ctrl+C)
+	"""
+	with servidor(modelo, host, puerto) as http:
+		print(f"Modelo sustituto en http://{host}:{http.server_address[1]} ({modelo.n} puntos)")
+		try:
+			http.serve_forever()
+		except KeyboardInterrupt:
+			pass
@@ -0,0 +1,52 @@
+"""
+Error del ajuste CST (cst.ajustar_archivo) de los perfiles de datos_perfiles
+para varios órdenes: el máximo en y y la distancia máxima de los puntos a la
+curva ajustada (en normal a la superficie, lo que importa junto al borde de
+ataque), con la x donde se da, por lado. Los puntos del segmento que cierra un
+borde de salida grueso no cuentan (no son superficie, ver cst._quitar_cierre)
+
+Uso:
+	python benchmarks/bench_ajuste_cst.py
+"""
+
+import glob
+import os
+import sys
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas import cst
+from Generador_de_alas.alas.fileio import import_airfoil_data
+
+
+DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "datos_perfiles")
+ORDENES = (8, 10)
+X_FINO = 0.5*(1 - np.cos(np.linspace(0, np.pi, 20001)))
+
+
+def errores(lado, a, dz, orden):
+	x, y = cst._quitar_cierre(*lado)
+	en_y = np.abs(cst.matriz_bernstein(x, orden) @ a + x*dz - y)
+	curva = np.column_stack((X_FINO, cst.matriz_bernstein(X_FINO, orden) @ a + X_FINO*dz))
+	normal = cKDTree(curva).query(np.column_stack((x, y)))[0]
+	return f"{en_y.max():8.1e} ({x[np.argmax(en_y)]:5.3f}) {normal.max():8.1e} ({x[np.argmax(normal)]:5.3f})"
+
+
+def main():
+	print(f"{'perfil':28s} {'orden':>5s} {'lado':>9s} {'máx y (x)':>17s} {'máx normal (x)':>17s}")
+	for ruta in sorted(glob.glob(os.path.join(DATOS, "*.dat"))):
+		upper, lower = import_airfoil_data(ruta)
+		lados = cst._separar_lados(upper, lower)
+		for orden in ORDENES:
+			parametros = cst.ajustar(upper, lower, orden)
+			n = orden + 1
+			for i, nombre in enumerate(("extradós", "intradós")):
+				a = parametros[i*n:(i + 1)*n]
+				print(f"{os.path.basename(ruta):28s} {orden:5d} {nombre:>9s} {errores(lados[i], a, parametros[2*n + i], orden)}")
+
+
+if __name__ == "__main__":
+	main()
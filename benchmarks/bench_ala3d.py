@@ -0,0 +1,54 @@
+"""
+Exportación de un ala 3D grande: alerón de tres elementos con cientos de
+estaciones y miles de puntos por sección, a STL binario y OBJ
+
+Uso:
+	python benchmarks/bench_ala3d.py [N_ESTACIONES] [PUNTOS_POR_LADO]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.ala3d import Ala, Estacion
+from geometria_prueba import ala_tres_elementos
+
+
+def main():
+	n_estaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+	n_puntos = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+	elementos, _ = ala_tres_elementos(2*n_puntos)
+	seccion = [puntos[:, :2] for puntos in elementos]
+	envergadura = 3.0
+	estaciones = [
+		Estacion(seccion, y, cuerda=1 - 0.3*y/envergadura, torsion=-2*y, flecha=10, diedro=3)
+		for y in np.linspace(0, envergadura, n_estaciones)
+	]
+
+	inicio = time.perf_counter()
+	ala = Ala(estaciones, n_puntos)
+	malla = ala.malla()
+	tiempos = {"malla": time.perf_counter() - inicio}
+
+	with tempfile.TemporaryDirectory() as carpeta:
+		for nombre, funcion in (("STL", ala.exportar_stl), ("OBJ", ala.exportar_obj)):
+			ruta = os.path.join(carpeta, f"ala.{nombre.lower()}")
+			inicio = time.perf_counter()
+			n_triangulos = funcion(ruta)
+			tiempos[nombre] = time.perf_counter() - inicio
+			tiempos[f"{nombre} MB"] = os.path.getsize(ruta)/2**20
+
+	print(f"malla {malla.shape}, {n_triangulos} triángulos, volumen {ala.volumen():.5f}")
+	for nombre in ("malla", "STL", "OBJ"):
+		extra = f"  ({tiempos[nombre + ' MB']:.0f} MB)" if nombre != "malla" else ""
+		print(f"{nombre:6s} {tiempos[nombre]:7.2f} s{extra}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,106 @@
+"""
+Archivo binario de alerones (alas/binario.py) con muchas configuraciones:
+escritura por lotes, apertura con np.memmap y lectura aleatoria, frente a
+exportar cada alerón a texto con Alerón.exportar. Antes comprueba la ida y
+vuelta leyendo con índices negativos
+
+Uso:
+	python benchmarks/bench_binario.py [N_CONFIGURACIONES]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas import binario
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.aleron import Alerón
+
+
+def aleron_base():
+	with contextlib.redirect_stdout(io.StringIO()):
+		foils = [Airfoil.NACA("4412"), Airfoil.NACA("0010"), Airfoil.NACA("0010")]
+		for foil, cuerda, aoa in zip(foils[1:], (0.4, 0.25), (20, 40)):
+			foil.escalar(cuerda)
+			foil.setAOA(aoa)
+		return Alerón(foils, [[0.0, 0.02], [0.0, 0.02]], meta={"name": "base"})
+
+
+def comprobar_indices(carpeta):
+	"""Ida y vuelta de dos alerones leyendo con índices negativos"""
+	alerones = [aleron_base(), aleron_base()]
+	alerones[1].meta = {"name": "ultimo"}
+	ruta = os.path.join(carpeta, "indices.alr")
+	binario.guardar(alerones, ruta)
+	with binario.abrir(ruta) as archivo:
+		ultimo = archivo[-1]
+		assert ultimo.meta == {"name": "ultimo"} and archivo.meta(-1) == archivo.meta(1)
+		assert np.array_equal(ultimo.foils[0]._x_upper, alerones[1].foils[0]._x_upper)
+		assert archivo[-2].meta == {"name": "base"}
+		for fuera in (2, -3):
+			try:
+				archivo[fuera]
+			except IndexError:
+				pass
+			else:
+				raise AssertionError(f"archivo[{fuera}] no da IndexError")
+
+
+def main():
+	n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+	lote = 10_000
+	aleron = aleron_base()
+	generador = np.random.default_rng(0)
+
+	with tempfile.TemporaryDirectory() as carpeta:
+		comprobar_indices(carpeta)
+		ruta = os.path.join(carpeta, "barrido.alr")
+		inicio = time.perf_counter()
+		with binario.EscritorAlerones(ruta, *binario._forma(aleron), precision="f4", meta={"n": n}) as escritor:
+			base = binario.registro(aleron, escritor.dtype)
+			for i in range(0, n, lote):
+				registros = np.repeat(base, min(lote, n - i))
+				# Configuraciones distintas sin pasar por Airfoil: solo se mueven los arrays
+				registros["extrados"][:, 1:, 1] += generador.normal(0, 1e-3, (len(registros), 2, 1)).astype("f4")
+				escritor.escribir_registros(registros)
+		escritura = time.perf_counter() - inicio
+		tamano = os.path.getsize(ruta)/2**20
+
+		inicio = time.perf_counter()
+		archivo = binario.abrir(ruta)
+		apertura = time.perf_counter() - inicio
+
+		indices = generador.integers(0, n, 1000)
+		inicio = time.perf_counter()
+		suma = sum(float(archivo.registros[i]["extrados"][1, 1].sum()) for i in indices)
+		aleatorio = (time.perf_counter() - inicio)/len(indices)
+
+		inicio = time.perf_counter()
+		for i in indices[:100]:
+			archivo[int(i)]
+		reconstruccion = (time.perf_counter() - inicio)/100
+
+		inicio = time.perf_counter()
+		with contextlib.redirect_stdout(io.StringIO()):
+			for i in range(100):
+				aleron.exportar(carpeta=os.path.join(carpeta, "texto"), sameFile=True)
+		texto = (time.perf_counter() - inicio)/100
+		archivo.cerrar()
+
+	print(f"{n} configuraciones, {tamano:.0f} MB ({1e6*escritura/n:.2f} us/configuración al escribir)")
+	print(f"apertura:                       {1e3*apertura:8.3f} ms")
+	print(f"registro aleatorio (memmap):    {1e6*aleatorio:8.1f} us")
+	print(f"Alerón aleatorio (Airfoil):     {1e3*reconstruccion:8.3f} ms")
+	print(f"Alerón.exportar a texto:        {1e3*texto:8.3f} ms/configuración")
+	assert np.isfinite(suma)
+
+
+if __name__ == "__main__":
+	main()
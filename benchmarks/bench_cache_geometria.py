@@ -0,0 +1,43 @@
+"""
+Barrido que crea una y otra vez los perfiles de una pequeña biblioteca (como
+Mi_aleron.py con el s1223 para los dos flaps), con y sin CacheGeometria
+
+Uso:
+	python benchmarks/bench_cache_geometria.py [N_ALERONES]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.airfoils import CACHE_GEOMETRIA, Airfoil
+from Generador_de_alas.alas.fileio import import_airfoil_data
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def main():
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	biblioteca = [
+		import_airfoil_data(os.path.join(RAIZ, "datos_perfiles", nombre))
+		for nombre in ("e423.dat", "s1223.dat", "s1223.dat")
+	]
+
+	print(f"{'caché':>6s} {'ms/alerón':>10s}  estadísticas")
+	for max_tamano in (0, 256):
+		CACHE_GEOMETRIA.max_tamano = max_tamano
+		CACHE_GEOMETRIA.vaciar()
+		inicio = time.perf_counter()
+		for i in range(n):
+			for j, (upper, lower) in enumerate(biblioteca):
+				foil = Airfoil(upper, lower)
+				foil.escalar(1/(j + 1))
+				foil.setAOA(10*j)
+		tiempo = (time.perf_counter() - inicio)/n
+		print(f"{max_tamano:6d} {1e3*tiempo:10.3f}  {CACHE_GEOMETRIA.estadisticas()}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,82 @@
+"""
+Distance/Threshold fijo vs campo adaptativo (curvatura + huecos + estela)
+
+Para un alerón de tres elementos mide el número de celdas, el tiempo de mallado
+y el tamaño medio de celda en las zonas críticas: los huecos entre elementos y
+la estela cercana de cada borde de salida.
+
+Uso:
+	python benchmarks/bench_campo_adaptativo.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import gmsh
+from scipy.spatial import cKDTree
+
+from Generador_de_alas.mallador.campos import fuentes_huecos
+from Generador_de_alas.mallador.mallado import generar_malla
+from Generador_de_alas.mallador.sesion import MeshSession
+from geometria_prueba import ala_tres_elementos
+
+
+OPCIONES = {
+	"first_layer_height": 1e-4,
+	"espesor_bl": 1e-3,
+	"mesh_size_airfoil": 0.002,
+	"mesh_size_close": 0.002,
+	"farfield_mesh_size": 0.5,
+}
+
+
+def tamanos_celdas():
+	"""Centroides y tamaño (raíz del área) de todas las celdas 2D del modelo actual"""
+	etiquetas, coordenadas, _ = gmsh.model.mesh.getNodes()
+	nodos = np.zeros((int(etiquetas.max()) + 1, 2))
+	nodos[etiquetas.astype(int)] = coordenadas.reshape(-1, 3)[:, :2]
+
+	centroides = []
+	tamanos = []
+	for tipo, n in ((2, 3), (3, 4)):
+		_, conectividad = gmsh.model.mesh.getElementsByType(tipo)
+		if not len(conectividad):
+			continue
+		p = nodos[conectividad.astype(int).reshape(-1, n)]
+		x, y = p[..., 0], p[..., 1]
+		area = 0.5*np.abs(np.sum(x*np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1)*y, axis=1))
+		centroides.append(p.mean(axis=1))
+		tamanos.append(np.sqrt(area))
+	return np.concatenate(centroides), np.concatenate(tamanos)
+
+
+def main():
+	perfiles, nombres = ala_tres_elementos()
+	centros_hueco, _ = fuentes_huecos([p[:, :2] for p in perfiles], 1e-3, hueco_max=0.1)
+	bordes_salida = np.array([0.5*(p[0, :2] + p[-1, :2]) for p in perfiles])
+	estela = np.concatenate([b + np.outer(np.linspace(0, 0.3, 30), (1, 0)) for b in bordes_salida])
+
+	with MeshSession(opciones_malla=OPCIONES) as sesion:
+		for nombre, adaptativo in (("Distance/Threshold", False), ("adaptativo", True)):
+			with sesion.modelo():
+				inicio = time.perf_counter()
+				generar_malla(perfiles, nombres, **dict(sesion.opciones_malla, campo_adaptativo=adaptativo))
+				tiempo = time.perf_counter() - inicio
+
+				centroides, tamanos = tamanos_celdas()
+				arbol = cKDTree(centroides)
+				en_hueco = np.unique(np.concatenate(arbol.query_ball_point(centros_hueco, 0.01)))
+				en_estela = np.unique(np.concatenate(arbol.query_ball_point(estela, 0.01)))
+
+				print(f"{nombre:20s} celdas: {len(tamanos):9d}  tiempo: {tiempo:6.2f} s  "
+					f"tamaño medio hueco: {np.mean(tamanos[en_hueco]):.2e}  "
+					f"estela: {np.mean(tamanos[en_estela]):.2e}")
+
+
+if __name__ == "__main__":
+	main()
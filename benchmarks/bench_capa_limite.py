@@ -0,0 +1,65 @@
+"""
+Capa límite fija (bl_ratio y espesor_bl iguales para todos los elementos, con un
+mesh_size_close fino para que no haya salto) frente a capas_bl, que ajusta la
+capa de cada elemento al campo de fondo y deja usar un mesh_size_close más
+grueso. Mide celdas, tiempo de mallado y la relación entre la primera celda
+isótropa y la última capa (el salto de tamaño al salir de la capa límite)
+
+Uso:
+	python benchmarks/bench_capa_limite.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.mallador.capa_limite import capas_limite, fondo_threshold
+from Generador_de_alas.mallador.mallado import generar_malla
+from Generador_de_alas.mallador.sesion import MeshSession
+from bench_campo_adaptativo import tamanos_celdas
+from geometria_prueba import ala_tres_elementos
+
+
+OPCIONES = {
+	"first_layer_height": 1e-4,
+	"mesh_size_airfoil": 0.002,
+	"farfield_mesh_size": 0.5,
+	"distanciaMaxRefinamiento": 3,
+}
+
+CASOS = (
+	("fija, close 0.001", {"bl_ratio": 1.2, "espesor_bl": 1e-4*(1.2**12 - 1)/0.2, "mesh_size_close": 0.001}),
+	("capas_bl=20, close 0.004", {"capas_bl": 20, "mesh_size_close": 0.004}),
+	("capas_bl=20, close 0.008", {"capas_bl": 20, "mesh_size_close": 0.008}),
+)
+
+
+def main():
+	perfiles, nombres = ala_tres_elementos()
+
+	with MeshSession(opciones_malla=OPCIONES) as sesion:
+		for nombre, opciones in CASOS:
+			o = dict(sesion.opciones_malla, **opciones)
+			fondo = fondo_threshold(o["mesh_size_close"], o["farfield_mesh_size"], 0, o["distanciaMaxRefinamiento"])
+			if "capas_bl" in opciones:
+				saltos = [capa.tamano_fondo/capa.ultima for capa in capas_limite(
+					perfiles, o["first_layer_height"], o["capas_bl"], fondo
+				)]
+			else:
+				n = 12
+				saltos = [fondo(o["espesor_bl"])/(o["first_layer_height"]*o["bl_ratio"]**(n - 1))]*len(perfiles)
+
+			with sesion.modelo():
+				inicio = time.perf_counter()
+				generar_malla(perfiles, nombres, **o)
+				tiempo = time.perf_counter() - inicio
+				_, tamanos = tamanos_celdas()
+
+			print(f"{nombre:26s} celdas: {len(tamanos):9d}  tiempo: {tiempo:6.2f} s  "
+				f"salto fondo/última capa: {' '.join(f'{s:5.2f}' for s in saltos)}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,72 @@
+"""
+Dominio circular vs dominio en C con refinamiento de estela alineado con la
+corriente, para el alerón de tres elementos con la corriente a 5 grados
+
+Mide el número de celdas, el tiempo de mallado y el tamaño medio de celda a lo
+largo de la estela (cerca: hasta 0.5 cuerdas, lejos: de 0.5 a 2 cuerdas detrás de
+cada borde de salida, en la dirección de la corriente).
+
+Uso:
+	python benchmarks/bench_dominio_c.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scipy.spatial import cKDTree
+
+from Generador_de_alas.mallador.mallado import generar_malla
+from Generador_de_alas.mallador.sesion import MeshSession
+from bench_campo_adaptativo import tamanos_celdas
+from geometria_prueba import ala_tres_elementos
+
+
+ANGULO = 5.0
+
+OPCIONES = {
+	"first_layer_height": 1e-4,
+	"espesor_bl": 1e-3,
+	"mesh_size_airfoil": 0.002,
+	"mesh_size_close": 0.002,
+	"farfield_mesh_size": 0.5,
+	"angulo_corriente": ANGULO,
+}
+
+CASOS = (
+	("círculo", {}),
+	("círculo + estela", {"refinar_estela": True}),
+	("C + estela", {"farfield_c": True, "refinar_estela": True, "distanciaMaxRefinamiento": 2}),
+)
+
+
+def main():
+	perfiles, nombres = ala_tres_elementos()
+	bordes_salida = np.array([0.5*(p[0, :2] + p[-1, :2]) for p in perfiles])
+	direccion = np.array([np.cos(np.deg2rad(ANGULO)), np.sin(np.deg2rad(ANGULO))])
+	cerca = np.concatenate([b + np.outer(np.linspace(0, 0.5, 50), direccion) for b in bordes_salida])
+	lejos = np.concatenate([b + np.outer(np.linspace(0.5, 2.0, 150), direccion) for b in bordes_salida])
+
+	with MeshSession(opciones_malla=OPCIONES) as sesion:
+		for nombre, opciones in CASOS:
+			with sesion.modelo():
+				inicio = time.perf_counter()
+				generar_malla(perfiles, nombres, **dict(sesion.opciones_malla, **opciones))
+				tiempo = time.perf_counter() - inicio
+
+				centroides, tamanos = tamanos_celdas()
+				arbol = cKDTree(centroides)
+				en_cerca = np.unique(np.concatenate(arbol.query_ball_point(cerca, 0.02)))
+				en_lejos = np.unique(np.concatenate(arbol.query_ball_point(lejos, 0.05)))
+
+				print(f"{nombre:18s} celdas: {len(tamanos):9d}  tiempo: {tiempo:6.2f} s  "
+					f"estela cerca: {np.mean(tamanos[en_cerca]):.2e}  "
+					f"lejos: {np.mean(tamanos[en_lejos]):.2e}")
+
+
+if __name__ == "__main__":
+	main()
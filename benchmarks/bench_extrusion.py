@@ -0,0 +1,73 @@
+"""
+Malla 3D extruida del alerón de tres elementos a varias resoluciones en
+envergadura: celdas, tiempo de mallado, tiempo de escritura del .su2 por trozos
+y pico de memoria (ru_maxrss). Cada resolución va en un proceso nuevo para que
+el pico de memoria sea solo el suyo.
+
+Uso:
+	python benchmarks/bench_extrusion.py [CAPAS ...]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from Generador_de_alas.mallador.escritura_su2 import escribir_su2
+from Generador_de_alas.mallador.mallado import generar_malla
+from Generador_de_alas.mallador.sesion import MeshSession
+from geometria_prueba import ala_tres_elementos
+
+
+OPCIONES = {
+	"first_layer_height": 1e-4,
+	"espesor_bl": 1e-3,
+	"mesh_size_airfoil": 0.004,
+	"mesh_size_close": 0.004,
+	"farfield_mesh_size": 0.5,
+	"envergadura": 1.0,
+	"extremos": "periodico",
+}
+
+
+def caso(capas, carpeta):
+	"""Malla y escribe una resolución; imprime una línea con los resultados"""
+	perfiles, nombres = ala_tres_elementos()
+	ruta = os.path.join(carpeta, f"ala_{capas}.su2")
+	with MeshSession(opciones_malla=OPCIONES) as sesion:
+		with sesion.modelo():
+			inicio = time.perf_counter()
+			generar_malla(perfiles, nombres, None, **dict(sesion.opciones_malla, capas_envergadura=capas))
+			t_malla = time.perf_counter() - inicio
+
+			inicio = time.perf_counter()
+			n_celdas = escribir_su2(ruta)
+			t_escritura = time.perf_counter() - inicio
+
+	memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+	print(f"{capas} {n_celdas} {t_malla:.3f} {t_escritura:.3f} {memoria:.0f} {os.path.getsize(ruta)/2**20:.0f}")
+
+
+def main():
+	if len(sys.argv) > 2 and sys.argv[1] == "--caso":
+		return caso(int(sys.argv[2]), sys.argv[3])
+
+	resoluciones = [int(n) for n in sys.argv[1:]] or [8, 32, 128, 512]
+	print(f"{'capas':>6s} {'celdas':>10s} {'malla (s)':>10s} {'su2 (s)':>9s} {'pico (MB)':>10s} {'archivo (MB)':>13s}")
+	with tempfile.TemporaryDirectory() as carpeta:
+		for capas in resoluciones:
+			salida = subprocess.run(
+				[sys.executable, os.path.abspath(__file__), "--caso", str(capas), carpeta],
+				check=True, capture_output=True, text=True,
+			).stdout.split()[-6:]
+			capas, celdas, t_malla, t_escritura, memoria, tamano = salida
+			print(f"{capas:>6s} {celdas:>10s} {t_malla:>10s} {t_escritura:>9s} {memoria:>10s} {tamano:>13s}")
+
+
+if __name__ == "__main__":
+	main()
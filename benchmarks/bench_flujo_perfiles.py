@@ -0,0 +1,62 @@
+"""
+Lectura y escritura en flujo de archivos de perfiles multielemento
+(fileio.write_airfoil_records / iter_airfoil_records): tiempo y pico de memoria
+(ru_maxrss) para varios tamaños de archivo, cada uno en un proceso nuevo. La
+memoria no debería crecer con el tamaño del archivo.
+
+Uso:
+	python benchmarks/bench_flujo_perfiles.py
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.fileio import SEPARATOR_JAVAFOIL, iter_airfoil_records, write_airfoil_records
+from geometria_prueba import ala_tres_elementos
+
+
+def registros(n_alerones):
+	perfiles, nombres = ala_tres_elementos(100)
+	for i in range(n_alerones):
+		for puntos, nombre in zip(perfiles, nombres):
+			n = len(puntos)//2
+			yield f"{nombre}_{i}", puntos[n::-1, :2].T, puntos[n:, :2].T
+
+
+def caso(n_alerones, ruta):
+	inicio = time.perf_counter()
+	write_airfoil_records(registros(n_alerones), ruta, SEPARATOR_JAVAFOIL, separator="\t", decimal_comma=True, z_coordinate=False)
+	escritura = time.perf_counter() - inicio
+
+	inicio = time.perf_counter()
+	n = sum(1 for _ in iter_airfoil_records(ruta))
+	lectura = time.perf_counter() - inicio
+	assert n == 3*n_alerones
+
+	memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+	print(f"{os.path.getsize(ruta)/2**20:.1f} {escritura:.2f} {lectura:.2f} {memoria:.0f}")
+
+
+def main():
+	if len(sys.argv) > 1 and sys.argv[1] == "--caso":
+		return caso(int(sys.argv[2]), sys.argv[3])
+
+	print(f"{'alerones':>9s} {'MB':>7s} {'escritura (s)':>14s} {'lectura (s)':>12s} {'pico (MB)':>10s}")
+	for n in (1000, 5000, 20000):
+		with tempfile.TemporaryDirectory() as carpeta:
+			salida = subprocess.run(
+				[sys.executable, os.path.abspath(__file__), "--caso", str(n), os.path.join(carpeta, "flujo.dat")],
+				check=True, capture_output=True, text=True,
+			).stdout.split()[-4:]
+		tamano, escritura, lectura, memoria = salida
+		print(f"{n:9d} {tamano:>7s} {float(escritura):14.2f} {float(lectura):12.2f} {memoria:>10s}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,66 @@
+"""
+Tiempo de preparar la geometría (sin mallar) del alerón de tres elementos con
+un farfield circular fino, con el núcleo "geo" (un arco por elemento de malla)
+y con "occ" (tres arcos), y lo que cuesta girar el círculo arco a arco frente a
+una sola llamada a rotate con todos los arcos
+
+Uso:
+	python benchmarks/bench_geometria_gmsh.py [TAMANO_FARFIELD]
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.mallador.gmsh_helpers import AirfoilSpline, Circle, PlaneSurface, factory, set_kernel
+from Generador_de_alas.mallador.sesion import MeshSession
+from geometria_prueba import ala_tres_elementos
+
+
+RADIO = 7.0
+
+
+def geometria(perfiles, nombres, tamano):
+	"""Lo mismo que generar_malla hasta la única sincronización"""
+	airfoils = [AirfoilSpline(puntos, 0.002, nombre) for puntos, nombre in zip(perfiles, nombres)]
+	for airfoil in airfoils:
+		airfoil.gen_skin()
+	circulo = Circle(2, 0, 0, radius=RADIO, mesh_size=tamano)
+	PlaneSurface([circulo] + airfoils)
+	factory().synchronize()
+	return circulo
+
+
+def main():
+	tamano = float(sys.argv[1]) if len(sys.argv) > 1 else 0.005
+	perfiles, nombres = ala_tres_elementos(200)
+	print(f"farfield: radio {RADIO}, tamaño {tamano} ({math.floor(2*math.pi*RADIO/tamano)} elementos)")
+	print(f"{'núcleo':7s} {'arcos':>6s} {'geometría (ms)':>15s} {'rotar arco a arco (ms)':>23s} {'rotar en bloque (ms)':>21s}")
+
+	with MeshSession() as sesion:
+		for nucleo in ("geo", "occ"):
+			set_kernel(nucleo)
+			with sesion.modelo():
+				inicio = time.perf_counter()
+				circulo = geometria(perfiles, nombres, tamano)
+				preparar = time.perf_counter() - inicio
+
+				arcos = [(1, arco) for arco in circulo.arcCircle_list]
+				inicio = time.perf_counter()
+				for arco in arcos:
+					factory().rotate([arco], 0, 0, 0, 0, 0, 1, 0.01)
+				uno_a_uno = time.perf_counter() - inicio
+
+				inicio = time.perf_counter()
+				circulo.rotation(-0.01, (0, 0, 0), (0, 0, 1))
+				bloque = time.perf_counter() - inicio
+
+			print(f"{nucleo:7s} {len(arcos):6d} {1e3*preparar:15.1f} {1e3*uno_a_uno:23.1f} {1e3*bloque:21.1f}")
+	set_kernel("geo")
+
+
+if __name__ == "__main__":
+	main()
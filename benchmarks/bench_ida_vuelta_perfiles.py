@@ -0,0 +1,73 @@
+"""
+Ida y vuelta de write_airfoil_records -> iter_airfoil_records con todas las
+combinaciones de opciones de format_airfoil_record (separador, coma decimal,
+columna z), con y sin nombres y con los dos separadores de registros: tiene que
+volver lo mismo que se escribió, o la escritura tiene que negarse (ValueError)
+si la combinación no se puede leer
+
+Uso:
+	python benchmarks/bench_ida_vuelta_perfiles.py
+"""
+
+import io
+import itertools
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.fileio import SEPARATOR_BLANK, SEPARATOR_JAVAFOIL, iter_airfoil_records, write_airfoil_records
+from geometria_prueba import ala_tres_elementos
+
+
+SEPARADORES = (", ", ",", ",\t", "\t", " ", ";", "; ")
+SEPARADORES_REGISTROS = {"blanco": SEPARATOR_BLANK, "javafoil": SEPARATOR_JAVAFOIL}
+
+
+def registros():
+	perfiles, nombres = ala_tres_elementos(60)
+	resultado = []
+	for puntos, nombre in zip(perfiles, nombres):
+		n = len(puntos)//2
+		resultado.append((nombre, puntos[n::-1, :2].T, puntos[n:, :2].T))
+	return resultado
+
+
+def main():
+	originales = registros()
+	n_combinaciones = n_rechazadas = 0
+
+	for separador, coma, z, nombres, (nombre_registros, separador_registros) in itertools.product(
+			SEPARADORES, (False, True), (False, True), (False, True), SEPARADORES_REGISTROS.items()):
+		opciones = f"separator={separador!r} decimal_comma={coma} z_coordinate={z} names={nombres} registros={nombre_registros}"
+		n_combinaciones += 1
+		texto = io.StringIO()
+		try:
+			write_airfoil_records(
+				originales, texto, separador_registros, names=nombres,
+				separator=separador, decimal_comma=coma, z_coordinate=z
+			)
+		except ValueError:
+			# Solo se niega a escribir lo que no se podría leer
+			assert coma and separador == ",", f"rechazada sin motivo: {opciones}"
+			n_rechazadas += 1
+			continue
+
+		texto.seek(0)
+		leidos = list(iter_airfoil_records(texto))
+		assert len(leidos) == len(originales), f"{len(leidos)} registros de {len(originales)}: {opciones}"
+		for (nombre, upper, lower), (nombre_leido, upper_leido, lower_leido) in zip(originales, leidos):
+			if nombres:
+				assert nombre_leido == nombre, f"nombre {nombre_leido!r} en vez de {nombre!r}: {opciones}"
+			assert np.allclose(upper_leido, upper, rtol=0, atol=1e-12), f"extradós de {nombre}: {opciones}"
+			assert np.allclose(lower_leido, lower, rtol=0, atol=1e-12), f"intradós de {nombre}: {opciones}"
+
+	print(f"{n_combinaciones} combinaciones, {n_combinaciones - n_rechazadas} de ida y vuelta, "
+		f"{n_rechazadas} rechazadas al escribir (coma decimal con ',' de separador)")
+	print("OK")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,74 @@
+"""
+Tiempo de importación de los módulos públicos (python -X importtime), cada uno
+en un proceso nuevo, y comprobación de que ninguno carga matplotlib, SciPy ni
+gmsh al importarse (ver Generador_de_alas/_perezoso.py)
+
+Sirve como prueba de regresión: sale con código 1 si algún módulo carga una de
+esas librerías o si lo que tarda sin contar NumPy pasa de LIMITE_MS.
+
+Uso:
+	python benchmarks/bench_importacion.py [LIMITE_MS]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULOS = [
+	"Generador_de_alas.alas.fileio",
+	"Generador_de_alas.alas.airfoils",
+	"Generador_de_alas.alas.aleron",
+	"Generador_de_alas.alas.ala3d",
+	"Generador_de_alas.alas.binario",
+	"Generador_de_alas.alas.optimizacion",
+	"Generador_de_alas.mallador.sesion",
+	"Generador_de_alas.su2.casos",
+	"Generador_de_alas.su2.sustituto",
+	"Generador_de_alas.cli",
+]
+
+PESADOS = ("matplotlib", "scipy", "gmsh")
+
+LIMITE_MS = 100
+
+
+def medir(modulo):
+	"""
+		- Devuelve (ms del módulo, ms de numpy, librerías pesadas cargadas)
+	"""
+	codigo = (
+		f"import {modulo}, sys\n"
+		f"print(sorted({{m.split('.')[0] for m in sys.modules}} & {set(PESADOS)!r}))\n"
+	)
+	proceso = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", codigo],
+		cwd=RAIZ, capture_output=True, text=True, check=True,
+	)
+	acumulado = {}
+	for linea in proceso.stderr.splitlines():
+		coincidencia = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", linea)
+		if coincidencia:
+			acumulado[coincidencia.group(3)] = int(coincidencia.group(1))/1000
+	return acumulado.get(modulo, 0.0), acumulado.get("numpy", 0.0), proceso.stdout.strip()
+
+
+def main():
+	limite = float(sys.argv[1]) if len(sys.argv) > 1 else LIMITE_MS
+	fallos = []
+	print(f"{'módulo':40s} {'total (ms)':>10s} {'numpy (ms)':>10s}  pesados")
+	for modulo in MODULOS:
+		total, numpy, pesados = medir(modulo)
+		print(f"{modulo:40s} {total:10.1f} {numpy:10.1f}  {pesados}")
+		if pesados != "[]" or total - numpy > limite:
+			fallos.append(modulo)
+
+	if fallos:
+		print(f"Regresión en: {', '.join(fallos)}")
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,54 @@
+"""
+Miniaturas de un barrido de alerones: tiempo y pico de memoria (ru_maxrss) para
+varios tamaños de barrido, cada uno en un proceso nuevo. Con un Lienzo
+reutilizado la memoria no debería crecer con el número de casos (salvo la
+propia hoja de contactos).
+
+Uso:
+	python benchmarks/bench_miniaturas.py [N_TRABAJOS]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.graficos import miniaturas
+from geometria_prueba import ala_tres_elementos
+
+
+def caso(n, n_trabajos, carpeta):
+	casos = []
+	for i in range(n):
+		perfiles, _ = ala_tres_elementos(60)
+		casos.append([p[:, :2]*(1 + 1e-3*i) for p in perfiles])
+
+	inicio = time.perf_counter()
+	miniaturas(casos, carpeta, n_trabajos=n_trabajos)
+	tiempo = time.perf_counter() - inicio
+	memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+	print(f"{n} {tiempo:.2f} {memoria:.0f}")
+
+
+def main():
+	if len(sys.argv) > 1 and sys.argv[1] == "--caso":
+		return caso(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])
+
+	n_trabajos = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+	print(f"{'casos':>6s} {'tiempo (s)':>10s} {'ms/caso':>8s} {'pico (MB)':>10s}")
+	for n in (250, 1000, 4000):
+		with tempfile.TemporaryDirectory() as carpeta:
+			salida = subprocess.run(
+				[sys.executable, os.path.abspath(__file__), "--caso", str(n), str(n_trabajos), carpeta],
+				check=True, capture_output=True, text=True,
+			).stdout.split()[-3:]
+		_, tiempo, memoria = salida
+		print(f"{n:6d} {float(tiempo):10.2f} {1e3*float(tiempo)/n:8.2f} {memoria:>10s}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,71 @@
+"""
+Generador de la serie 6 (naca.desde_designacion) frente a los archivos de
+JavaFoil de datos_perfiles que tiene que sustituir: curvatura y espesor máximos
+(y dónde están) y la desviación de cada lado. Comprueba que quedan dentro de
+TOLERANCIAS y que las x de cada lado generado crecen (con tanta curvatura el
+extradós pasa por detrás del borde de ataque); el espesor de la serie 6 es
+aproximado (ver naca.py), así que la desviación de los lados se mide con la mediana
+
+Uso:
+	python benchmarks/bench_naca_javafoil.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.fileio import import_airfoil_data
+from Generador_de_alas.alas.naca import desde_designacion
+
+
+DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "datos_perfiles")
+CASOS = (
+	("64-2320a0", "javafoilNACA64-2320a0.dat"),
+	("64A-2520", "javafoilNACA64A-2520.dat"),
+)
+TOLERANCIAS = {
+	"curvatura": 0.005,			# curvatura máxima
+	"x_curvatura": 0.03,		# su posición
+	"espesor": 0.005,			# espesor máximo
+	"mediana_lados": 0.015,		# mediana de |y generado - y archivo| de cada lado
+}
+X = np.linspace(0.01, 0.99, 99)
+
+
+def forma(foil):
+	"""Curvatura y espesor máximos (y su x) y los dos lados en X"""
+	upper, lower = foil._y_upper_interp(X), foil._y_lower_interp(X)
+	curvatura, espesor = 0.5*(upper + lower), upper - lower
+	return {
+		"curvatura": curvatura.max(), "x_curvatura": X[np.argmax(curvatura)],
+		"espesor": espesor.max(), "x_espesor": X[np.argmax(espesor)],
+		"lados": (upper, lower),
+	}
+
+
+def main():
+	print(f"{'designación':12s} {'':9s} {'curvatura (x)':>15s} {'espesor (x)':>15s} {'mediana extradós':>17s} {'mediana intradós':>17s}")
+	for designacion, archivo in CASOS:
+		archivo = forma(Airfoil(*import_airfoil_data(os.path.join(DATOS, archivo))))
+		generado = forma(Airfoil.NACA(designacion))
+		medianas = [np.median(np.abs(a - b)) for a, b in zip(generado["lados"], archivo["lados"])]
+
+		for nombre, f in (("archivo", archivo), ("generado", generado)):
+			print(f"{designacion:12s} {nombre:9s} {f['curvatura']:7.4f} ({f['x_curvatura']:4.2f}) {f['espesor']:7.4f} ({f['x_espesor']:4.2f})", end="")
+			print(f" {medianas[0]:17.4f} {medianas[1]:17.4f}" if nombre == "generado" else "")
+
+		diferencias = {clave: abs(generado[clave] - archivo[clave]) for clave in ("curvatura", "x_curvatura", "espesor")}
+		diferencias["mediana_lados"] = max(medianas)
+		for clave, diferencia in diferencias.items():
+			assert diferencia <= TOLERANCIAS[clave], f"{designacion}: {clave} difiere {diferencia:.4f} (> {TOLERANCIAS[clave]})"
+		for lado in desde_designacion(designacion):
+			assert np.all(np.diff(lado[0]) > 0), f"{designacion}: x no crece a lo largo de un lado"
+	print("OK")
+
+
+if __name__ == "__main__":
+	main()
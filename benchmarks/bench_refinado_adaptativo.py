@@ -0,0 +1,70 @@
+"""
+Refinado adaptativo de Airfoil (tolerance): puntos por perfil y desviación
+máxima real frente al refinado fijo de POINTS_AIRFOIL por lado, para un flap
+fino y simétrico y un perfil muy curvado. La desviación se mide contra el mismo
+perfil con 4000 puntos por lado y no puede pasar de la tolerancia.
+
+Uso:
+	python benchmarks/bench_refinado_adaptativo.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import Generador_de_alas.alas.airfoils as airfoils
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.fileio import import_airfoil_data
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def desviacion(foil, referencia, bloque=512):
+	"""
+		Distancia máxima de los puntos de 'referencia' a la poligonal de 'foil',
+		lado a lado
+	"""
+	maxima = 0.0
+	for lado in ("upper", "lower"):
+		p = np.column_stack((getattr(foil, f"_x_{lado}"), getattr(foil, f"_y_{lado}")))
+		r = np.column_stack((getattr(referencia, f"_x_{lado}"), getattr(referencia, f"_y_{lado}")))
+		a, d = p[:-1], np.diff(p, axis=0)
+		for inicio in range(0, len(r), bloque):
+			q = r[inicio:inicio + bloque, None, :]
+			t = np.clip(np.sum((q - a)*d, axis=-1)/np.sum(d*d, axis=-1), 0, 1)
+			distancia = np.linalg.norm(q - (a + t[..., None]*d), axis=-1).min(axis=1)
+			maxima = max(maxima, distancia.max())
+	return maxima
+
+
+def main():
+	upper, lower = import_airfoil_data(os.path.join(RAIZ, "datos_perfiles", "s1223.dat"))
+	perfiles = {
+		"NACA 0006": lambda **opciones: Airfoil.NACA("0006", 400, **opciones),
+		"S1223": lambda **opciones: Airfoil(upper, lower, **opciones),
+	}
+
+	print(f"{'perfil':10s} {'tolerancia':>10s} {'puntos':>7s} {'desviación':>11s} {'ms':>6s}")
+	for nombre, crear in perfiles.items():
+		puntos_fijos = airfoils.POINTS_AIRFOIL
+		airfoils.POINTS_AIRFOIL = 4000
+		referencia = crear()
+		airfoils.POINTS_AIRFOIL = puntos_fijos
+
+		for tolerancia in (None, 1e-3, 1e-4, 1e-5):
+			inicio = time.perf_counter()
+			foil = crear(tolerance=tolerancia)
+			tiempo = time.perf_counter() - inicio
+			puntos = len(foil._x_upper) + len(foil._x_lower)
+			etiqueta = "fijo" if tolerancia is None else f"{tolerancia:.0e}"
+			maxima = desviacion(foil, referencia)
+			print(f"{nombre:10s} {etiqueta:>10s} {puntos:7d} {maxima:11.3e} {1e3*tiempo:6.1f}")
+			assert tolerancia is None or maxima <= tolerancia, f"{nombre}: {maxima:.3e} > {tolerancia:.0e}"
+
+
+if __name__ == "__main__":
+	main()
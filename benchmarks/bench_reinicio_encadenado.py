@@ -0,0 +1,66 @@
+"""
+Iteraciones totales de un barrido de AOA arrancando en frío vs encadenado
+
+Usa el sustituto de SU2 (su2_simulado.py), así que las cifras solo miden el
+mecanismo de encadenado, no la convergencia real de SU2.
+
+Uso:
+	python benchmarks/bench_reinicio_encadenado.py [SU2_CFD]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.su2.casos import barrido_producto, generar_casos
+from Generador_de_alas.su2.ejecutor import COMANDO_SIMULADO, ejecutar_casos
+from Generador_de_alas.su2.reinicio import ejecutar_encadenado
+
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def malla_prueba(ruta, n=40):
+	x, y = np.meshgrid(np.linspace(-5, 5, n), np.linspace(-5, 5, n))
+	with open(ruta, "w") as archivo:
+		archivo.write(f"NDIME= 2\nNELEM= 0\nNPOIN= {n*n}\n")
+		for i, (xi, yi) in enumerate(zip(x.ravel(), y.ravel())):
+			archivo.write(f"{xi:.8f} {yi:.8f} {i}\n")
+		archivo.write("NMARK= 0\n")
+
+
+def main():
+	comando = tuple(sys.argv[1:]) or COMANDO_SIMULADO
+	barrido = barrido_producto(AOA=np.arange(0, 16, 1.0).tolist())
+
+	with tempfile.TemporaryDirectory() as carpeta:
+		malla = os.path.join(carpeta, "malla.su2")
+		malla_prueba(malla)
+		cambios = {"ITER": 5000, "OUTPUT_WRT_FREQ": 20}
+		cfg_base = os.path.join(RAIZ, "su2_config_base.cfg")
+
+		casos = generar_casos(os.path.join(carpeta, "frio"), barrido, malla, cfg_base, cambios, opciones_su2=["AOA"])
+		inicio = time.perf_counter()
+		frio = ejecutar_casos(casos, comando, intervalo=0.02)
+		t_frio = time.perf_counter() - inicio
+
+		casos = generar_casos(os.path.join(carpeta, "caliente"), barrido, malla, cfg_base, cambios, opciones_su2=["AOA"])
+		inicio = time.perf_counter()
+		caliente = ejecutar_encadenado(casos, comando, intervalo=0.02)
+		t_caliente = time.perf_counter() - inicio
+
+	it_frio = sum(resultado["iteraciones"] for resultado in frio)
+	it_caliente = sum(resultado["iteraciones"] for resultado in caliente)
+	print(f"Casos: {len(barrido)}")
+	print(f"En frío:     {it_frio:8d} iteraciones  {t_frio:7.2f} s")
+	print(f"Encadenado:  {it_caliente:8d} iteraciones  {t_caliente:7.2f} s")
+	print(f"Reducción:   {100*(1 - it_caliente/it_frio):7.1f} %")
+
+
+if __name__ == "__main__":
+	main()
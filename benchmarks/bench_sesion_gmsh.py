@@ -0,0 +1,105 @@
+"""
+Coste por malla de 100 mallas pequeñas seguidas:
+	- un proceso de Python nuevo por malla (importar gmsh + initialize + finalize)
+	- gmsh.initialize()/finalize() por malla en el mismo proceso
+	- una MeshSession para todas
+
+Uso:
+	python benchmarks/bench_sesion_gmsh.py [N_MALLAS]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+import gmsh
+
+from Generador_de_alas.mallador.mallado import generar_malla
+from Generador_de_alas.mallador.sesion import MeshSession
+
+
+# Malla gruesa para que pese el coste fijo y no el mallado en sí
+OPCIONES = {
+	"farfield_radius": 5,
+	"first_layer_height": 0.005,
+	"espesor_bl": 0.02,
+	"mesh_size_airfoil": 0.02,
+	"mesh_size_close": 0.02,
+	"farfield_mesh_size": 1.0,
+}
+
+
+def naca0012(n=40):
+	"""Puntos (x, y, z) del NACA 0012 en el orden de Airfoil.exportar"""
+	x = 0.5*(1 - np.cos(np.linspace(0, np.pi, n)))
+	yt = 0.6*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3 - 0.1036*x**4)
+	upper = list(zip(x[::-1], yt[::-1], np.zeros(n)))
+	lower = list(zip(x[1:], -yt[1:], np.zeros(n - 1)))
+	return upper + lower
+
+
+def por_proceso(n, archivo, carpeta):
+	codigo = (
+		"import sys, json, gmsh\n"
+		f"sys.path.insert(0, {RAIZ!r})\n"
+		"from Generador_de_alas.mallador.mallado import generar_malla\n"
+		"gmsh.initialize(readConfigFiles=False)\n"
+		"gmsh.option.setNumber('General.Terminal', 0)\n"
+		f"puntos = [[tuple(p) for p in json.load(open({archivo!r}))]]\n"
+		f"generar_malla(puntos, ['main'], sys.argv[1], **{OPCIONES!r})\n"
+		"gmsh.finalize()\n"
+	)
+	for i in range(n):
+		subprocess.run([sys.executable, "-c", codigo, os.path.join(carpeta, f"p{i}.su2")],
+			check=True, stdout=subprocess.DEVNULL, cwd=carpeta)
+
+
+def por_initialize(n, puntos, carpeta):
+	for i in range(n):
+		gmsh.initialize(readConfigFiles=False)
+		gmsh.option.setNumber("General.Terminal", 0)
+		generar_malla([puntos], ["main"], os.path.join(carpeta, f"i{i}.su2"), **OPCIONES)
+		gmsh.finalize()
+
+
+def por_sesion(n, puntos, carpeta):
+	with MeshSession(opciones_malla=OPCIONES) as sesion:
+		for i in range(n):
+			sesion.mallar([puntos], ["main"], os.path.join(carpeta, f"s{i}.su2"))
+
+
+def main():
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+	puntos = naca0012()
+
+	with tempfile.TemporaryDirectory() as carpeta:
+		archivo = os.path.join(carpeta, "naca0012.json")
+		with open(archivo, "w") as f:
+			json.dump([list(map(float, p)) for p in puntos], f)
+
+		os.chdir(carpeta)
+		tiempos = {}
+		for nombre, funcion, datos in (
+				("proceso nuevo por malla", por_proceso, archivo),
+				("initialize/finalize por malla", por_initialize, puntos),
+				("MeshSession", por_sesion, puntos)):
+			inicio = time.perf_counter()
+			funcion(n, datos, carpeta)
+			tiempos[nombre] = (time.perf_counter() - inicio) / n
+
+	referencia = tiempos["MeshSession"]
+	print(f"{n} mallas")
+	for nombre, tiempo in tiempos.items():
+		print(f"{nombre:32s} {1e3*tiempo:8.1f} ms/malla  (+{1e3*(tiempo - referencia):7.1f} ms sobre la sesión)")
+
+
+if __name__ == "__main__":
+	main()
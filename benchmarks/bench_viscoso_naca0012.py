@@ -0,0 +1,52 @@
+"""
+Regresión de la capa límite (alas/capa_limite.py) con el NACA 0012 a Re 1e6 y
+Ncrit 9: a 0 grados Cd y la x de transición de los dos lados tienen que quedar
+cerca de REFERENCIA. Imprime también unos cuantos ángulos más y el tiempo
+
+Uso:
+	python benchmarks/bench_viscoso_naca0012.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Generador_de_alas.alas.airfoils import Airfoil
+from Generador_de_alas.alas.naca import desde_designacion
+from Generador_de_alas.alas.polares import polar
+
+
+REYNOLDS = 1e6
+# Cd y x de transición a 0 grados, con su tolerancia
+REFERENCIA = {"Cd": (0.0070, 0.0005), "x_transicion": (0.63, 0.03)}
+ALFAS = np.array([0.0, 2.0, 4.0, 6.0, 8.0])
+
+
+def main():
+	perfil = Airfoil(*desde_designacion("0012"))
+
+	inicio = time.perf_counter()
+	viscoso = polar([perfil], ALFAS, reynolds=REYNOLDS)["viscoso"]
+	tiempo = time.perf_counter() - inicio
+
+	print(f"NACA 0012, Re {REYNOLDS:.0e} ({1e3*tiempo:.1f} ms)")
+	print(f"{'alfa':>5s} {'Cd':>8s} {'xtr extradós':>13s} {'xtr intradós':>13s}")
+	for i, alfa in enumerate(ALFAS):
+		extrados, intrados = viscoso["x_transicion"][i, 0]
+		print(f"{alfa:5.1f} {viscoso['Cd'][i]:8.5f} {extrados:13.3f} {intrados:13.3f}")
+
+	cd = viscoso["Cd"][0]
+	xtr = viscoso["x_transicion"][0, 0]
+	for nombre, valores in (("Cd", [cd]), ("x_transicion", xtr)):
+		referencia, tolerancia = REFERENCIA[nombre]
+		for valor in valores:
+			assert abs(valor - referencia) <= tolerancia, f"{nombre} = {valor:.4f}, se esperaba {referencia} ± {tolerancia}"
+	print("OK")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,35 @@
+"""
+Geometrías analíticas para los benchmarks (sin pasar por archivos ni por Airfoil)
+"""
+
+import numpy as np
+
+
+def naca00xx(espesor=0.12, n=80, cuerda=1.0, x0=0.0, y0=0.0, aoa=0.0):
+	"""
+		Puntos (x, y, z) de un NACA simétrico en el orden de Airfoil.exportar
+		(borde de salida -> extradós -> borde de ataque -> intradós), girado
+		'aoa' grados alrededor del borde de ataque y movido a (x0, y0)
+	"""
+	x = 0.5*(1 - np.cos(np.linspace(0, np.pi, n)))
+	yt = 5*espesor*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3 - 0.1036*x**4)
+	puntos = np.vstack((
+		np.column_stack((x[::-1], yt[::-1])),
+		np.column_stack((x[1:], -yt[1:])),
+	))*cuerda
+
+	a = np.deg2rad(aoa)
+	rotacion = np.array([(np.cos(a), -np.sin(a)), (np.sin(a), np.cos(a))])
+	puntos = puntos @ rotacion.T + (x0, y0)
+	return np.column_stack((puntos, np.zeros(len(puntos))))
+
+
+def ala_tres_elementos(n=80):
+	"""
+		Perfil principal con dos flaps, parecido al de Mi_aleron.py
+	"""
+	return [
+		naca00xx(0.12, n, 0.6, 0.0, 0.0, 5),
+		naca00xx(0.10, n, 0.3, 0.57, -0.02, -20),
+		naca00xx(0.10, n, 0.15, 0.82, -0.075, -40),
+	], ["main", "flap1", "flap2"]
@@ -0,0 +1,9 @@
+# Línea de comandos del generador (ver Generador_de_alas/cli.py), p.ej.:
+#	python generador.py mesh caso_ejemplo.yaml
+#	python generador.py su2 caso_ejemplo.yaml --jobs 4
+import sys
+
+from Generador_de_alas.cli import main
+
+
+sys.exit(main())